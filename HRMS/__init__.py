@@ -3,4 +3,17 @@ from HRMS.meeting_manager import MeetingManager
 from HRMS.leave_manager import LeaveManager
 from HRMS.ticket_manager import TicketManager
 from HRMS.business_trip_manager import BusinessTripManager
+from HRMS.transaction import Transaction
+from HRMS.events import EventBus, DomainEvent
+from HRMS.leave_accrual import HolidayCalendar, AccrualEngine
+from HRMS.change_log import ChangeLog
+from HRMS.search_index import SearchIndex
+from HRMS.archive import ColdStore, open_archives
+from HRMS.availability import AvailabilityIndex, ShardedAvailability
+from HRMS.org_chart import OrgChart
+from HRMS.scheduler import Scheduler
+from HRMS.ticket_triage import SlaPolicy
+from HRMS.time_index import TimeIndex
+from HRMS.snapshot import Snapshot
+from HRMS.recurrence import MeetingSeries
 from HRMS.schemas import *
\ No newline at end of file
@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class ColdStore:
+    """
+    Append-only, compressed store for records that no longer change.
+
+    Each `append` writes one gzip member (a chunk) to `<kind>.jsonl.gz`, so the
+    file stays a valid gzip stream, and adds a line describing the chunk to
+    `<kind>.chunks.jsonl`: its offset, size, record count, the employees it
+    covers and the sorted values of each of `index_fields` it holds. Reads seek
+    straight to the chunks that can match and decompress only those.
+    """
+
+    def __init__(self, directory: str, kind: str, index_fields: Iterable[str] = ()):
+        self.kind = kind
+        self.index_fields = tuple(index_fields)
+        self.data_path = os.path.join(directory, f"{kind}.jsonl.gz")
+        self.catalog_path = os.path.join(directory, f"{kind}.chunks.jsonl")
+        self._lock = threading.Lock()
+        self.chunks: List[Dict] = []
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.catalog_path):
+            with open(self.catalog_path, encoding="utf-8") as f:
+                self.chunks = [json.loads(line) for line in f if line.strip()]
+        end = self.chunks[-1]["offset"] + self.chunks[-1]["length"] if self.chunks else 0
+        # Drop a chunk that was written but never cataloged, e.g. after a crash mid-append.
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path) > end:
+            with open(self.data_path, "r+b") as f:
+                f.truncate(end)
+
+    def __len__(self) -> int:
+        return sum(chunk["count"] for chunk in self.chunks)
+
+    def append(self, records: List[Dict]) -> Optional[Dict]:
+        """
+        Write records as one compressed chunk. The chunk is on disk before this returns.
+        """
+        if not records:
+            return None
+        payload = gzip.compress("".join(json.dumps(r, default=str) + "\n" for r in records).encode())
+        with self._lock:
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            chunk = {
+                "offset": offset,
+                "length": len(payload),
+                "count": len(records),
+                "emp_ids": sorted({r["emp_id"] for r in records if r.get("emp_id")}),
+                "ids": {field: sorted({str(r[field]) for r in records if r.get(field) is not None})
+                        for field in self.index_fields},
+            }
+            with open(self.catalog_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(chunk) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.chunks.append(chunk)
+        return chunk
+
+    def iter_records(self, emp_id: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield archived records, oldest first, optionally only those of one employee.
+        Chunks that hold nothing for the employee are not read.
+        """
+        with self._lock:
+            chunks = [c for c in self.chunks if emp_id is None or emp_id in c["emp_ids"]]
+        for record in self._read(chunks):
+            if emp_id is None or record.get("emp_id") == emp_id:
+                yield record
+
+    def _read(self, chunks: List[Dict]) -> Iterator[Dict]:
+        if not chunks:
+            return
+        with open(self.data_path, "rb") as f:
+            for chunk in chunks:
+                f.seek(chunk["offset"])
+                for line in gzip.decompress(f.read(chunk["length"])).splitlines():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _may_hold(chunk: Dict, field: str, wanted: Iterable[str]) -> bool:
+        # Chunks written before the field was indexed have to be read.
+        ids = chunk.get("ids", {}).get(field)
+        if ids is None:
+            return True
+        for value in wanted:
+            i = bisect_left(ids, value)
+            if i < len(ids) and ids[i] == value:
+                return True
+        return False
+
+    def find(self, field: str, values: Iterable[str]) -> List[Dict]:
+        """
+        Return archived records whose `field` is one of `values`. With `field` among the
+        index fields only the chunks holding one of the values are decompressed.
+        """
+        wanted = {str(v) for v in values}
+        with self._lock:
+            chunks = [c for c in self.chunks if self._may_hold(c, field, wanted)]
+        return [r for r in self._read(chunks) if str(r.get(field)) in wanted]
+
+    def ids(self, field: str) -> Iterator[str]:
+        """
+        Yield every archived value of `field`, from the catalog where the field is indexed.
+        """
+        with self._lock:
+            chunks = list(self.chunks)
+        unindexed = []
+        for chunk in chunks:
+            if field in chunk.get("ids", {}):
+                yield from chunk["ids"][field]
+            else:
+                unindexed.append(chunk)
+        for record in self._read(unindexed):
+            if record.get(field) is not None:
+                yield str(record[field])
+
+
+def open_archives(directory: str) -> Dict[str, ColdStore]:
+    """
+    Open the ticket, trip and expense cold stores kept in one directory.
+    """
+    return {
+        "tickets": ColdStore(directory, "tickets", ("ticket_id",)),
+        "trips": ColdStore(directory, "trips", ("trip_id",)),
+        "expenses": ColdStore(directory, "expenses", ("trip_id", "expense_id")),
+    }
@@ -0,0 +1,286 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from HRMS.events import DomainEvent
+from HRMS.recurrence import MeetingSeries, series_clash
+
+TimePoint = Union[date, datetime, str]
+
+AVAILABILITY_EVENTS = ("trip.created", "trip.restored", "trip.status_changed", "leave.applied", "leave.restored",
+                       "meeting.scheduled",
+                       "meeting.cancelled", "meeting.series_scheduled", "meeting.series_updated",
+                       "meeting.series_cancelled")
+
+# Trips in these statuses no longer block the employee's calendar.
+FREE_TRIP_STATUSES = ("Rejected", "Cancelled")
+
+
+def to_datetime(value: TimePoint) -> datetime:
+    """
+    Normalize a date, datetime or ISO string; a plain date means the start of that day.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return value.replace(tzinfo=None)
+
+
+def day_span(start: TimePoint, end: TimePoint) -> Tuple[datetime, datetime]:
+    """
+    The half-open interval covering every day from start to end, both inclusive.
+    """
+    return to_datetime(start), to_datetime(end) + timedelta(days=1)
+
+
+class _Timeline:
+    """
+    One employee's busy intervals, sorted by start.
+
+    `max_length` is the longest interval ever added, so every interval that
+    can overlap [start, end) begins in [start - max_length, end) and is found
+    with two bisections.
+    """
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.items: List[Tuple[datetime, datetime, str, str]] = []
+        self.max_length = timedelta(0)
+
+    def add(self, start: datetime, end: datetime, kind: str, ref: str) -> None:
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.items.insert(i, (start, end, kind, ref))
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, ref: str) -> int:
+        keep = [item for item in self.items if item[3] != ref]
+        removed = len(self.items) - len(keep)
+        if removed:
+            self.items = keep
+            self.starts = [item[0] for item in keep]
+        return removed
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime, str, str]]:
+        lo = bisect_left(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [item for item in self.items[lo:hi] if item[1] > start]
+
+
+class AvailabilityIndex:
+    """
+    Per-employee calendar of trips, leave days and meetings.
+
+    Subscribe it synchronously to an EventBus and it follows every booking;
+    `index_existing` loads what the managers held before it was attached.
+    Managers given this index refuse bookings that clash with it.
+    Recurring meetings are kept as their series and expanded only over the
+    interval being checked.
+    """
+
+    def __init__(self, meeting_minutes: int = 60):
+        self.meeting_length = timedelta(minutes=meeting_minutes)
+        self._timelines: Dict[str, _Timeline] = {}
+        self._series: Dict[str, Dict[str, MeetingSeries]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: DomainEvent) -> None:
+        self.record(event)
+
+    def record(self, event: DomainEvent) -> None:
+        """
+        Follow one booking event; the public form of calling the index, usable through a proxy.
+        """
+        data, emp_id = event.data, event.emp_id
+        if event.type in ("trip.created", "trip.restored", "trip.status_changed"):
+            self.remove(emp_id, f"trip:{event.entity_id}")
+            if data["status"] not in FREE_TRIP_STATUSES:
+                self.add(emp_id, *day_span(data["start_date"], data["end_date"]), "trip", event.entity_id)
+        elif event.type in ("leave.applied", "leave.restored"):
+            for day in data["leave_dates"]:
+                self.add(emp_id, *day_span(day, day), "leave", str(data["request_id"]))
+        elif event.type == "meeting.scheduled":
+            start = to_datetime(data["date"])
+            self.add(emp_id, start, start + self.meeting_length, "meeting", event.entity_id)
+        elif event.type == "meeting.cancelled":
+            self.remove(emp_id, f"meeting:{event.entity_id}")
+        elif event.type in ("meeting.series_scheduled", "meeting.series_updated"):
+            self.add_series(MeetingSeries.from_record(data))
+        elif event.type == "meeting.series_cancelled":
+            self.remove_series(emp_id, event.entity_id)
+
+    def add(self, emp_id: str, start: datetime, end: datetime, kind: str, ref: str) -> None:
+        """
+        Mark an employee busy over [start, end). `ref` identifies the booking within its kind.
+        """
+        with self._lock:
+            self._timelines.setdefault(emp_id, _Timeline()).add(start, end, kind, f"{kind}:{ref}")
+
+    def remove(self, emp_id: str, ref: str) -> int:
+        """
+        Drop every interval of a booking, given as '<kind>:<ref>'.
+        """
+        with self._lock:
+            timeline = self._timelines.get(emp_id)
+            return timeline.remove(ref) if timeline else 0
+
+    def add_series(self, series: MeetingSeries) -> None:
+        """
+        Mark an employee busy at every occurrence of a recurring meeting, replacing an earlier
+        version of the same series.
+        """
+        with self._lock:
+            self._series.setdefault(series.emp_id, {})[series.series_id] = series
+
+    def remove_series(self, emp_id: str, series_id: str) -> None:
+        with self._lock:
+            self._series.get(emp_id, {}).pop(series_id, None)
+
+    def index_existing(self, leave_manager=None, meeting_manager=None, business_trip_manager=None) -> None:
+        if leave_manager is not None:
+            for req in leave_manager.iter_leave_requests():
+                for day in req["leave_dates"]:
+                    self.add(req["emp_id"], *day_span(day, day), "leave", str(req["request_id"]))
+        if meeting_manager is not None:
+            for m in meeting_manager.iter_meetings():
+                if m.get("recurrence"):
+                    self.add_series(MeetingSeries.from_record(m))
+                    continue
+                start = to_datetime(m["meeting_dt"])
+                self.add(m["emp_id"], start, start + self.meeting_length, "meeting",
+                         f"{m['emp_id']}@{m['meeting_dt']}")
+        if business_trip_manager is not None:
+            self.index_trips(business_trip_manager.iter_trips())
+
+    def index_trips(self, trips: Iterable[Dict[str, Any]]) -> None:
+        for trip in trips:
+            if trip["status"] not in FREE_TRIP_STATUSES:
+                self.add(trip["emp_id"], *day_span(trip["start_date"], trip["end_date"]), "trip",
+                         trip["trip_id"])
+
+    def conflicts(
+            self,
+            emp_id: str,
+            start: TimePoint,
+            end: TimePoint,
+            kinds: Optional[Iterable[str]] = None,
+            ignore: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Bookings of the employee that overlap [start, end), optionally only of the given kinds,
+        in order of start. Occurrences of recurring meetings have the ref
+        '<series_id>@<original start>'; a booking whose ref is `ignore` is left out.
+        """
+        start, end = to_datetime(start), to_datetime(end)
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            timeline = self._timelines.get(emp_id)
+            items = timeline.overlapping(start, end) if timeline else []
+            if kinds is None or "meeting" in kinds:
+                for series in self._series.get(emp_id, {}).values():
+                    for s, original in series.instances(start - self.meeting_length, end):
+                        if s + self.meeting_length > start:
+                            items.append((s, s + self.meeting_length, "meeting",
+                                          f"meeting:{series.series_id}@{original.isoformat()}"))
+                items.sort(key=lambda item: item[0])
+        return [
+            {"kind": kind, "ref": ref.split(":", 1)[1], "start": s.isoformat(), "end": e.isoformat()}
+            for s, e, kind, ref in items if (kinds is None or kind in kinds) and ref.split(":", 1)[1] != ignore
+        ]
+
+    def is_available(self, emp_id: str, start: TimePoint, end: TimePoint) -> bool:
+        return not self.conflicts(emp_id, start, end)
+
+    def check_series(self, series: MeetingSeries, kinds: Iterable[str] = ("trip", "leave", "meeting")) -> None:
+        """
+        Raise ValueError describing the first occurrence of a recurring meeting, however far ahead,
+        that overlaps a booking of the given kinds. Each booking is tested for an occurrence within
+        it, and each recurring meeting of the employee with `series_clash`.
+        """
+        kinds = set(kinds)
+        tick = timedelta(microseconds=1)
+        clashes = []
+        with self._lock:
+            timeline = self._timelines.get(series.emp_id)
+            for s, e, kind, ref in timeline.items if timeline else []:
+                if kind in kinds:
+                    start = next(series.occurrences(s - self.meeting_length + tick, e), None)
+                    if start is not None:
+                        clashes.append((start, kind, ref.split(":", 1)[1], s, e))
+            if "meeting" in kinds:
+                for other in self._series.get(series.emp_id, {}).values():
+                    start = series_clash(series, other, self.meeting_length) if other.series_id != series.series_id else None
+                    if start is not None:
+                        s, original = next(other.instances(start - self.meeting_length + tick,
+                                                           start + self.meeting_length))
+                        clashes.append((start, "meeting", f"{other.series_id}@{original.isoformat()}", s,
+                                        s + self.meeting_length))
+        if clashes:
+            start, kind, ref, s, e = min(clashes)
+            raise ValueError(f"Conflict: meeting at {start.isoformat()} for {series.emp_id} overlaps {kind} {ref} "
+                             f"({s.isoformat()} to {e.isoformat()}).")
+
+    def available_employees(self, emp_ids: Iterable[str], start: TimePoint, end: TimePoint) -> List[str]:
+        """
+        The employees out of `emp_ids` with nothing booked in [start, end).
+        """
+        return [emp_id for emp_id in emp_ids if self.is_available(emp_id, start, end)]
+
+    def check(self, emp_id: str, start: TimePoint, end: TimePoint, kinds: Iterable[str], what: str,
+              ignore: Optional[str] = None) -> None:
+        """
+        Raise ValueError describing the first booking of the given kinds that overlaps [start, end),
+        other than the one with the ref `ignore` (e.g. a meeting being moved).
+        """
+        clashes = self.conflicts(emp_id, start, end, kinds, ignore)
+        if clashes:
+            clash = clashes[0]
+            raise ValueError(f"Conflict: {what} for {emp_id} overlaps {clash['kind']} {clash['ref']} "
+                             f"({clash['start']} to {clash['end']}).")
+
+
+class ShardedAvailability:
+    """
+    Availability over several indexes, one per shard, possibly in other processes.
+
+    Every booking of an employee belongs in the index of the employee's shard, so
+    that one lookup sees their trips, leave and meetings together. Subscribed to an
+    EventBus, this forwards each event to that index; checks are answered there.
+    """
+
+    def __init__(self, indexes: List[Any], shard_of: Callable[[str], int], meeting_minutes: int = 60):
+        self.indexes = indexes
+        self.shard_of = shard_of
+        self.meeting_length = timedelta(minutes=meeting_minutes)
+
+    def index_for(self, emp_id: str):
+        return self.indexes[self.shard_of(emp_id)]
+
+    def __call__(self, event: DomainEvent) -> None:
+        self.index_for(event.emp_id).record(event)
+
+    def index_trips(self, trips: Iterable[Dict[str, Any]]) -> None:
+        by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        for trip in trips:
+            by_shard.setdefault(self.shard_of(trip["emp_id"]), []).append(trip)
+        for shard, group in by_shard.items():
+            self.indexes[shard].index_trips(group)
+
+    def conflicts(self, emp_id: str, start: TimePoint, end: TimePoint, kinds: Optional[Iterable[str]] = None,
+                  ignore: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.index_for(emp_id).conflicts(emp_id, start, end, list(kinds) if kinds else None, ignore)
+
+    def is_available(self, emp_id: str, start: TimePoint, end: TimePoint) -> bool:
+        return not self.conflicts(emp_id, start, end)
+
+    def check_series(self, series: MeetingSeries, kinds: Iterable[str] = ("trip", "leave", "meeting")) -> None:
+        self.index_for(series.emp_id).check_series(series, list(kinds))
+
+    def available_employees(self, emp_ids: Iterable[str], start: TimePoint, end: TimePoint) -> List[str]:
+        return [emp_id for emp_id in emp_ids if self.is_available(emp_id, start, end)]
+
+    def check(self, emp_id: str, start: TimePoint, end: TimePoint, kinds: Iterable[str], what: str,
+              ignore: Optional[str] = None) -> None:
+        self.index_for(emp_id).check(emp_id, start, end, list(kinds), what, ignore)
@@ -0,0 +1,197 @@
+import csv
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+# CSV has no list type, so list fields are written joined with ';'.
+LIST_FIELDS = ("leave_dates",)
+
+# Nested fields, such as a meeting's repeat rule, are written to CSV and Parquet as JSON text.
+JSON_FIELDS = ("recurrence",)
+
+
+def file_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type '{ext}'; use .csv, .jsonl or .parquet.")
+    return FORMATS[ext]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet files need pyarrow, which is not installed. Install the 'parquet' extra "
+                         "(uv sync --extra parquet) or use .csv or .jsonl.") from None
+    return pyarrow
+
+
+def _csv_record(row: Dict[str, str]) -> Dict:
+    record = {k: (v if v != "" else None) for k, v in row.items()}
+    for field in LIST_FIELDS:
+        if isinstance(record.get(field), str):
+            record[field] = record[field].split(";")
+    return _json_fields(record)
+
+
+def _json_fields(record: Dict) -> Dict:
+    for field in JSON_FIELDS:
+        if isinstance(record.get(field), str):
+            record[field] = json.loads(record[field])
+    return record
+
+
+def iter_chunks(path: str, chunk_size: int = 5000, fmt: Optional[str] = None) -> Iterator[List[Dict]]:
+    """
+    Read a CSV, JSONL or Parquet file as successive lists of at most chunk_size records.
+    Only one chunk is held in memory at a time.
+    """
+    fmt = file_format(path, fmt)
+    if fmt == "parquet":
+        parquet_file = _pyarrow().parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield [_json_fields(record) for record in batch.to_pylist()]
+        return
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            records = (_csv_record(row) for row in csv.DictReader(f))
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _csv_value(value):
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    if isinstance(value, (list, tuple)):
+        return ";".join(str(v) for v in value)
+    return value
+
+
+def export_records(records: Iterable[Dict], path: str, fmt: Optional[str] = None, chunk_size: int = 5000) -> int:
+    """
+    Stream records to a CSV, JSONL or Parquet file and return how many were written.
+    Columns are taken from the first record; records are consumed lazily.
+    """
+    fmt = file_format(path, fmt)
+    records = iter(records)
+    count = 0
+    if fmt == "parquet":
+        pa = _pyarrow()
+        writer = None
+        try:
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                chunk = [{k: (str(v) if hasattr(v, "isoformat") else json.dumps(v, default=str) if k in JSON_FIELDS
+                              and v is not None else v) for k, v in r.items()} for r in chunk]
+                if writer is None:
+                    table = pa.Table.from_pylist(chunk)
+                    writer = pa.parquet.ParquetWriter(path, table.schema)
+                else:
+                    table = pa.Table.from_pylist(chunk, schema=writer.schema)
+                writer.write_table(table)
+                count += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    with open(path, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = None
+            for record in records:
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(record.keys()), extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow({k: _csv_value(v) for k, v in record.items()})
+                count += 1
+        else:
+            for record in records:
+                f.write(json.dumps(record, default=str))
+                f.write("\n")
+                count += 1
+    return count
+
+
+def import_file(kind: str, path: str, managers: Dict, chunk_size: int = 5000,
+                trusted: bool = False, fmt: Optional[str] = None) -> Dict:
+    """
+    Stream a file into the matching manager's ingest method, one chunk at a time.
+    `managers` maps 'employee', 'ticket', 'business_trip', 'meeting' and 'leave' to manager instances.
+
+    Employees may reference managers that appear later in the file: those links
+    are deferred and resolved in a final pass once every chunk has been loaded.
+    Imported employees get leave accounts, opened as LeaveManager.open_accounts does.
+
+    Files written by export_file are restored as they were: tickets, trips and
+    expenses keep their IDs, status and timestamps, and leave requests are added
+    to the history without charging balances again (import leave_balances for
+    those, after the employees). Meetings are rescheduled, so recurring ones get
+    new series IDs.
+
+    Each chunk is loaded whole or not at all. If one fails, a ValueError names it
+    and the chunks before it, which stay loaded.
+    """
+    ingest = {
+        "employees": lambda chunk: _ingest_employees(chunk, managers, trusted),
+        "tickets": lambda chunk: managers["ticket"].ingest_tickets(chunk, trusted),
+        "trips": lambda chunk: managers["business_trip"].ingest_trips(chunk, trusted),
+        "expenses": lambda chunk: managers["business_trip"].ingest_expenses(chunk, trusted),
+        "meetings": lambda chunk: managers["meeting"].ingest_meetings(chunk, trusted),
+        "leave": lambda chunk: managers["leave"].ingest_leave_requests(chunk, trusted),
+        "leave_balances": lambda chunk: managers["leave"].ingest_leave_balances(chunk, trusted),
+    }
+    if kind not in ingest:
+        raise ValueError(f"Unknown record kind '{kind}'; expected one of {', '.join(ingest)}.")
+    if trusted and file_format(path, fmt) == "csv":
+        # Every CSV value is text, so numbers and lists would be stored unconverted.
+        raise ValueError("trusted=True is not supported for CSV files; they must be validated.")
+    records = chunks = 0
+    for chunk in iter_chunks(path, chunk_size, fmt):
+        try:
+            ingest[kind](chunk)
+        except ValueError as e:
+            raise ValueError(f"Chunk {chunks + 1} of {path} was not loaded: {e} "
+                             f"The {chunks} chunk(s) before it ({records} records) were loaded.") from e
+        records += len(chunk)
+        chunks += 1
+    summary = {"kind": kind, "records": records, "chunks": chunks}
+    if kind == "employees":
+        summary["unresolved_managers"] = managers["employee"].resolve_manager_links()
+    return summary
+
+
+def _ingest_employees(chunk: List[Dict], managers: Dict, trusted: bool) -> None:
+    managers["employee"].ingest_employees(chunk, trusted, defer_unknown_managers=True)
+    if managers.get("leave") is not None:
+        managers["leave"].open_accounts([r["emp_id"] for r in chunk])
+
+
+def export_file(kind: str, path: str, managers: Dict, chunk_size: int = 5000, fmt: Optional[str] = None) -> Dict:
+    """
+    Stream every record of one kind from its manager to a file.
+    """
+    sources = {
+        "employees": lambda: managers["employee"].iter_employees(),
+        "tickets": lambda: managers["ticket"].iter_tickets(),
+        "trips": lambda: managers["business_trip"].iter_trips(),
+        "expenses": lambda: managers["business_trip"].iter_expenses(),
+        "meetings": lambda: managers["meeting"].iter_meetings(),
+        "leave": lambda: managers["leave"].iter_leave_requests(),
+        "leave_balances": lambda: managers["leave"].iter_leave_balances(),
+    }
+    if kind not in sources:
+        raise ValueError(f"Unknown record kind '{kind}'; expected one of {', '.join(sources)}.")
+    return {"kind": kind, "records": export_records(sources[kind](), path, fmt, chunk_size), "path": path}
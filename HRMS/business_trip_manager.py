@@ -1,14 +1,46 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime, date
-from HRMS.schemas import BusinessTripCreate, BusinessTripStatusUpdate, BusinessTripExpense
+from itertools import islice
+from HRMS.schemas import (BusinessTripCreate, BusinessTripStatusUpdate, BusinessTripExpense,
+                          BusinessTripCreateBatch, BusinessTripExpenseBatch, BusinessTripReadBatch,
+                          BusinessTripExpenseReadBatch, validate_batch)
+from HRMS.events import EventBus, EventPublisher
+from HRMS.archive import ColdStore
+from HRMS.availability import FREE_TRIP_STATUSES, AvailabilityIndex, day_span
+from HRMS.time_index import TimeIndex, TimeValue
+from HRMS.snapshot import CopyOnWrite, Snapshot
 
 
-class BusinessTripManager:
-    def __init__(self):
-        self.trips: List[Dict] = []
+class BusinessTripManager(EventPublisher):
+    # Trips in these statuses no longer change and may be archived with their expenses.
+    TERMINAL_STATUSES = ("Rejected", "Completed", "Cancelled")
+
+    def __init__(
+            self,
+            events: Optional[EventBus] = None,
+            trip_archive: Optional[ColdStore] = None,
+            expense_archive: Optional[ColdStore] = None,
+            availability: Optional[AvailabilityIndex] = None
+    ):
+        self.events = events
+        # When set, trips overlapping another trip or leave of the same employee are refused.
+        self.availability = availability
+        self.trip_archive = trip_archive
+        self.expense_archive = expense_archive
+        # Trip ID -> trip, in creation order. Expenses are never changed once added.
+        self.trips: Dict[str, Dict] = {}
         self.expenses: List[Dict] = []
+        self._cow = CopyOnWrite(self, "trips", "expenses")
+        self.time_indexes = {field: TimeIndex(field, "trip_id") for field in ("created_at", "updated_at", "start_date")}
         self._next_trip_id: int = 1
         self._next_expense_id: int = 1
+        # Archived trips and expenses keep their IDs across restarts, so new ones are numbered after them.
+        if trip_archive is not None:
+            for trip_id in trip_archive.ids("trip_id"):
+                self.skip_ids_to(trip_id=trip_id)
+        if expense_archive is not None:
+            for expense_id in expense_archive.ids("expense_id"):
+                self.skip_ids_to(expense_id=expense_id)
 
     def create_trip(self, req: BusinessTripCreate) -> str:
         """
@@ -16,80 +48,218 @@ class BusinessTripManager:
         """
         if req.start_date >= req.end_date:
             raise ValueError("Start date must be before end date.")
-        
+        self._check_available(req.emp_id, req.start_date, req.end_date)
+
+        trip = self._new_trip(req.model_dump(mode="json"))
+        return f"Business trip {trip['trip_id']} created for {req.emp_id} to {req.destination}."
+
+    def _check_available(self, emp_id: str, start_date, end_date) -> None:
+        if self.availability is not None:
+            self.availability.check(emp_id, *day_span(start_date, end_date), ("trip", "leave"),
+                                    f"trip from {start_date} to {end_date}")
+
+    def _new_trip(self, r: Dict, now: Optional[str] = None, index: bool = True) -> Dict:
         trip_id = f"TR{self._next_trip_id:03d}"
+        now = now or datetime.utcnow().isoformat()
         trip = {
             "trip_id": trip_id,
-            "emp_id": req.emp_id,
-            "destination": req.destination,
-            "purpose": req.purpose,
-            "start_date": req.start_date.isoformat(),
-            "end_date": req.end_date.isoformat(),
-            "estimated_cost": req.estimated_cost,
-            "manager_id": req.manager_id,
+            "emp_id": r["emp_id"],
+            "destination": r["destination"],
+            "purpose": r["purpose"],
+            "start_date": r["start_date"],
+            "end_date": r["end_date"],
+            "estimated_cost": r["estimated_cost"],
+            "manager_id": r.get("manager_id"),
             "status": "Pending",
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "approved_by": None,
             "approved_at": None
         }
-        self.trips.append(trip)
+        self._cow.writable("trips")[trip_id] = trip
+        if index:
+            for time_index in self.time_indexes.values():
+                time_index.add(trip)
         self._next_trip_id += 1
-        return f"Business trip {trip_id} created for {req.emp_id} to {req.destination}."
+        self._publish("trip.created", trip_id, trip["emp_id"], trip)
+        return trip
+
+    def ingest_trips(self, records: List[Dict], trusted: bool = False) -> List[str]:
+        """
+        Bulk-create trip requests from raw dicts and return their IDs.
+        The whole batch is validated in one pass; with trusted=True validation is
+        skipped and dates must already be ISO strings. Nothing is loaded if any
+        trip ends before it starts.
+        Records with a trip_id, as written by iter_trips, are restored as they were
+        (ID, status, approval and timestamps) and later IDs continue after them;
+        nothing is loaded if one of their IDs is already taken.
+        """
+        restored = [r for r in records if r.get("trip_id")]
+        records = [r for r in records if not r.get("trip_id")]
+        if not trusted:
+            records = validate_batch(BusinessTripCreateBatch, records)
+            restored = validate_batch(BusinessTripReadBatch, restored)
+        trip_ids = [r["trip_id"] for r in restored]
+        if len(set(trip_ids)) != len(trip_ids):
+            raise ValueError("Trip IDs in the batch are not unique.")
+        for trip_id in trip_ids:
+            if trip_id in self.trips:
+                raise ValueError(f"Trip '{trip_id}' already exists.")
+        for r in records + restored:
+            if r["start_date"] >= r["end_date"]:
+                raise ValueError("Start date must be before end date.")
+        if self.availability is not None:
+            last_end: Dict[str, str] = {}
+            blocking = records + [r for r in restored if r["status"] not in FREE_TRIP_STATUSES]
+            for r in sorted(blocking, key=lambda r: (r["emp_id"], r["start_date"])):
+                if r["emp_id"] in last_end and r["start_date"] <= last_end[r["emp_id"]]:
+                    raise ValueError(f"Conflict: trips for {r['emp_id']} in this batch overlap on {r['start_date']}.")
+                last_end[r["emp_id"]] = max(r["end_date"], last_end.get(r["emp_id"], r["end_date"]))
+                self._check_available(r["emp_id"], r["start_date"], r["end_date"])
+        now = datetime.utcnow().isoformat()
+        trips = [self._restore_trip(r) for r in restored]
+        trips += [self._new_trip(r, now, index=False) for r in records]
+        for time_index in self.time_indexes.values():
+            time_index.add_many(trips)
+        return [t["trip_id"] for t in trips]
+
+    def _restore_trip(self, r: Dict) -> Dict:
+        trip = {field: r.get(field) for field in ("trip_id", "emp_id", "destination", "purpose", "start_date",
+                                                  "end_date", "estimated_cost", "manager_id", "status", "created_at",
+                                                  "updated_at", "approved_by", "approved_at")}
+        self._cow.writable("trips")[trip["trip_id"]] = trip
+        self.skip_ids_to(trip_id=trip["trip_id"])
+        self._publish("trip.restored", trip["trip_id"], trip["emp_id"], trip)
+        return trip
+
+    def skip_ids_to(self, trip_id: Optional[str] = None, expense_id: Optional[str] = None) -> None:
+        """
+        Make sure new trips and expenses get IDs after the given ones, e.g. ones restored or archived earlier.
+        """
+        if trip_id:
+            self._next_trip_id = max(self._next_trip_id, int(trip_id[2:]) + 1)
+        if expense_id:
+            self._next_expense_id = max(self._next_expense_id, int(expense_id[3:]) + 1)
 
     def update_trip_status(self, req: BusinessTripStatusUpdate, trip_id: str) -> str:
         """
         Update the status of a business trip (approve, reject, etc.).
         """
-        for trip in self.trips:
-            if trip["trip_id"] == trip_id:
-                old_status = trip["status"]
-                trip["status"] = req.status
-                trip["updated_at"] = datetime.utcnow().isoformat()
-                
-                if req.status in ["Approved", "Rejected"] and req.approved_by:
-                    trip["approved_by"] = req.approved_by
-                    trip["approved_at"] = datetime.utcnow().isoformat()
-                
-                return f"Trip {trip_id} status updated from {old_status} to {req.status}."
-        
-        raise ValueError(f"Trip '{trip_id}' not found.")
+        trip = self._edit(trip_id)
+        old_status = trip["status"]
+        trip["status"] = req.status
+        self._touch(trip)
+
+        if req.status in ["Approved", "Rejected"] and req.approved_by:
+            trip["approved_by"] = req.approved_by
+            trip["approved_at"] = datetime.utcnow().isoformat()
+
+        self._publish("trip.status_changed", trip_id, trip["emp_id"], {**trip, "old_status": old_status})
+        return f"Trip {trip_id} status updated from {old_status} to {req.status}."
+
+    def _edit(self, trip_id: str) -> Dict:
+        # The trip may be shared with a snapshot, so change a copy of it where needed.
+        self.get_trip_details(trip_id)
+        return self._cow.writable_record("trips", trip_id)
+
+    def _touch(self, trip: Dict) -> None:
+        old = trip["updated_at"]
+        trip["updated_at"] = datetime.utcnow().isoformat()
+        self.time_indexes["updated_at"].move(trip["trip_id"], old, trip["updated_at"])
 
-    def get_trip_details(self, trip_id: str) -> Dict:
+    def reassign_approver(self, trip_id: str, manager_id: str) -> Dict:
+        """
+        Hand a pending trip to another approver, e.g. when the current one does not respond.
+        """
+        trip = self.get_trip_details(trip_id)
+        if trip["status"] != "Pending":
+            raise ValueError(f"Trip '{trip_id}' is {trip['status']}, not Pending.")
+        trip = self._edit(trip_id)
+        old_manager = trip["manager_id"]
+        trip["manager_id"] = manager_id
+        self._touch(trip)
+        self._publish("trip.escalated", trip_id, trip["emp_id"], {**trip, "old_manager_id": old_manager})
+        return trip
+
+    def get_trip_details(self, trip_id: str, include_archived: bool = False) -> Dict:
         """
         Get detailed information about a specific trip.
         """
-        for trip in self.trips:
-            if trip["trip_id"] == trip_id:
+        trip = self.trips.get(trip_id)
+        if trip is not None:
+            return trip
+        if include_archived and self.trip_archive is not None:
+            for trip in self.trip_archive.find("trip_id", [trip_id]):
                 return trip
         raise ValueError(f"Trip '{trip_id}' not found.")
 
+    def _time_index(self, order_by: str) -> TimeIndex:
+        if order_by not in self.time_indexes:
+            raise ValueError(f"Cannot order trips by {order_by}. Use one of: {', '.join(self.time_indexes)}.")
+        return self.time_indexes[order_by]
+
     def list_trips(
         self,
         employee_id: Optional[str] = None,
         status: Optional[str] = None,
-        manager_id: Optional[str] = None
+        manager_id: Optional[str] = None,
+        include_archived: bool = False,
+        since: Optional[TimeValue] = None,
+        until: Optional[TimeValue] = None,
+        order_by: str = "created_at",
+        newest_first: bool = True,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[Dict]:
         """
-        List trips with optional filters.
+        List trips with optional filters, newest first by default. Archived trips are only read
+        when include_archived is set. `order_by` is created_at, updated_at or start_date, and
+        since/until keep trips with since <= order_by < until, e.g. the trips starting next week.
+        For keyset pagination pass a `limit` and, for the next page, `after=cursor_for(last trip,
+        order_by)` with the same other arguments.
         """
-        results = self.trips
-        
+        extra = (self.trip_archive.iter_records(employee_id)
+                 if include_archived and self.trip_archive is not None else None)
+        results = self._time_index(order_by).query(self.trips, since, until, newest_first, after, extra)
         if employee_id:
-            results = [t for t in results if t["emp_id"] == employee_id]
+            results = (t for t in results if t["emp_id"] == employee_id)
         if status:
-            results = [t for t in results if t["status"].lower() == status.lower()]
+            results = (t for t in results if t["status"].lower() == status.lower())
         if manager_id:
-            results = [t for t in results if t["manager_id"] == manager_id]
-        
-        return sorted(results, key=lambda x: x["created_at"], reverse=True)
+            results = (t for t in results if t["manager_id"] == manager_id)
+        return list(islice(results, limit))
+
+    def cursor_for(self, trip: Dict, order_by: str = "created_at") -> str:
+        """
+        Keyset cursor for the page after `trip` in list_trips ordered by `order_by`.
+        """
+        return self._time_index(order_by).cursor(trip)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Point-in-time view of the trips and expenses (`snap.trips`, `snap.expenses`) in O(1);
+        release it when done.
+        """
+        return self._cow.snapshot()
+
+    def iter_trips(self) -> Iterator[Dict]:
+        """
+        Iterate a snapshot of the trips, so writes made meanwhile neither wait nor show up.
+        """
+        return self._cow.iter("trips")
+
+    def iter_expenses(self) -> Iterator[Dict]:
+        """
+        Iterate a snapshot of the expenses, like iter_trips.
+        """
+        return self._cow.iter("expenses")
 
     def get_pending_approvals(self, manager_id: str) -> List[Dict]:
         """
         Get all pending trip requests for a manager to approve.
         """
         return [
-            trip for trip in self.trips 
+            trip for trip in self.trips.values()
             if trip["manager_id"] == manager_id and trip["status"] == "Pending"
         ]
 
@@ -98,8 +268,7 @@ class BusinessTripManager:
         Add an expense to a business trip.
         """
         # Verify trip exists
-        trip_exists = any(trip["trip_id"] == req.trip_id for trip in self.trips)
-        if not trip_exists:
+        if req.trip_id not in self.trips:
             raise ValueError(f"Trip '{req.trip_id}' not found.")
         
         expense_id = f"EXP{self._next_expense_id:04d}"
@@ -112,22 +281,69 @@ class BusinessTripManager:
             "expense_date": req.expense_date.isoformat(),
             "created_at": datetime.utcnow().isoformat()
         }
-        self.expenses.append(expense)
+        self._cow.writable("expenses").append(expense)
         self._next_expense_id += 1
+        trip = self.get_trip_details(req.trip_id)
+        self._publish("expense.added", expense_id, trip["emp_id"], expense)
         return f"Expense {expense_id} added to trip {req.trip_id}."
 
-    def get_trip_expenses(self, trip_id: str) -> List[Dict]:
+    def ingest_expenses(self, records: List[Dict], trusted: bool = False) -> List[str]:
+        """
+        Bulk-add trip expenses from raw dicts and return their IDs.
+        Nothing is loaded if any expense refers to an unknown trip.
+        Records with an expense_id, as written by iter_expenses, keep their ID
+        and created_at; nothing is loaded if one of those IDs is already taken.
+        """
+        restored = [r for r in records if r.get("expense_id")]
+        records = [r for r in records if not r.get("expense_id")]
+        if not trusted:
+            records = validate_batch(BusinessTripExpenseBatch, records)
+            restored = validate_batch(BusinessTripExpenseReadBatch, restored)
+        records = restored + records
+        for r in records:
+            if r["trip_id"] not in self.trips:
+                raise ValueError(f"Trip '{r['trip_id']}' not found.")
+        if restored:
+            taken = {e["expense_id"] for e in self.expenses}
+            for r in restored:
+                if r["expense_id"] in taken:
+                    raise ValueError(f"Expense '{r['expense_id']}' already exists.")
+                taken.add(r["expense_id"])
+        now = datetime.utcnow().isoformat()
+        expenses = self._cow.writable("expenses")
+        expense_ids = []
+        for r in records:
+            expense_id = r.get("expense_id") or f"EXP{self._next_expense_id:04d}"
+            expense = {
+                "expense_id": expense_id,
+                "trip_id": r["trip_id"],
+                "expense_type": r["expense_type"],
+                "amount": r["amount"],
+                "description": r["description"],
+                "expense_date": r["expense_date"],
+                "created_at": r.get("created_at") or now
+            }
+            expenses.append(expense)
+            self.skip_ids_to(expense_id=expense_id)
+            self._publish("expense.added", expense_id, self.trips[r["trip_id"]]["emp_id"], expense)
+            expense_ids.append(expense_id)
+        return expense_ids
+
+    def get_trip_expenses(self, trip_id: str, include_archived: bool = False) -> List[Dict]:
         """
         Get all expenses for a specific trip.
         """
-        return [exp for exp in self.expenses if exp["trip_id"] == trip_id]
+        expenses = [exp for exp in self.expenses if exp["trip_id"] == trip_id]
+        if include_archived and self.expense_archive is not None:
+            expenses = self.expense_archive.find("trip_id", [trip_id]) + expenses
+        return expenses
 
-    def get_trip_summary(self, trip_id: str) -> Dict:
+    def get_trip_summary(self, trip_id: str, include_archived: bool = False) -> Dict:
         """
         Get a summary of trip details and total expenses.
         """
-        trip = self.get_trip_details(trip_id)
-        expenses = self.get_trip_expenses(trip_id)
+        trip = self.get_trip_details(trip_id, include_archived)
+        expenses = self.get_trip_expenses(trip_id, include_archived)
         
         total_expenses = sum(exp["amount"] for exp in expenses)
         estimated_cost = trip["estimated_cost"]
@@ -141,20 +357,49 @@ class BusinessTripManager:
             "expense_count": len(expenses)
         }
 
+    def archive_finished(self, older_than: datetime) -> List[str]:
+        """
+        Move trips in a terminal status, last updated before `older_than`, and their
+        expenses to the cold stores. Returns the archived trip IDs.
+        """
+        if self.trip_archive is None or self.expense_archive is None:
+            raise ValueError("No trip archive is configured.")
+        cutoff = older_than.isoformat()
+        stale = self.time_indexes["updated_at"].query(self.trips, until=older_than)
+        cold = [t for t in stale if t["status"] in self.TERMINAL_STATUSES]
+        if not cold:
+            return []
+        archived = {t["trip_id"] for t in cold}
+        owners = {t["trip_id"]: t["emp_id"] for t in cold}
+        # Expenses carry the trip's employee so archive reads can skip chunks by employee.
+        cold_expenses = [{**e, "emp_id": owners[e["trip_id"]]} for e in self.expenses if e["trip_id"] in archived]
+        # Expenses first: a trip is only dropped from memory once its expenses are safely on disk.
+        self.expense_archive.append(cold_expenses)
+        self.trip_archive.append(cold)
+        self._cow.assign("expenses", [e for e in self.expenses if e["trip_id"] not in archived])
+        self._cow.assign("trips", {tid: t for tid, t in self.trips.items() if tid not in archived})
+        for index in self.time_indexes.values():
+            index.remove_ids(archived)
+        trip_ids = [t["trip_id"] for t in cold]
+        self._publish("trip.archived", cutoff, None,
+                      {"trip_ids": trip_ids, "expense_ids": [e["expense_id"] for e in cold_expenses]})
+        return trip_ids
+
     def cancel_trip(self, trip_id: str, reason: str = "Cancelled by employee") -> str:
         """
         Cancel a business trip.
         """
-        for trip in self.trips:
-            if trip["trip_id"] == trip_id:
-                if trip["status"] in ["Completed", "Cancelled"]:
-                    raise ValueError(f"Cannot cancel trip in {trip['status']} status.")
-                
-                trip["status"] = "Cancelled"
-                trip["updated_at"] = datetime.utcnow().isoformat()
-                return f"Trip {trip_id} cancelled. Reason: {reason}"
-        
-        raise ValueError(f"Trip '{trip_id}' not found.")
+        trip = self.get_trip_details(trip_id)
+        if trip["status"] in ["Completed", "Cancelled"]:
+            raise ValueError(f"Cannot cancel trip in {trip['status']} status.")
+        trip = self._edit(trip_id)
+
+        old_status = trip["status"]
+        trip["status"] = "Cancelled"
+        self._touch(trip)
+        self._publish("trip.status_changed", trip_id, trip["emp_id"],
+                      {**trip, "old_status": old_status, "reason": reason})
+        return f"Trip {trip_id} cancelled. Reason: {reason}"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from HRMS.events import DomainEvent
+
+
+class ChangeLog:
+    """
+    Bounded, sequence-numbered record of every HRMS mutation.
+
+    Subscribe it synchronously to an EventBus; each event gets the next
+    sequence number. Entries live in a ring buffer, so reading the changes
+    after a sequence number costs O(limit) no matter how long the log is.
+    When a reader falls more than `capacity` changes behind, the oldest
+    entries are gone and the reader must resync from the full lists.
+    Sequence numbers start over with every log, e.g. after a restart, so
+    each log has a random `epoch` that readers keep with their cursor.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        if capacity <= 0:
+            raise ValueError("Change log capacity must be positive.")
+        self.capacity = capacity
+        self._entries: List[Optional[Dict]] = [None] * capacity
+        self._last_seq: int = 0
+        self.epoch = uuid.uuid4().hex
+        self._lock = threading.Lock()
+
+    def __call__(self, event: DomainEvent) -> None:
+        self.record(event)
+
+    def record(self, event: DomainEvent) -> int:
+        with self._lock:
+            self._last_seq += 1
+            seq = self._last_seq
+            self._entries[seq % self.capacity] = {
+                "seq": seq,
+                "type": event.type,
+                "entity_id": event.entity_id,
+                "emp_id": event.emp_id,
+                "timestamp": event.timestamp,
+                "data": event.data,
+            }
+            return seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def first_seq(self) -> int:
+        """
+        Oldest sequence number still held in the log.
+        """
+        return max(1, self._last_seq - self.capacity + 1)
+
+    def changes_since(self, seq: int = 0, limit: int = 500, epoch: Optional[str] = None) -> Dict:
+        """
+        Return up to `limit` changes with a sequence number greater than `seq`.
+
+        Pass the returned `next_seq` and `epoch` back to continue. `reset_required`
+        is set when changes after `seq` have already been evicted, or when `epoch`
+        is not this log's (or `seq` is ahead of the log) because the server
+        restarted; the reader should then reload everything and continue from
+        `last_seq` with the new epoch.
+        """
+        if seq < 0:
+            raise ValueError("Sequence number cannot be negative.")
+        if limit <= 0:
+            raise ValueError("Limit must be positive.")
+        with self._lock:
+            last_seq, first_seq = self._last_seq, self.first_seq
+            other_epoch = epoch is not None and epoch != self.epoch
+            reset_required = other_epoch or seq + 1 < first_seq or seq > last_seq
+            if other_epoch:
+                # Numbers from another epoch mean nothing here, so nothing is returned.
+                seq = last_seq
+            start = max(seq + 1, first_seq)
+            end = min(last_seq, start + limit - 1)
+            changes = [self._entries[s % self.capacity] for s in range(start, end + 1)]
+        if changes:
+            next_seq = end
+        else:
+            next_seq = last_seq if reset_required else seq
+        return {
+            "changes": changes,
+            "next_seq": next_seq,
+            "last_seq": last_seq,
+            "has_more": end < last_seq,
+            "reset_required": reset_required,
+            "epoch": self.epoch,
+        }
@@ -1,12 +1,23 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
+from datetime import date
 from difflib import get_close_matches
-from HRMS.schemas import EmployeeCreate
+from HRMS.schemas import EmployeeCreate, EmployeeCreateBatch, validate_batch
+from HRMS.events import EventBus, EventPublisher
+from HRMS.snapshot import CopyOnWrite, Snapshot
 
 
-class EmployeeManager:
-    def __init__(self):
+class EmployeeManager(EventPublisher):
+    def __init__(self, events: Optional[EventBus] = None):
+        self.events = events
         self.employees: Dict[str, Dict[str, str]] = {}
+        self._cow = CopyOnWrite(self, "employees")
         self.manager_map: Dict[str, Optional[str]] = {}
+        # Inverse of manager_map: direct reports per manager, top-level employees under None.
+        self._reports: Dict[Optional[str], List[str]] = {}
+        # Bumped on every change to the reporting lines, so derived views know when to rebuild.
+        self.hierarchy_version: int = 0
+        # Manager links from bulk loads whose manager had not been loaded yet.
+        self._pending_links: Dict[str, str] = {}
 
     def get_next_emp_id(self) -> str:
         """
@@ -17,6 +28,16 @@ class EmployeeManager:
         max_id = max(int(eid[1:]) for eid in self.employees.keys())
         return f"E{max_id + 1:03}"
 
+    def add_new_employee(self, name: str, manager_id: Optional[str] = None, email: Optional[str] = None) -> str:
+        """
+        Add an employee under the next free ID and return that ID.
+        Allocating and adding in one call keeps two callers, such as workers sharing a state
+        process, from being handed the same ID.
+        """
+        emp_id = self.get_next_emp_id()
+        self.add_employee(EmployeeCreate(emp_id=emp_id, name=name, manager_id=manager_id, email=email))
+        return emp_id
+
     def add_employee(self, emp: EmployeeCreate) -> None:
         """
         Add a new employee via Pydantic model.
@@ -27,8 +48,126 @@ class EmployeeManager:
             raise ValueError(f"Employee ID '{emp.emp_id}' already exists.")
         if manager_id and manager_id not in self.employees:
             raise ValueError(f"Manager ID '{manager_id}' does not exist.")
-        self.employees[emp.emp_id] = emp.model_dump()
-        self.manager_map[emp.emp_id] = manager_id
+        record = emp.model_dump()
+        record["hired_date"] = (emp.hired_date or date.today()).isoformat()
+        self._cow.writable("employees")[emp.emp_id] = record
+        self._set_link(emp.emp_id, manager_id)
+        self._publish("employee.added", emp.emp_id, emp.emp_id, self.employees[emp.emp_id])
+
+    def ingest_employees(self, records: List[Dict], trusted: bool = False,
+                         defer_unknown_managers: bool = False) -> int:
+        """
+        Bulk-load employees and return how many were added.
+        The whole batch is validated in one pass; with trusted=True validation is
+        skipped and records must already be in stored form (ISO date strings).
+        Managers may appear anywhere in the batch. Nothing is loaded if an ID is
+        duplicated or a manager is unknown, unless defer_unknown_managers is set:
+        then the employee is loaded without a manager and the link is kept for
+        resolve_manager_links(), for files where managers appear later.
+        """
+        if not trusted:
+            records = validate_batch(EmployeeCreateBatch, records)
+        batch_ids = set()
+        for r in records:
+            if r["emp_id"] in self.employees or r["emp_id"] in batch_ids:
+                raise ValueError(f"Employee ID '{r['emp_id']}' already exists.")
+            batch_ids.add(r["emp_id"])
+        deferred = set()
+        for r in records:
+            manager_id = r.get("manager_id")
+            if manager_id and manager_id not in self.employees and manager_id not in batch_ids:
+                if not defer_unknown_managers:
+                    raise ValueError(f"Manager ID '{manager_id}' does not exist.")
+                deferred.add(r["emp_id"])
+        self._check_batch_cycles({r["emp_id"]: r.get("manager_id") for r in records if r["emp_id"] not in deferred})
+        today = date.today().isoformat()
+        employees = self._cow.writable("employees")
+        for r in records:
+            manager_id = r.get("manager_id")
+            if r["emp_id"] in deferred:
+                self._pending_links[r["emp_id"]] = manager_id
+                manager_id = None
+            record = {
+                "emp_id": r["emp_id"],
+                "name": r["name"],
+                "manager_id": manager_id,
+                "email": r.get("email"),
+                "hired_date": r.get("hired_date") or today
+            }
+            employees[record["emp_id"]] = record
+            self._set_link(record["emp_id"], record["manager_id"])
+            self._publish("employee.added", record["emp_id"], record["emp_id"], record)
+        return len(records)
+
+    def _check_batch_cycles(self, links: Dict[str, Optional[str]]) -> None:
+        """
+        Raise ValueError if the manager links of a batch, together with the existing ones, form a cycle.
+        """
+        acyclic = set()
+        for emp_id in links:
+            path, current = [], emp_id
+            while current is not None and current not in acyclic:
+                if current in path:
+                    raise ValueError(f"Manager links of '{emp_id}' in the batch form a reporting cycle.")
+                path.append(current)
+                current = links[current] if current in links else self.manager_map.get(current)
+            acyclic.update(path)
+
+    def _set_link(self, emp_id: str, manager_id: Optional[str]) -> None:
+        if emp_id in self.manager_map:
+            self._reports[self.manager_map[emp_id]].remove(emp_id)
+        self.manager_map[emp_id] = manager_id
+        self._reports.setdefault(manager_id, []).append(emp_id)
+        self.hierarchy_version += 1
+
+    def set_manager(self, emp_id: str, manager_id: Optional[str]) -> None:
+        """
+        Change an employee's manager. Raises ValueError on unknown IDs or reporting cycles.
+        """
+        if emp_id not in self.employees:
+            raise ValueError(f"Employee ID '{emp_id}' not found.")
+        if manager_id is not None:
+            if manager_id not in self.employees:
+                raise ValueError(f"Manager ID '{manager_id}' does not exist.")
+            current, seen = manager_id, set()
+            # `seen` bounds the walk even if the existing links already contain a cycle.
+            while current is not None and current not in seen:
+                if current == emp_id:
+                    raise ValueError(f"Making '{manager_id}' the manager of '{emp_id}' creates a reporting cycle.")
+                seen.add(current)
+                current = self.manager_map.get(current)
+        old_manager = self.manager_map.get(emp_id)
+        self._cow.writable_record("employees", emp_id)["manager_id"] = manager_id
+        self._set_link(emp_id, manager_id)
+        self._publish("employee.manager_changed", emp_id, emp_id,
+                      {**self.employees[emp_id], "old_manager_id": old_manager})
+
+    def resolve_manager_links(self) -> Dict[str, str]:
+        """
+        Apply the manager links deferred by bulk loads.
+        Returns the links that still cannot be applied (unknown manager or cycle);
+        those employees are left without a manager.
+        """
+        unresolved = {}
+        pending, self._pending_links = self._pending_links, {}
+        for emp_id, manager_id in pending.items():
+            try:
+                self.set_manager(emp_id, manager_id)
+            except ValueError:
+                unresolved[emp_id] = manager_id
+        return unresolved
+
+    def snapshot(self) -> Snapshot:
+        """
+        Point-in-time view of the employees (`snap.employees`) in O(1); release it when done.
+        """
+        return self._cow.snapshot()
+
+    def iter_employees(self) -> Iterator[Dict[str, str]]:
+        """
+        Iterate a snapshot of the employees, so writes made meanwhile neither wait nor show up.
+        """
+        return self._cow.iter("employees")
 
     def get_manager(self, emp_id: str) -> str:
         """
@@ -42,6 +181,14 @@ class EmployeeManager:
         mgr = self.employees[mgr_id]
         return f"{mgr_id}: {mgr['name']}"
 
+    def get_manager_id(self, emp_id: str) -> Optional[str]:
+        """
+        Return the manager's ID, or None if the employee has no manager.
+        """
+        if emp_id not in self.employees:
+            raise ValueError(f"Employee ID '{emp_id}' not found.")
+        return self.manager_map.get(emp_id)
+
     def search_employee_by_name(self, name_query: str, n: int = 5, cutoff: float = 0.6) -> List[str]:
         matches = get_close_matches(name_query, [e["name"] for e in self.employees.values()], n=n, cutoff=cutoff)
         return [eid for eid, data in self.employees.items() if data["name"] in matches]
@@ -51,10 +198,42 @@ class EmployeeManager:
             raise ValueError(f"Employee ID '{emp_id}' not found.")
         return self.employees[emp_id]
 
+    def get_employees(self, emp_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Fetch several employees at once. Unknown IDs are left out of the result.
+        """
+        return {eid: self.employees[eid] for eid in emp_ids if eid in self.employees}
+
+    def get_hire_dates(self) -> Dict[str, Optional[str]]:
+        """
+        Map every employee ID to its ISO hire date (None when unknown).
+        """
+        return {eid: data.get("hired_date") for eid, data in self.employees.items()}
+
     def get_direct_reports(self, manager_id: str) -> List[str]:
         if manager_id not in self.employees:
             raise ValueError(f"Manager ID '{manager_id}' not found.")
-        return [eid for eid, mgr in self.manager_map.items() if mgr == manager_id]
+        return list(self._reports.get(manager_id, []))
+
+    def get_top_level_employees(self) -> List[str]:
+        """
+        Employees without a manager, i.e. the roots of the org chart.
+        """
+        return list(self._reports.get(None, []))
+
+    def remove_employee(self, emp_id: str) -> None:
+        """
+        Remove an employee. Raises ValueError if the employee still has direct reports.
+        """
+        if emp_id not in self.employees:
+            raise ValueError(f"Employee ID '{emp_id}' not found.")
+        if self._reports.get(emp_id):
+            raise ValueError(f"Employee ID '{emp_id}' still has direct reports.")
+        employee = self._cow.writable("employees").pop(emp_id)
+        self._reports[self.manager_map.pop(emp_id)].remove(emp_id)
+        self._reports.pop(emp_id, None)
+        self.hierarchy_version += 1
+        self._publish("employee.removed", emp_id, emp_id, employee)
 
 
 if __name__ == "__main__":
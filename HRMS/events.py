@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[["DomainEvent"], None]
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    type: str
+    entity_id: str
+    emp_id: Optional[str]
+    data: Dict[str, Any]
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for HRMS domain events.
+
+    Synchronous subscribers run inside `publish`, in the writer's thread, and
+    are meant for cheap bookkeeping. Asynchronous subscribers are fed from a
+    bounded queue by a background thread, so a write never waits on them; when
+    the queue is full the event is dropped for those subscribers and counted.
+    """
+
+    def __init__(self, max_queue: int = 10000):
+        self._sync: List[Tuple[Optional[Set[str]], Handler]] = []
+        self._async: List[Tuple[Optional[Set[str]], Handler]] = []
+        self._queue: "queue.Queue[Optional[DomainEvent]]" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self.dropped: int = 0
+
+    def subscribe(self, handler: Handler, event_types: Optional[Iterable[str]] = None,
+                  asynchronous: bool = False) -> None:
+        """
+        Register a handler for the given event types, or for every event if none are given.
+        """
+        types = set(event_types) if event_types is not None else None
+        if asynchronous:
+            self._async.append((types, handler))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="hrms-event-bus", daemon=True)
+                self._worker.start()
+        else:
+            self._sync.append((types, handler))
+
+    def publish(self, event: DomainEvent) -> None:
+        for types, handler in self._sync:
+            if types is None or event.type in types:
+                try:
+                    handler(event)
+                except Exception:
+                    logger.exception("Event handler %r failed on %s", handler, event.type)
+        if self._async:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                for types, handler in self._async:
+                    if types is None or event.type in types:
+                        try:
+                            handler(event)
+                        except Exception:
+                            logger.exception("Event handler %r failed on %s", handler, event.type)
+            finally:
+                self._queue.task_done()
+
+    def drain(self) -> None:
+        """
+        Block until every queued event has been delivered to the asynchronous subscribers.
+        """
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+
+class EventPublisher:
+    """
+    Mixin for managers that publish domain events when an event bus is attached.
+    """
+
+    events: Optional[EventBus] = None
+
+    def _publish(self, event_type: str, entity_id: str, emp_id: Optional[str], data: Dict[str, Any]) -> None:
+        if self.events is not None:
+            self.events.publish(DomainEvent(event_type, entity_id, emp_id, dict(data)))
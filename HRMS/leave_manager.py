@@ -1,34 +1,221 @@
 from collections import defaultdict
-from typing import Dict
+from datetime import date
+from typing import Dict, Iterator, List, Optional
 
-from HRMS.schemas import LeaveApplyRequest
+from HRMS.schemas import (LeaveApplyRequest, LeavePolicy, LeaveApplyRequestBatch, LeaveBalanceBatch,
+                          LeaveRequestReadBatch, validate_batch)
+from HRMS.events import EventBus, EventPublisher
+from HRMS.leave_accrual import AccrualEngine, HolidayCalendar
 
+DEFAULT_POLICIES = [
+    LeavePolicy(leave_type="Annual", annual_entitlement=20, carry_over_cap=5),
+    LeavePolicy(leave_type="Sick", annual_entitlement=10, carry_over_cap=0),
+]
 
-class LeaveManager:
-    def __init__(self):
-        self.employee_leaves: Dict[str, Dict] = defaultdict(
-            lambda: {"balance": 20, "history": []}
-        )
+
+class LeaveManager(EventPublisher):
+    def __init__(
+            self,
+            events: Optional[EventBus] = None,
+            policies: Optional[List[LeavePolicy]] = None,
+            calendar: Optional[HolidayCalendar] = None
+    ):
+        self.events = events
+        self.policies: Dict[str, LeavePolicy] = {p.leave_type: p for p in (policies or DEFAULT_POLICIES)}
+        self.calendar = calendar or HolidayCalendar()
+        self.accrual_engine = AccrualEngine(self.policies.values())
+        self.employee_leaves: Dict[str, Dict] = defaultdict(self._new_entry)
+        self._next_request_id: int = 1
+
+    def _new_entry(self) -> Dict:
+        # Monthly-accrual leave is earned from the hire month on through run_accrual; annual leave
+        # is granted up front, as rollover grants it each year.
+        return {
+            "balances": {t: p.annual_entitlement if p.accrual == "annual" else 0.0
+                         for t, p in self.policies.items()},
+            "history": []
+        }
+
+    def open_accounts(self, emp_ids: List[str]) -> int:
+        """
+        Open leave accounts for employees without leave data and return how many were added.
+        Annual-accrual types start at the full entitlement, monthly-accrual types at zero.
+        """
+        added = 0
+        for emp_id in emp_ids:
+            if emp_id not in self.employee_leaves:
+                self.employee_leaves[emp_id] = self._new_entry()
+                added += 1
+        return added
 
     def get_leave_balance(self, employee_id: str) -> str:
         data = self.employee_leaves.get(employee_id)
         if data:
-            return f"{employee_id} has {data['balance']} leave days remaining."
+            balances = ", ".join(f"{t}: {b:g}" for t, b in data["balances"].items())
+            return f"{employee_id} has the following leave days remaining: {balances}."
         return "Employee ID not found."
 
     def apply_leave(self, req: LeaveApplyRequest) -> str:
+        """
+        Apply for leave. Only business days are charged; weekends and holidays
+        in the request are skipped.
+        """
         employee_id = req.emp_id
-        leave_dates = [d.isoformat() for d in req.leave_dates]
         if employee_id not in self.employee_leaves:
             return "Employee ID not found."
+        if req.leave_type not in self.policies:
+            return f"Unknown leave type '{req.leave_type}'."
+        requested_dates = sorted(set(req.leave_dates))
+        leave_dates = self.calendar.business_days(requested_dates)
+        skipped = len(requested_dates) - len(leave_dates)
+        if not leave_dates:
+            return "No business days in the requested dates."
         requested = len(leave_dates)
-        available = self.employee_leaves[employee_id]["balance"]
+        balances = self.employee_leaves[employee_id]["balances"]
+        available = balances.get(req.leave_type, 0)
         if available < requested:
-            return f"Insufficient leave balance: requested {requested}, available {available}."
-        self.employee_leaves[employee_id]["balance"] -= requested
-        self.employee_leaves[employee_id]["history"].extend(leave_dates)
-        return (f"Leave applied for {requested} day(s). Remaining balance: "
-                f"{self.employee_leaves[employee_id]['balance']}")
+            return f"Insufficient {req.leave_type} leave balance: requested {requested}, available {available:g}."
+        self._record_leave(employee_id, req.leave_type, leave_dates)
+        skipped_note = f" {skipped} weekend/holiday day(s) were not charged." if skipped else ""
+        return (f"{req.leave_type} leave applied for {requested} day(s). Remaining balance: "
+                f"{balances[req.leave_type]:g}.{skipped_note}")
+
+    def _record_leave(self, employee_id: str, leave_type: str, leave_dates: List[date]) -> None:
+        balances = self.employee_leaves[employee_id]["balances"]
+        balances[leave_type] = balances.get(leave_type, 0) - len(leave_dates)
+        history = self.employee_leaves[employee_id]["history"]
+        request_id = self._next_request_id
+        self._next_request_id += 1
+        for leave_date in leave_dates:
+            history.append({
+                "history_id": len(history) + 1,
+                "emp_id": employee_id,
+                "leave_date": leave_date,
+                "request_id": request_id,
+                "leave_type": leave_type
+            })
+        self._publish("leave.applied", employee_id, employee_id, {
+            "request_id": request_id,
+            "leave_type": leave_type,
+            "leave_dates": [d.isoformat() for d in leave_dates],
+            "balance": balances[leave_type],
+        })
+
+    def ingest_leave_requests(self, records: List[Dict], trusted: bool = False) -> int:
+        """
+        Bulk-apply leave requests from raw dicts and return how many were applied.
+        The whole batch is validated in one pass unless trusted=True. Balances are
+        checked for the batch as a whole, so nothing is applied if any employee
+        would go negative.
+        Records with a request_id, as written by iter_leave_requests, are leave
+        already taken: they are added to the history as they are, without charging
+        the balance (restore balances with ingest_leave_balances), and nothing is
+        loaded if one of their request IDs is already in the employee's history.
+        """
+        restored = [r for r in records if r.get("request_id") is not None]
+        records = [r for r in records if r.get("request_id") is None]
+        if not trusted:
+            records = validate_batch(LeaveApplyRequestBatch, records)
+            restored = validate_batch(LeaveRequestReadBatch, restored)
+        seen = set()
+        for r in restored:
+            emp_id = r["emp_id"]
+            if emp_id not in self.employee_leaves:
+                raise ValueError(f"Employee ID '{emp_id}' not found.")
+            key = (emp_id, r["request_id"])
+            if key in seen or any(h["request_id"] == r["request_id"] for h in self.employee_leaves[emp_id]["history"]):
+                raise ValueError(f"Leave request {r['request_id']} of {emp_id} already exists.")
+            seen.add(key)
+        planned, demand = [], {}
+        for r in records:
+            emp_id, leave_type = r["emp_id"], r.get("leave_type", "Annual")
+            if emp_id not in self.employee_leaves:
+                raise ValueError(f"Employee ID '{emp_id}' not found.")
+            if leave_type not in self.policies:
+                raise ValueError(f"Unknown leave type '{leave_type}'.")
+            dates = sorted({d if isinstance(d, date) else date.fromisoformat(d) for d in r["leave_dates"]})
+            days = self.calendar.business_days(dates)
+            planned.append((emp_id, leave_type, days))
+            demand[(emp_id, leave_type)] = demand.get((emp_id, leave_type), 0) + len(days)
+        for (emp_id, leave_type), requested in demand.items():
+            available = self.employee_leaves[emp_id]["balances"].get(leave_type, 0)
+            if available < requested:
+                raise ValueError(f"Insufficient {leave_type} leave balance for {emp_id}: "
+                                 f"requested {requested}, available {available:g}.")
+        for r in restored:
+            self._restore_leave(r)
+        for emp_id, leave_type, days in planned:
+            if days:
+                self._record_leave(emp_id, leave_type, days)
+        return len(planned) + len(restored)
+
+    def _restore_leave(self, r: Dict) -> None:
+        emp_id, leave_type = r["emp_id"], r.get("leave_type", "Annual")
+        dates = sorted({d if isinstance(d, date) else date.fromisoformat(d) for d in r["leave_dates"]})
+        history = self.employee_leaves[emp_id]["history"]
+        for leave_date in dates:
+            history.append({
+                "history_id": len(history) + 1,
+                "emp_id": emp_id,
+                "leave_date": leave_date,
+                "request_id": r["request_id"],
+                "leave_type": leave_type
+            })
+        self._next_request_id = max(self._next_request_id, r["request_id"] + 1)
+        self._publish("leave.restored", emp_id, emp_id, {
+            "request_id": r["request_id"],
+            "leave_type": leave_type,
+            "leave_dates": [d.isoformat() for d in dates],
+            "balance": self.employee_leaves[emp_id]["balances"].get(leave_type, 0),
+        })
+
+    def iter_leave_balances(self) -> Iterator[Dict]:
+        """
+        Yield every employee's balance per leave type, shaped like LeaveBalance.
+        """
+        for emp_id, data in self.employee_leaves.items():
+            for leave_type, balance in data["balances"].items():
+                yield {"emp_id": emp_id, "leave_type": leave_type, "balance": balance}
+
+    def ingest_leave_balances(self, records: List[Dict], trusted: bool = False) -> int:
+        """
+        Set balances from raw dicts, e.g. the output of iter_leave_balances, and return how many were set.
+        Nothing is set if an employee or leave type is unknown.
+        """
+        if not trusted:
+            records = validate_batch(LeaveBalanceBatch, records)
+        for r in records:
+            if r["emp_id"] not in self.employee_leaves:
+                raise ValueError(f"Employee ID '{r['emp_id']}' not found.")
+            if r.get("leave_type", "Annual") not in self.policies:
+                raise ValueError(f"Unknown leave type '{r.get('leave_type')}'.")
+        changed: Dict[str, Dict[str, float]] = {}
+        for r in records:
+            balances = self.employee_leaves[r["emp_id"]]["balances"]
+            balances[r.get("leave_type", "Annual")] = r["balance"]
+            changed[r["emp_id"]] = dict(balances)
+        self._publish("leave.balances_set", "balances", None, {"balances": changed})
+        return len(records)
+
+    def iter_leave_requests(self) -> Iterator[Dict]:
+        """
+        Yield the leave history grouped into requests shaped like LeaveApplyRequest.
+        """
+        for emp_id, data in self.employee_leaves.items():
+            current = None
+            for record in data["history"]:
+                if current is None or record["request_id"] != current["request_id"]:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "emp_id": emp_id,
+                        "request_id": record["request_id"],
+                        "leave_type": record.get("leave_type", "Annual"),
+                        "leave_dates": []
+                    }
+                current["leave_dates"].append(record["leave_date"].isoformat())
+            if current is not None:
+                yield current
 
     def get_leave_history(self, employee_id: str) -> str:
         data = self.employee_leaves.get(employee_id)
@@ -38,6 +225,36 @@ class LeaveManager:
             return f"Leave history for {employee_id}: {', '.join(dates)}."
         return "Employee ID not found."
 
+    def run_accrual(self, as_of: date, hire_dates: Dict[str, Optional[str]], months: int = 1) -> Dict:
+        """
+        Credit monthly accruals to every employee for the `months` months ending at `as_of`,
+        skipping months already credited.
+        hire_dates maps employee IDs to ISO hire dates, as returned by EmployeeManager.get_hire_dates().
+        """
+        before = self._balances()
+        summary = self.accrual_engine.accrue(self.employee_leaves, hire_dates, as_of, months)
+        self._publish("leave.accrued", as_of.isoformat(), None,
+                      {**summary, "balances": self._changed_balances(before)})
+        return summary
+
+    def run_rollover(self, year_end: date, hire_dates: Dict[str, Optional[str]]) -> Dict:
+        """
+        Apply the year-end carry-over caps and grant annual entitlements.
+        """
+        before = self._balances()
+        summary = self.accrual_engine.rollover(self.employee_leaves, hire_dates, year_end)
+        self._publish("leave.rolled_over", year_end.isoformat(), None,
+                      {**summary, "balances": self._changed_balances(before)})
+        return summary
+
+    def _balances(self) -> Dict[str, Dict[str, float]]:
+        return {emp_id: dict(data["balances"]) for emp_id, data in self.employee_leaves.items()}
+
+    def _changed_balances(self, before: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        # Events carry the new balances of every employee a run changed, as leave.balances_set does.
+        return {emp_id: balances for emp_id, balances in self._balances().items() if balances != before.get(emp_id)}
+
+
 if __name__ == "__main__":
     lm = LeaveManager()
-    print(lm.get_leave_history("E004"))
\ No newline at end of file
+    print(lm.get_leave_history("E004"))
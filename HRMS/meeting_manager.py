@@ -1,28 +1,236 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Set
 from collections import defaultdict
-from datetime import datetime
-from HRMS.schemas import MeetingCreate, MeetingCancelRequest
+from datetime import datetime, timedelta
+from HRMS.schemas import MeetingCreate, MeetingCancelRequest, MeetingCreateBatch, validate_batch
+from HRMS.events import EventBus, EventPublisher
+from HRMS.transaction import Transaction
+from HRMS.availability import AvailabilityIndex, to_datetime
+from HRMS.recurrence import MeetingSeries, first_clash
 
-class MeetingManager:
-    def __init__(self):
+class MeetingManager(EventPublisher):
+    # How far ahead get_meetings lists recurring meetings when no end is given.
+    LISTING_HORIZON = timedelta(days=90)
+
+    def __init__(self, events: Optional[EventBus] = None, availability: Optional[AvailabilityIndex] = None):
+        self.events = events
+        # When set, meetings during a trip, on leave or overlapping another meeting are refused.
+        self.availability = availability
         self.meetings: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+        # Recurring meetings per employee, stored once as their rule however often they occur.
+        self.series: Dict[str, Dict[str, MeetingSeries]] = defaultdict(dict)
+        self._next_series_id: int = 1
+
+    def _check_available(self, emp_id: str, dt: datetime, ignore: Optional[str] = None) -> None:
+        if self.availability is not None:
+            self.availability.check(emp_id, dt, dt + self.availability.meeting_length,
+                                    ("trip", "leave", "meeting"), f"meeting at {dt.isoformat()}", ignore)
+
+    def _one_off_times(self, emp_id: str) -> Set[datetime]:
+        return {to_datetime(m["date"]) for m in self.meetings.get(emp_id, [])}
+
+    def _candidate(self, emp_id: str, meeting_dt, topic: str, recurrence: Optional[Dict] = None,
+                   series_id: str = "") -> MeetingSeries:
+        # A one-off meeting is checked as a series with a single occurrence.
+        if recurrence is None:
+            return MeetingSeries(series_id, emp_id, meeting_dt, topic, "daily", count=1)
+        return MeetingSeries.from_record({"series_id": series_id, "emp_id": emp_id, "meeting_dt": meeting_dt,
+                                          "topic": topic, "recurrence": recurrence})
+
+    def _check_free(self, candidate: MeetingSeries, taken: Optional[Set[datetime]] = None,
+                    others: Optional[List[MeetingSeries]] = None, ignore: Optional[str] = None,
+                    availability: bool = True) -> None:
+        """
+        Raise ValueError if an occurrence of `candidate` starts with another meeting of the employee
+        or, with an availability index and unless availability=False, overlaps a trip, leave or
+        meeting, however far ahead.
+        """
+        emp_id = candidate.emp_id
+        if taken is None:
+            taken = self._one_off_times(emp_id)
+        if others is None:
+            others = list(self.series.get(emp_id, {}).values())
+        clash = first_clash(candidate, taken, others)
+        if clash is not None:
+            raise ValueError(f"Conflict: {emp_id} already has a meeting at {clash.isoformat()}.")
+        if availability:
+            self._check_occurrences_available(candidate, ignore)
+
+    def _check_occurrences_available(self, candidate: MeetingSeries, ignore: Optional[str] = None) -> None:
+        # A single meeting is one lookup; a series is tested against every booking instead.
+        if self.availability is None:
+            return
+        if candidate.count == 1:
+            self._check_available(candidate.emp_id, candidate.start, ignore)
+        else:
+            self.availability.check_series(candidate)
+
+    def has_meeting(self, emp_id: str, meeting_dt, topic: Optional[str] = None) -> bool:
+        """
+        Whether the employee has a one-off meeting or an occurrence of a recurring one at meeting_dt,
+        and with a topic, one about that topic.
+        """
+        dt = to_datetime(meeting_dt)
+        if topic is None and dt in self._one_off_times(emp_id):
+            return True
+        if topic is not None and any(to_datetime(m["date"]) == dt and m["topic"] == topic
+                                     for m in self.meetings.get(emp_id, [])):
+            return True
+        return any(s.occurs_at(dt) and topic in (None, s.topic) for s in self.series.get(emp_id, {}).values())
 
     def schedule_meeting(self, req: MeetingCreate) -> str:
+        if req.recurrence is not None:
+            return self._schedule_series(req)
         dt_str = req.meeting_dt.isoformat()
         try:
             datetime.fromisoformat(dt_str)
         except ValueError:
             raise ValueError("Invalid datetime format; use ISO format.")
         emp_id = req.emp_id
-        if any(m["date"] == dt_str for m in self.meetings[emp_id]):
-            raise ValueError(f"Conflict: {emp_id} already has a meeting at {dt_str}.")
+        self._check_free(self._candidate(emp_id, req.meeting_dt, req.topic))
         self.meetings[emp_id].append({"date": dt_str, "topic": req.topic})
+        self._publish("meeting.scheduled", f"{emp_id}@{dt_str}", emp_id, {"date": dt_str, "topic": req.topic})
         return f"Meeting scheduled for {emp_id} on {dt_str} about '{req.topic}'."
 
-    def get_meetings(self, employee_id: str) -> List[Dict[str, str]]:
-        return sorted(self.meetings.get(employee_id, []), key=lambda m: m["date"])
+    def _schedule_series(self, req: MeetingCreate) -> str:
+        series = self._candidate(req.emp_id, req.meeting_dt, req.topic, req.recurrence.model_dump(mode="json"),
+                                 f"{req.emp_id}-S{self._next_series_id}")
+        self._check_free(series)
+        self._add_series(series)
+        return (f"Recurring meeting {series.series_id} scheduled for {req.emp_id} from {series.start.isoformat()}, "
+                f"{series.describe()}, about '{req.topic}'.")
+
+    def _add_series(self, series: MeetingSeries) -> None:
+        self.series[series.emp_id][series.series_id] = series
+        self._next_series_id += 1
+        self._publish("meeting.series_scheduled", series.series_id, series.emp_id, series.to_record())
+
+    def schedule_meetings(self, reqs: List[MeetingCreate]) -> List[str]:
+        """
+        Schedule several meetings at once; either every meeting is scheduled or none is.
+        Meetings starting together are found before anything is scheduled. Overlaps with
+        earlier meetings of the batch only show in the availability index once those are
+        scheduled, so the meetings are scheduled in a Transaction that is rolled back on
+        any conflict.
+        """
+        taken: Dict[str, Set[datetime]] = {}
+        others: Dict[str, List[MeetingSeries]] = {}
+        for req in reqs:
+            recurrence = req.recurrence.model_dump(mode="json") if req.recurrence is not None else None
+            self._check_batch_item(self._candidate(req.emp_id, req.meeting_dt, req.topic, recurrence,
+                                                   "new" if recurrence else ""), taken, others)
+        results = []
+        with Transaction() as txn:
+            for req in reqs:
+                series_id = f"{req.emp_id}-S{self._next_series_id}"
+                results.append(self.schedule_meeting(req))
+                if req.recurrence is not None:
+                    txn.on_rollback(self.cancel_meeting_series, req.emp_id, series_id)
+                else:
+                    txn.on_rollback(self.cancel_meeting, MeetingCancelRequest(
+                        emp_id=req.emp_id, meeting_dt=req.meeting_dt, topic=req.topic))
+        return results
+
+    def _check_batch_item(self, candidate: MeetingSeries, taken: Dict[str, Set[datetime]],
+                          others: Dict[str, List[MeetingSeries]], availability: bool = True) -> None:
+        # `taken` and `others` carry each employee's meetings plus the batch items checked so far.
+        emp_id = candidate.emp_id
+        if emp_id not in taken:
+            taken[emp_id] = self._one_off_times(emp_id)
+            others[emp_id] = list(self.series.get(emp_id, {}).values())
+        self._check_free(candidate, taken[emp_id], others[emp_id], availability=availability)
+        if candidate.count == 1 and not candidate.series_id:
+            taken[emp_id].add(candidate.start)
+        else:
+            others[emp_id].append(candidate)
+
+    def ingest_meetings(self, records: List[Dict], trusted: bool = False) -> int:
+        """
+        Bulk-load meetings from raw dicts and return how many were added.
+        The whole batch is validated in one pass unless trusted=True, in which case
+        meeting_dt must already be an ISO string. Nothing is loaded on any conflict:
+        meetings starting together are found first, and overlaps in the availability
+        index, which also cover earlier meetings of the batch, roll the batch back.
+        Records with a `recurrence` are loaded as recurring meetings.
+        """
+        if not trusted:
+            records = validate_batch(MeetingCreateBatch, records)
+        taken: Dict[str, Set[datetime]] = {}
+        others: Dict[str, List[MeetingSeries]] = {}
+        candidates = []
+        for r in records:
+            # Batch series get a placeholder ID so they are told apart from one-off meetings.
+            candidate = self._candidate(r["emp_id"], r["meeting_dt"], r["topic"], r.get("recurrence"),
+                                        "new" if r.get("recurrence") else "")
+            self._check_batch_item(candidate, taken, others, availability=False)
+            candidates.append(candidate)
+        with Transaction() as txn:
+            for r, candidate in zip(records, candidates):
+                self._check_occurrences_available(candidate)
+                if r.get("recurrence"):
+                    series_id = f"{r['emp_id']}-S{self._next_series_id}"
+                    self._add_series(self._candidate(r["emp_id"], r["meeting_dt"], r["topic"], r["recurrence"],
+                                                     series_id))
+                    txn.on_rollback(self.cancel_meeting_series, r["emp_id"], series_id)
+                    continue
+                meeting = {"date": r["meeting_dt"], "topic": r["topic"]}
+                self.meetings[r["emp_id"]].append(meeting)
+                self._publish("meeting.scheduled", f"{r['emp_id']}@{r['meeting_dt']}", r["emp_id"], meeting)
+                txn.on_rollback(self.cancel_meeting, MeetingCancelRequest(
+                    emp_id=r["emp_id"], meeting_dt=r["meeting_dt"], topic=r["topic"]))
+        return len(records)
+
+    def iter_meetings(self) -> Iterator[Dict]:
+        """
+        Yield every meeting as a flat record shaped like MeetingCreate. A recurring meeting is
+        one record with its rule in `recurrence` (and its `series_id`), not one per occurrence.
+        """
+        # Series come first so exports with typed columns (Parquet) see a rule before any empty one.
+        for series in self.series.values():
+            for s in series.values():
+                yield s.to_record()
+        for emp_id, meetings in self.meetings.items():
+            for m in meetings:
+                yield {"emp_id": emp_id, "meeting_dt": m["date"], "topic": m["topic"], "recurrence": None}
+
+    def get_meetings(self, employee_id: str, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> List[Dict[str, str]]:
+        """
+        The employee's meetings with since <= date < until, in date order. Recurring meetings are
+        expanded within the window, up to LISTING_HORIZON ahead when no `until` is given; each
+        occurrence carries its `series_id`, and `moved_from` if it was moved.
+        """
+        lo = None if since is None else to_datetime(since)
+        hi = None if until is None else to_datetime(until)
+        meetings = [m for m in self.meetings.get(employee_id, [])
+                    if (lo is None or to_datetime(m["date"]) >= lo) and (hi is None or to_datetime(m["date"]) < hi)]
+        if hi is None:
+            hi = max(datetime.now(), lo or datetime.min) + self.LISTING_HORIZON
+        for series in self.series.get(employee_id, {}).values():
+            for start, original in series.instances(lo, hi):
+                occurrence = {"date": start.isoformat(), "topic": series.topic, "series_id": series.series_id}
+                if start != original:
+                    occurrence["moved_from"] = original.isoformat()
+                meetings.append(occurrence)
+        return sorted(meetings, key=lambda m: m["date"])
+
+    def get_meeting_series(self, emp_id: str, series_id: str) -> Dict:
+        series = self.series.get(emp_id, {}).get(series_id)
+        if series is None:
+            raise ValueError(f"Recurring meeting '{series_id}' not found for {emp_id}.")
+        return series.to_record()
+
+    def _find_occurrence(self, emp_id: str, dt: datetime, topic: Optional[str]):
+        for series in self.series.get(emp_id, {}).values():
+            if topic is None or series.topic == topic:
+                original = series.original_of(dt)
+                if original is not None:
+                    return series, original
+        return None, None
 
     def cancel_meeting(self, req: MeetingCancelRequest) -> str:
+        """
+        Cancel a one-off meeting, or the single occurrence of a recurring meeting at that time.
+        """
         emp_id = req.emp_id
         dt_str = req.meeting_dt.isoformat()
         original = list(self.meetings.get(emp_id, []))
@@ -30,5 +238,49 @@ class MeetingManager:
             m["date"] == dt_str and (req.topic is None or m["topic"] == req.topic)
         )]
         if len(self.meetings[emp_id]) == len(original):
-            raise ValueError("No matching meeting to cancel.")
-        return f"Canceled meeting for {emp_id} on {dt_str}{f' about {req.topic}' if req.topic else ''}."
\ No newline at end of file
+            series, occurrence = self._find_occurrence(emp_id, req.meeting_dt, req.topic)
+            if series is None:
+                raise ValueError("No matching meeting to cancel.")
+            series.skip(occurrence)
+            self._publish("meeting.series_updated", series.series_id, emp_id, series.to_record())
+            return f"Canceled the {dt_str} occurrence of recurring meeting {series.series_id} for {emp_id}."
+        for m in original:
+            if m["date"] == dt_str and (req.topic is None or m["topic"] == req.topic):
+                self._publish("meeting.cancelled", f"{emp_id}@{dt_str}", emp_id, m)
+        return f"Canceled meeting for {emp_id} on {dt_str}{f' about {req.topic}' if req.topic else ''}."
+
+    def cancel_meeting_series(self, emp_id: str, series_id: str) -> str:
+        """
+        Cancel every occurrence of a recurring meeting.
+        """
+        series = self.series.get(emp_id, {}).pop(series_id, None)
+        if series is None:
+            raise ValueError(f"Recurring meeting '{series_id}' not found for {emp_id}.")
+        self._publish("meeting.series_cancelled", series_id, emp_id, series.to_record())
+        return f"Canceled recurring meeting {series_id} for {emp_id}."
+
+    def move_meeting(self, emp_id: str, meeting_dt: datetime, new_dt: datetime, topic: Optional[str] = None) -> str:
+        """
+        Move a one-off meeting, or one occurrence of a recurring meeting, to another time.
+        """
+        dt_str, new_str = meeting_dt.isoformat(), new_dt.isoformat()
+        for m in self.meetings.get(emp_id, []):
+            if m["date"] == dt_str and (topic is None or m["topic"] == topic):
+                taken = self._one_off_times(emp_id) - {to_datetime(dt_str)}
+                self._check_free(self._candidate(emp_id, new_dt, m["topic"]), taken, ignore=f"{emp_id}@{dt_str}")
+                self.meetings[emp_id].remove(m)
+                self._publish("meeting.cancelled", f"{emp_id}@{dt_str}", emp_id, m)
+                moved = {**m, "date": new_str}
+                self.meetings[emp_id].append(moved)
+                self._publish("meeting.scheduled", f"{emp_id}@{new_str}", emp_id, moved)
+                return f"Moved meeting for {emp_id} from {dt_str} to {new_str}."
+        series, original = self._find_occurrence(emp_id, meeting_dt, topic)
+        if series is None:
+            raise ValueError("No matching meeting to move.")
+        if to_datetime(new_dt) != to_datetime(meeting_dt):
+            # The series itself is checked too, so an occurrence cannot land on another one.
+            self._check_free(self._candidate(emp_id, new_dt, series.topic),
+                             ignore=f"{series.series_id}@{original.isoformat()}")
+        series.move(original, to_datetime(new_dt))
+        self._publish("meeting.series_updated", series.series_id, emp_id, series.to_record())
+        return f"Moved the {original.isoformat()} occurrence of recurring meeting {series.series_id} to {new_str}."
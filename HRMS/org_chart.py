@@ -0,0 +1,148 @@
+import json
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from HRMS.bulk_io import export_records
+
+
+class OrgChart:
+    """
+    Reporting-hierarchy views over an EmployeeManager.
+
+    `iter_rows` and `iter_json` walk the tree depth-first with an explicit
+    stack, holding only the current path and the pending siblings, so even
+    the whole company can be streamed without building the tree. `page` and
+    `nested` serve rendered subtrees from an LRU cache that is dropped
+    whenever the manager's hierarchy_version changes.
+    """
+
+    def __init__(self, employee_manager, max_cached: int = 64, max_nested_nodes: int = 5000):
+        self.employee_manager = employee_manager
+        self.max_cached = max_cached
+        self.max_nested_nodes = max_nested_nodes
+        self._cache: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._cache_version: int = -1
+        self._lock = threading.Lock()
+
+    def _roots(self, root_id: Optional[str]) -> List[str]:
+        if root_id is None:
+            return self.employee_manager.get_top_level_employees()
+        self.employee_manager.get_employee_details(root_id)
+        return [root_id]
+
+    def iter_rows(self, root_id: Optional[str] = None, max_depth: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield the subtree under `root_id` (the whole company when None) in depth-first
+        order as flat rows with depth and path. Depth 0 is the root.
+        """
+        em = self.employee_manager
+        stack = [(emp_id, 0, ()) for emp_id in reversed(self._roots(root_id))]
+        while stack:
+            emp_id, depth, parents = stack.pop()
+            path = parents + (emp_id,)
+            employee = em.get_employee_details(emp_id)
+            reports = em.get_direct_reports(emp_id)
+            yield {
+                "emp_id": emp_id,
+                "name": employee["name"],
+                "manager_id": employee["manager_id"],
+                "depth": depth,
+                "path": "/".join(path),
+                "direct_reports": len(reports),
+            }
+            if max_depth is None or depth < max_depth:
+                # A reporting cycle from an unchecked bulk load must not loop forever.
+                stack.extend((child, depth + 1, path) for child in reversed(reports) if child not in path)
+
+    def iter_json(self, root_id: Optional[str] = None, max_depth: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the subtree as nested JSON text in pieces: a list of {"emp_id", "name"}
+        nodes, with a "reports" list on managers. Joining the pieces gives the document.
+        """
+        return self._render_json(self.iter_rows(root_id, max_depth))
+
+    @staticmethod
+    def _render_json(rows: Iterable[Dict]) -> Iterator[str]:
+        previous_depth = -1
+        yield "["
+        for row in rows:
+            depth = row["depth"]
+            if depth > previous_depth:
+                prefix = "" if depth == 0 else ', "reports": ['
+            else:
+                prefix = "}" + "]}" * (previous_depth - depth) + ", "
+            yield prefix + json.dumps({"emp_id": row["emp_id"], "name": row["name"]})[:-1]
+            previous_depth = depth
+        if previous_depth >= 0:
+            yield "}" + "]}" * previous_depth
+        yield "]"
+
+    def _cached(self, key: Tuple, build):
+        with self._lock:
+            version = self.employee_manager.hierarchy_version
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = build()
+        with self._lock:
+            if self._cache_version == version:
+                self._cache[key] = value
+                if len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return value
+
+    def page(self, root_id: Optional[str] = None, max_depth: Optional[int] = None,
+             offset: int = 0, limit: int = 200) -> Dict:
+        """
+        One page of the flat rows of a subtree, plus the offset of the next page (None at the end).
+        """
+        if offset < 0 or limit <= 0:
+            raise ValueError("Offset must be >= 0 and limit > 0.")
+        rows = self._cached(("rows", root_id, max_depth), lambda: list(self.iter_rows(root_id, max_depth)))
+        end = offset + limit
+        return {
+            "rows": rows[offset:end],
+            "total": len(rows),
+            "next_offset": end if end < len(rows) else None,
+            "version": self._cache_version,
+        }
+
+    def nested(self, root_id: Optional[str] = None, max_depth: Optional[int] = None) -> str:
+        """
+        The subtree as one nested JSON document.
+        Subtrees larger than max_nested_nodes are refused; use `page` or a smaller max_depth.
+        """
+        def build() -> str:
+            rows = list(islice(self.iter_rows(root_id, max_depth), self.max_nested_nodes + 1))
+            if len(rows) > self.max_nested_nodes:
+                raise ValueError(f"The org chart has more than {self.max_nested_nodes} employees; "
+                                 f"use the rows format or a smaller max_depth.")
+            return "".join(self._render_json(rows))
+
+        return self._cached(("nested", root_id, max_depth), build)
+
+    def export(self, path: str, root_id: Optional[str] = None, max_depth: Optional[int] = None) -> int:
+        """
+        Stream the subtree to a file: nested JSON for .json, one row per line for .jsonl
+        or .csv. Returns the number of employees written.
+        """
+        rows = self.iter_rows(root_id, max_depth)
+        if not path.lower().endswith(".json"):
+            return export_records(rows, path)
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        with open(path, "w", encoding="utf-8") as f:
+            for piece in self._render_json(counted()):
+                f.write(piece)
+        return count
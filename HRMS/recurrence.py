@@ -0,0 +1,355 @@
+from calendar import monthrange
+from datetime import MAXYEAR, date, datetime, timedelta
+from heapq import merge
+from math import lcm
+from itertools import takewhile
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def _naive(value: Union[datetime, str]) -> datetime:
+    # Meeting times are local wall-clock times, so any offset is dropped (as in the availability index).
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+class MeetingSeries:
+    """
+    A recurring meeting stored as its rule, expanded lazily.
+
+    Occurrences follow `frequency` every `interval` days, weeks or months
+    from `start`. Weekly series may list the `weekdays` (0 = Monday) they fall
+    on, and monthly series skip months without the start's day, e.g. the 31st.
+    A series ends after `count` occurrences or on the `until` date, or never.
+    Exceptions are kept as the original start of the occurrence: `skipped`
+    ones do not take place and `moved` ones take place at another time.
+
+    Expansion never walks from the start of a daily or weekly series: the
+    first occurrence at or after a given time is computed directly, so
+    reading a window or testing one time is O(1) plus the occurrences
+    returned, however long the series has run. Memory is the rule and the
+    exceptions only.
+    """
+
+    def __init__(
+            self,
+            series_id: str,
+            emp_id: str,
+            start: Union[datetime, str],
+            topic: str,
+            frequency: str,
+            interval: int = 1,
+            weekdays: Optional[Iterable[int]] = None,
+            count: Optional[int] = None,
+            until: Optional[Union[date, str]] = None,
+            skipped: Iterable[Union[datetime, str]] = (),
+            moved: Optional[Dict[Union[datetime, str], Union[datetime, str]]] = None
+    ):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {frequency}. Use one of: {', '.join(FREQUENCIES)}.")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Interval and count must be at least 1.")
+        self.series_id = series_id
+        self.emp_id = emp_id
+        self.start = _naive(start)
+        self.topic = topic
+        self.frequency = frequency
+        self.interval = interval
+        self.weekdays: Optional[Tuple[int, ...]] = None
+        if weekdays:
+            if frequency != "weekly":
+                raise ValueError("Weekdays can only be given for weekly meetings.")
+            self.weekdays = tuple(sorted(set(weekdays)))
+            if not all(0 <= day <= 6 for day in self.weekdays):
+                raise ValueError("Weekdays must be between 0 (Monday) and 6 (Sunday).")
+            if self.start.weekday() not in self.weekdays:
+                raise ValueError("The first meeting must fall on one of the weekdays.")
+        self.count = count
+        self.until = date.fromisoformat(until) if isinstance(until, str) else until
+        if self.until is not None and self.until < self.start.date():
+            raise ValueError("A recurring meeting cannot end before it starts.")
+        # Occurrences on or after this time are past the until date.
+        self._end = None if self.until is None else datetime.combine(self.until + timedelta(days=1), datetime.min.time())
+        self.skipped = {_naive(dt) for dt in skipped}
+        self.moved = {_naive(original): _naive(new) for original, new in (moved or {}).items()}
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "MeetingSeries":
+        """
+        Rebuild a series from `to_record()` output, e.g. an event payload or an exported row.
+        """
+        rule = record["recurrence"]
+        return cls(record.get("series_id", ""), record["emp_id"], record.get("meeting_dt") or record["date"],
+                   record["topic"], rule["frequency"], rule.get("interval") or 1, rule.get("weekdays"),
+                   rule.get("count"), rule.get("until"), rule.get("skipped") or (), rule.get("moved"))
+
+    def to_record(self) -> Dict:
+        """
+        The series as a flat record shaped like MeetingCreate, with ISO strings.
+        """
+        return {
+            "series_id": self.series_id,
+            "emp_id": self.emp_id,
+            "meeting_dt": self.start.isoformat(),
+            "topic": self.topic,
+            "recurrence": {
+                "frequency": self.frequency,
+                "interval": self.interval,
+                "weekdays": list(self.weekdays) if self.weekdays else None,
+                "count": self.count,
+                "until": self.until.isoformat() if self.until else None,
+                "skipped": sorted(dt.isoformat() for dt in self.skipped),
+                "moved": {original.isoformat(): new.isoformat() for original, new in sorted(self.moved.items())},
+            },
+        }
+
+    @property
+    def bounded(self) -> bool:
+        return self.count is not None or self.until is not None
+
+    def _rule(self, since: Optional[datetime] = None) -> Iterator[datetime]:
+        """
+        Starts generated by the rule itself, before exceptions, at or after `since`.
+        """
+        try:
+            if self.frequency == "monthly":
+                yield from self._monthly(since)
+            elif self.weekdays:
+                yield from self._weekly_on_days(since)
+            else:
+                yield from self._every(timedelta(days=self.interval * (7 if self.frequency == "weekly" else 1)), since)
+        except OverflowError:
+            return  # ran past datetime.max
+
+    def _every(self, step: timedelta, since: Optional[datetime]) -> Iterator[datetime]:
+        n = 0 if since is None or since <= self.start else -((self.start - since) // step)
+        while self.count is None or n < self.count:
+            dt = self.start + n * step
+            if self._end is not None and dt >= self._end:
+                return
+            yield dt
+            n += 1
+
+    def _weekly_on_days(self, since: Optional[datetime]) -> Iterator[datetime]:
+        monday = self.start - timedelta(days=self.start.weekday())
+        first_week = [day for day in self.weekdays if day >= self.start.weekday()]
+        week = 0 if since is None or since <= self.start else (since - monday).days // (7 * self.interval)
+        # Occurrences before the jumped-to week: the rest of the first week, then every day of each later one.
+        n = 0 if week == 0 else len(first_week) + (week - 1) * len(self.weekdays)
+        while True:
+            base = monday + timedelta(weeks=week * self.interval)
+            for day in first_week if week == 0 else self.weekdays:
+                if self.count is not None and n >= self.count:
+                    return
+                dt = base + timedelta(days=day)
+                if self._end is not None and dt >= self._end:
+                    return
+                n += 1
+                if since is None or dt >= since:
+                    yield dt
+            week += 1
+
+    def _monthly(self, since: Optional[datetime]) -> Iterator[datetime]:
+        # At most twelve steps a year, so walking from the start is cheap; the count needs it anyway.
+        n = months = 0
+        while self.count is None or n < self.count:
+            year, month = divmod(self.start.month - 1 + months * self.interval, 12)
+            year += self.start.year
+            months += 1
+            if year > MAXYEAR:
+                return
+            if self.start.day > monthrange(year, month + 1)[1]:
+                continue
+            dt = self.start.replace(year=year, month=month + 1)
+            if self._end is not None and dt >= self._end:
+                return
+            n += 1
+            if since is None or dt >= since:
+                yield dt
+
+    def is_scheduled(self, original: datetime) -> bool:
+        """
+        Whether the rule has an occurrence starting at `original` that was neither skipped nor moved.
+        """
+        original = _naive(original)
+        if original in self.skipped or original in self.moved:
+            return False
+        return next(self._rule(original), None) == original
+
+    def instances(
+            self,
+            since: Optional[datetime] = None,
+            until: Optional[datetime] = None
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Yield (start, original start) of the occurrences with since <= start < until, in order of
+        start. Moved occurrences appear at their new time. Without `until` an unbounded series
+        never ends, so bound the iteration.
+        """
+        since = None if since is None else _naive(since)
+        until = None if until is None else _naive(until)
+        regular = ((dt, dt) for dt in self._rule(since) if dt not in self.skipped and dt not in self.moved)
+        if until is not None:
+            regular = takewhile(lambda pair: pair[0] < until, regular)
+        moved = sorted((new, original) for original, new in self.moved.items()
+                       if (since is None or new >= since) and (until is None or new < until))
+        return merge(regular, moved)
+
+    def occurrences(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[datetime]:
+        return (start for start, _ in self.instances(since, until))
+
+    def occurs_at(self, start: datetime) -> bool:
+        start = _naive(start)
+        return start in self.moved.values() or self.is_scheduled(start)
+
+    def original_of(self, start: datetime) -> Optional[datetime]:
+        """
+        The original start of the occurrence taking place at `start`, or None if there is none.
+        """
+        start = _naive(start)
+        for original, new in self.moved.items():
+            if new == start:
+                return original
+        return start if self.is_scheduled(start) else None
+
+    def skip(self, original: datetime) -> None:
+        self.moved.pop(original, None)
+        self.skipped.add(original)
+
+    def move(self, original: datetime, new: datetime) -> None:
+        if new == original:
+            self.moved.pop(original, None)
+        else:
+            self.moved[original] = new
+
+    def describe(self) -> str:
+        unit = {"daily": "day", "weekly": "week", "monthly": "month"}[self.frequency]
+        every = f"every {self.interval} {unit}s" if self.interval > 1 else self.frequency
+        if self.weekdays:
+            every += " on " + ", ".join(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")[d] for d in self.weekdays)
+        if self.count is not None:
+            every += f", {self.count} times"
+        if self.until is not None:
+            every += f", until {self.until.isoformat()}"
+        return every
+
+
+# The Gregorian calendar repeats every 400 years, which are 4800 months and 146097 days.
+_CYCLE_MONTHS, _CYCLE_DAYS = 4800, 146097
+_TICK = timedelta(microseconds=1)
+
+
+def _period_days(series: MeetingSeries) -> int:
+    """
+    Days after which the series' rule repeats itself.
+    """
+    if series.frequency == "monthly":
+        return _CYCLE_DAYS * lcm(series.interval, _CYCLE_MONTHS) // _CYCLE_MONTHS
+    return series.interval * (7 if series.frequency == "weekly" else 1)
+
+
+def _near(start: datetime, other: datetime, length: timedelta) -> bool:
+    return start == other or abs(start - other) < length
+
+
+def _first_near(series: MeetingSeries, start: datetime, length: timedelta) -> Optional[datetime]:
+    """
+    The first occurrence of `series` at `start` or, with a length, less than `length` away from it.
+    """
+    if not length:
+        return start if series.occurs_at(start) else None
+    return next(series.occurrences(start - length + _TICK, start + length), None)
+
+
+def _rule_pairs(a: MeetingSeries, b: MeetingSeries, since: datetime, end: Optional[datetime],
+                length: timedelta) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Pairs of rule starts of `a` and `b` from `since` on, before `end`, that are `_near` each other.
+    """
+    if a.frequency == b.frequency == "monthly":
+        # Neither rule can jump ahead, so walk both in step.
+        starts_a, starts_b = a._rule(since), b._rule(since)
+        x, y = next(starts_a, None), next(starts_b, None)
+        while x is not None and y is not None and (end is None or min(x, y) < end):
+            if _near(x, y, length):
+                yield x, y
+            if x <= y:
+                x = next(starts_a, None)
+            else:
+                y = next(starts_b, None)
+        return
+    # Walk the sparser rule and look the other one up, which is O(1) for daily and weekly rules.
+    a_outer = a.frequency == "monthly" or (b.frequency != "monthly" and _period_days(a) >= _period_days(b))
+    outer, inner = (a, b) if a_outer else (b, a)
+    for s in outer._rule(since):
+        if end is not None and s >= end:
+            return
+        starts = inner._rule(s - length + _TICK if length else s)
+        r = next(starts, None)
+        if r is None:
+            return  # the inner rule has ended
+        while r is not None and _near(s, r, length):
+            yield (s, r) if a_outer else (r, s)
+            r = next(starts, None)
+
+
+def series_clash(a: MeetingSeries, b: MeetingSeries, length: timedelta = timedelta(0)) -> Optional[datetime]:
+    """
+    The first occurrence of `a` that starts at the same time as an occurrence of `b` or, with a
+    `length`, less than `length` apart from one, however far ahead.
+
+    Once both have started, the two rules repeat together after the least common multiple of
+    their periods, so the rules are only compared over one such period. A clash found there
+    that was skipped or moved recurs a period later, which is tried until the exceptions run
+    out; moved occurrences are tested one by one.
+    """
+    clashes = [t for t in a.moved.values() if _first_near(b, t, length) is not None]
+    clashes += [x for x in (_first_near(a, u, length) for u in b.moved.values()) if x is not None]
+    # Rule starts keep the time of day of the series' start, so far apart times never meet.
+    day = timedelta(days=1)
+    apart = abs(datetime.combine(a.start.date(), b.start.time()) - a.start)
+    if min(apart, day - apart) < length or apart == timedelta(0) or length >= day:
+        both = max(a.start, b.start)
+        try:
+            period = timedelta(days=lcm(_period_days(a), _period_days(b)))
+            end = both + length + period
+        except OverflowError:
+            period = end = None
+        best = None
+        for x, y in _rule_pairs(a, b, both - length, end, length):
+            if best is not None and min(x, y) > best + length:
+                break
+            while next(a._rule(x), None) == x and next(b._rule(y), None) == y:
+                if x not in a.skipped and x not in a.moved and y not in b.skipped and y not in b.moved:
+                    best = x if best is None else min(best, x)
+                    break
+                if period is None:
+                    break
+                try:
+                    x, y = x + period, y + period
+                except OverflowError:
+                    break
+        if best is not None:
+            clashes.append(best)
+    return min(clashes, default=None)
+
+
+def first_clash(
+        series: MeetingSeries,
+        taken: Collection[datetime],
+        others: List[MeetingSeries]
+) -> Optional[datetime]:
+    """
+    The first occurrence of `series` that starts at the same time as one of `taken` (naive
+    datetimes, e.g. a set) or an occurrence of `others`, however far ahead. A series with few
+    occurrences looks each of them up in `taken`, any other tests every taken time with
+    `occurs_at`; other series are compared with `series_clash`.
+    """
+    if series.count is not None and series.count <= len(taken):
+        clashes = [start for start in series.occurrences() if start in taken]
+    else:
+        clashes = [start for start in taken if series.occurs_at(start)]
+    clashes += [c for c in (series_clash(series, other) for other in others) if c is not None]
+    return min(clashes, default=None)
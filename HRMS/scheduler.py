@@ -0,0 +1,234 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TimerHandler = Callable[[str, Dict[str, Any]], None]
+
+
+class _Timer:
+    __slots__ = ("kind", "due", "payload", "seq")
+
+    def __init__(self, kind: str, due: float, payload: Dict[str, Any], seq: int):
+        self.kind = kind
+        self.due = due
+        self.payload = payload
+        self.seq = seq
+
+
+class Scheduler:
+    """
+    Keyed one-shot timers on a binary heap, with an optional journal.
+
+    Each timer has a unique key; scheduling a key again replaces its timer and
+    `cancel` just forgets it. Replaced and cancelled entries stay in the heap
+    and are skipped when they surface (lazy deletion), and the heap is rebuilt
+    once they outnumber the live timers, so scheduling and cancelling are
+    O(log n) and O(1) even with millions of timers.
+
+    Due times are epoch seconds so they keep their meaning across restarts.
+    With a journal path every schedule, cancel and fire is appended to a JSONL
+    file that is replayed (and compacted) on start-up; timers that came due
+    while the process was down fire on the first run.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.journal_path = journal_path
+        self.handlers: Dict[str, TimerHandler] = {}
+        self.fired: int = 0
+        self._timers: Dict[str, _Timer] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq: int = 0
+        self._journal = None
+        self._journal_lines: int = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._worker: Optional[threading.Thread] = None
+        self._stop = False
+        if journal_path:
+            self._replay()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def register(self, kind: str, handler: TimerHandler) -> None:
+        """
+        Set the function called as handler(key, payload) when a timer of this kind fires.
+        """
+        self.handlers[kind] = handler
+
+    def schedule(self, key: str, kind: str, due: float, payload: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Fire `kind` for `key` at epoch time `due`, replacing any timer already set for the key.
+        """
+        payload = payload or {}
+        with self._lock:
+            self._add(key, kind, due, payload)
+            self._write({"op": "schedule", "key": key, "kind": kind, "due": due, "payload": payload})
+            if self._heap[0][2] == key:
+                self._wakeup.notify()
+
+    def cancel(self, key: str) -> bool:
+        with self._lock:
+            if self._timers.pop(key, None) is None:
+                return False
+            self._write({"op": "cancel", "key": key})
+            self._maybe_compact()
+            return True
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            timer = self._timers.get(key)
+            return None if timer is None else {"key": key, "kind": timer.kind, "due": timer.due,
+                                                "payload": timer.payload}
+
+    def pending(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Every live timer, or those of one kind, in the form returned by `get`.
+        """
+        with self._lock:
+            return [{"key": key, "kind": t.kind, "due": t.due, "payload": t.payload}
+                    for key, t in self._timers.items() if kind is None or t.kind == kind]
+
+    def _add(self, key: str, kind: str, due: float, payload: Dict[str, Any]) -> None:
+        self._seq += 1
+        self._timers[key] = _Timer(kind, due, payload, self._seq)
+        heapq.heappush(self._heap, (due, self._seq, key))
+
+    def _pop_due(self, now: float) -> List[Tuple[str, _Timer]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, key = heapq.heappop(self._heap)
+            timer = self._timers.get(key)
+            if timer is None or timer.seq != seq:
+                continue  # replaced or cancelled
+            del self._timers[key]
+            self._write({"op": "fire", "key": key})
+            due.append((key, timer))
+        return due
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """
+        Fire every timer due at `now` (default: the clock) and return how many fired.
+        Handlers run outside the lock and may schedule follow-up timers.
+        """
+        with self._lock:
+            due = self._pop_due(self.clock() if now is None else now)
+            self._maybe_compact()
+        for key, timer in due:
+            handler = self.handlers.get(timer.kind)
+            if handler is None:
+                logger.warning("No handler registered for timer kind %s (key %s)", timer.kind, key)
+                continue
+            try:
+                handler(key, timer.payload)
+            except Exception:
+                logger.exception("Timer %s (%s) failed", key, timer.kind)
+        self.fired += len(due)
+        return len(due)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._peek()
+
+    def _peek(self) -> Optional[float]:
+        while self._heap:
+            _, seq, key = self._heap[0]
+            timer = self._timers.get(key)
+            if timer is not None and timer.seq == seq:
+                return timer.due
+            heapq.heappop(self._heap)
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Count of pending timers per kind and the next due time.
+        """
+        with self._lock:
+            kinds: Dict[str, int] = {}
+            for timer in self._timers.values():
+                kinds[timer.kind] = kinds.get(timer.kind, 0) + 1
+        return {"pending": sum(kinds.values()), "by_kind": kinds, "next_due": self.next_due(), "fired": self.fired}
+
+    def start(self) -> None:
+        """
+        Fire timers from a background thread as they come due.
+        """
+        if self._worker is None:
+            self._stop = False
+            self._worker = threading.Thread(target=self._run, name="hrms-scheduler", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._stop:
+                    return
+                next_due = self._peek()
+                timeout = None if next_due is None else max(0.0, next_due - self.clock())
+                if timeout is None or timeout > 0:
+                    self._wakeup.wait(timeout)
+                if self._stop:
+                    return
+            self.run_due()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            with self._lock:
+                self._stop = True
+                self._wakeup.notify()
+            self._worker.join()
+            self._worker = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._timers) + 1024:
+            self._heap = [(t.due, t.seq, key) for key, t in self._timers.items()]
+            heapq.heapify(self._heap)
+        if self._journal is not None and self._journal_lines > 2 * len(self._timers) + 10000:
+            self._rewrite_journal()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if self._journal is not None:
+            self._journal.write(json.dumps(entry) + "\n")
+            self._journal.flush()
+            self._journal_lines += 1
+
+    def _replay(self) -> None:
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from a crash
+                    if entry["op"] == "schedule":
+                        self._add(entry["key"], entry["kind"], entry["due"], entry["payload"])
+                    else:
+                        self._timers.pop(entry["key"], None)
+            self._heap = [(t.due, t.seq, key) for key, t in self._timers.items()]
+            heapq.heapify(self._heap)
+        self._rewrite_journal()
+
+    def _rewrite_journal(self) -> None:
+        """
+        Replace the journal with one schedule line per live timer.
+        """
+        if self._journal is not None:
+            self._journal.close()
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, t in self._timers.items():
+                f.write(json.dumps({"op": "schedule", "key": key, "kind": t.kind, "due": t.due,
+                                    "payload": t.payload}) + "\n")
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal_lines = len(self._timers)
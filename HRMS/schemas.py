@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from typing import Optional, List, Literal, Dict
+from typing_extensions import Annotated, NotRequired, TypedDict
 from datetime import date, datetime
 
 
@@ -18,6 +19,7 @@ class EmployeeCreate(BaseModel):
     name: str = Field(..., description="Full name of the employee")
     manager_id: Optional[str] = Field(None, description="Manager's employee ID, if any")
     email: Optional[str] = Field(None, description="Email address of the employee")
+    hired_date: Optional[date] = Field(None, description="Date the employee was hired (defaults to today)")
 
 
 class EmployeeRead(EmployeeBase):
@@ -25,9 +27,20 @@ class EmployeeRead(EmployeeBase):
 
 
 # Leave schemas
+class LeavePolicy(BaseModel):
+    leave_type: str = Field("Annual", description="Leave type the policy applies to")
+    annual_entitlement: float = Field(20, ge=0, description="Days granted per full year of service")
+    accrual: Literal['monthly', 'annual'] = Field('monthly', description="Credit monthly, or in full at rollover")
+    carry_over_cap: float = Field(5, ge=0, description="Maximum days carried into the next year")
+    max_balance: Optional[float] = Field(None, ge=0, description="Maximum balance that can be held at any time")
+    tenure_bonus_per_year: float = Field(0, ge=0, description="Extra days per year for each full year of service")
+    tenure_bonus_cap: float = Field(0, ge=0, description="Maximum yearly tenure bonus")
+
+
 class LeaveBalance(BaseModel):
     emp_id: str = Field(..., description="Employee identifier")
-    balance: int = Field(..., ge=0, description="Current leave balance")
+    leave_type: str = Field("Annual", description="Leave type")
+    balance: float = Field(..., ge=0, description="Current leave balance")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -37,6 +50,7 @@ class LeaveHistoryItem(BaseModel):
     emp_id: str = Field(..., description="Employee identifier")
     leave_date: date = Field(..., description="Date of leave taken")
     request_id: int = Field(..., description="Identifier grouping multi-day leave requests")
+    leave_type: str = Field("Annual", description="Leave type charged")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -44,6 +58,11 @@ class LeaveHistoryItem(BaseModel):
 class LeaveApplyRequest(BaseModel):
     emp_id: str = Field(..., description="Employee identifier")
     leave_dates: List[date] = Field(..., description="List of leave dates to apply for")
+    leave_type: str = Field("Annual", description="Leave type to charge")
+
+
+class LeaveRequestRead(LeaveApplyRequest):
+    request_id: int = Field(..., description="Identifier of the leave request")
 
 
 # Meeting schemas
@@ -55,8 +74,24 @@ class MeetingBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+MeetingFrequency = Literal['daily', 'weekly', 'monthly']
+
+class MeetingRecurrence(BaseModel):
+    frequency: MeetingFrequency = Field(..., description="How often the meeting repeats")
+    interval: int = Field(1, ge=1, description="Repeat every N days, weeks or months")
+    weekdays: Optional[List[int]] = Field(
+        None, description="Weekly only: days of the week, 0 = Monday (default: the day of the first meeting)"
+    )
+    count: Optional[int] = Field(None, ge=1, description="Number of occurrences, if limited")
+    until: Optional[date] = Field(None, description="Last day the meeting may take place, if limited")
+    skipped: List[datetime] = Field(default_factory=list, description="Original times of occurrences that are cancelled")
+    moved: Dict[datetime, datetime] = Field(
+        default_factory=dict, description="Occurrences held at another time, original time -> new time"
+    )
+
+
 class MeetingCreate(MeetingBase):
-    pass
+    recurrence: Optional[MeetingRecurrence] = Field(None, description="Repeat rule; omit for a one-off meeting")
 
 
 class MeetingRead(MeetingBase):
@@ -71,11 +106,13 @@ class MeetingCancelRequest(BaseModel):
 
 # Ticket schemas
 TicketStatus = Literal['Open', 'In Progress', 'Closed', 'Rejected']
+TicketPriority = Literal['Low', 'Normal', 'High', 'Urgent']
 
 class TicketBase(BaseModel):
     emp_id: str = Field(..., description="Employee identifier")
     item: str = Field(..., description="Requested item name")
     reason: str = Field(..., description="Reason for the request")
+    priority: TicketPriority = Field("Normal", description="Triage priority")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -89,6 +126,7 @@ class TicketRead(TicketBase):
     status: TicketStatus = Field(..., description="Current status of the ticket")
     created_at: datetime = Field(..., description="Timestamp when the ticket was created")
     updated_at: datetime = Field(..., description="Timestamp when the ticket was last updated")
+    sla_due_at: datetime = Field(..., description="Time by which the ticket should be resolved")
 
 
 class TicketStatusUpdate(BaseModel):
@@ -134,3 +172,40 @@ class BusinessTripExpense(BaseModel):
     amount: float = Field(..., ge=0, description="Expense amount")
     description: str = Field(..., description="Description of the expense")
     expense_date: date = Field(..., description="Date of the expense")
+
+
+class BusinessTripExpenseRead(BusinessTripExpense):
+    expense_id: str = Field(..., description="Expense identifier, e.g. 'EXP0001'")
+    created_at: datetime = Field(..., description="Timestamp when the expense was added")
+
+
+# Cached batch validators for bulk ingestion.
+# Each validates a whole list of plain dicts against a TypedDict mirroring the model's
+# fields and constraints, so no model instance is built per record.
+def _batch_adapter(model: type) -> TypeAdapter:
+    fields = {}
+    for name, info in model.model_fields.items():
+        annotation = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+        fields[name] = annotation if info.is_required() else NotRequired[annotation]
+    return TypeAdapter(List[TypedDict(f"{model.__name__}Record", fields)])
+
+
+EmployeeCreateBatch = _batch_adapter(EmployeeCreate)
+TicketCreateBatch = _batch_adapter(TicketCreate)
+MeetingCreateBatch = _batch_adapter(MeetingCreate)
+LeaveApplyRequestBatch = _batch_adapter(LeaveApplyRequest)
+BusinessTripCreateBatch = _batch_adapter(BusinessTripCreate)
+BusinessTripExpenseBatch = _batch_adapter(BusinessTripExpense)
+# Stored records as exported, restored with their IDs, status and timestamps.
+TicketReadBatch = _batch_adapter(TicketRead)
+BusinessTripReadBatch = _batch_adapter(BusinessTripRead)
+BusinessTripExpenseReadBatch = _batch_adapter(BusinessTripExpenseRead)
+LeaveRequestReadBatch = _batch_adapter(LeaveRequestRead)
+LeaveBalanceBatch = _batch_adapter(LeaveBalance)
+
+
+def validate_batch(adapter: TypeAdapter, records: list) -> list:
+    """
+    Validate a batch of raw records and return them as plain dicts with ISO date strings.
+    """
+    return adapter.dump_python(adapter.validate_python(records), mode="json")
@@ -0,0 +1,200 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from HRMS.events import DomainEvent
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with about".split()
+)
+
+# Which record fields are searchable, and which one holds the status used for filtering.
+DOCUMENT_FIELDS = {
+    "ticket": {"text": ("item", "reason"), "status": "status"},
+    "trip": {"text": ("destination", "purpose"), "status": "status"},
+    "expense": {"text": ("expense_type", "description"), "status": None},
+    "meeting": {"text": ("topic",), "status": None},
+}
+
+SEARCH_EVENTS = ("ticket.created", "ticket.restored", "ticket.status_changed", "ticket.priority_changed",
+                 "ticket.deleted", "ticket.archived", "trip.created", "trip.restored", "trip.status_changed",
+                 "trip.archived", "expense.added", "meeting.scheduled", "meeting.cancelled",
+                 "meeting.series_scheduled", "meeting.series_updated", "meeting.series_cancelled")
+
+# Archival events list the IDs moved to cold storage under these keys, by document kind.
+ARCHIVED_IDS = {"ticket": "ticket_ids", "trip": "trip_ids", "expense": "expense_ids"}
+
+DocKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-case word tokens without stop words; a plural 's' is stripped so 'screens' matches 'screen'.
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class SearchIndex:
+    """
+    Inverted index over ticket, trip, expense and meeting text, ranked with BM25.
+
+    Subscribe it synchronously to an EventBus and it follows every write;
+    `index_existing` loads records that were created before it was attached.
+    Searches only touch the postings of the query terms.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[DocKey, int]] = {}
+        self._docs: Dict[DocKey, Dict[str, Any]] = {}
+        self._lengths: Dict[DocKey, int] = {}
+        self._total_length: int = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: DomainEvent) -> None:
+        kind, action = event.type.split(".", 1)
+        if action == "archived":
+            # Archived records are only reachable through include_archived listings, not search.
+            for doc_kind, field in ARCHIVED_IDS.items():
+                for doc_id in event.data.get(field, ()):
+                    self.remove(doc_kind, doc_id)
+        elif action in ("deleted", "cancelled", "series_cancelled"):
+            self.remove(kind, event.entity_id)
+        else:
+            self.add(kind, event.entity_id, {**event.data, "emp_id": event.emp_id})
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, kind: str, doc_id: str, record: Dict[str, Any]) -> None:
+        """
+        Index a record, replacing any earlier version of it.
+        """
+        fields = DOCUMENT_FIELDS[kind]
+        key = (kind, doc_id)
+        terms = Counter(tokenize(" ".join(str(record.get(f) or "") for f in fields["text"])))
+        with self._lock:
+            old = self._docs.get(key)
+            if old is not None and old["terms"] == terms:
+                # Only the status or other metadata changed; postings stay as they are.
+                old["record"] = record
+                return
+            if old is not None:
+                self._unindex(key)
+            self._docs[key] = {"record": record, "terms": terms}
+            self._lengths[key] = sum(terms.values())
+            self._total_length += self._lengths[key]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[key] = tf
+
+    def remove(self, kind: str, doc_id: str) -> None:
+        with self._lock:
+            if (kind, doc_id) in self._docs:
+                self._unindex((kind, doc_id))
+
+    def _unindex(self, key: DocKey) -> None:
+        doc = self._docs.pop(key)
+        self._total_length -= self._lengths.pop(key)
+        for term in doc["terms"]:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def index_existing(self, ticket_manager=None, business_trip_manager=None, meeting_manager=None) -> int:
+        """
+        Index the records already held by the given managers and return how many were added.
+        """
+        count = 0
+        if ticket_manager is not None:
+            for ticket in ticket_manager.iter_tickets():
+                self.add("ticket", ticket["ticket_id"], dict(ticket))
+                count += 1
+        if business_trip_manager is not None:
+            owners = {}
+            for trip in business_trip_manager.iter_trips():
+                self.add("trip", trip["trip_id"], dict(trip))
+                owners[trip["trip_id"]] = trip["emp_id"]
+                count += 1
+            for expense in business_trip_manager.iter_expenses():
+                self.add("expense", expense["expense_id"], {**expense, "emp_id": owners.get(expense["trip_id"])})
+                count += 1
+        if meeting_manager is not None:
+            for m in meeting_manager.iter_meetings():
+                if m.get("recurrence"):
+                    # A recurring meeting is one document, not one per occurrence.
+                    self.add("meeting", m["series_id"], dict(m))
+                    count += 1
+                    continue
+                meeting = {"date": m["meeting_dt"], "topic": m["topic"], "emp_id": m["emp_id"]}
+                self.add("meeting", f"{m['emp_id']}@{m['meeting_dt']}", meeting)
+                count += 1
+        return count
+
+    def search(
+            self,
+            query: str,
+            kinds: Optional[Iterable[str]] = None,
+            emp_id: Optional[str] = None,
+            status: Optional[str] = None,
+            limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the best `limit` matches for the query, best first.
+        Documents matching more query terms, and rarer terms, rank higher.
+        Filters on kind, employee and status are applied before ranking.
+        """
+        terms = set(tokenize(query))
+        kinds = set(kinds) if kinds else None
+        status = status.lower() if status else None
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_length = self._total_length / n_docs or 1
+            scores: Dict[DocKey, float] = {}
+            lengths = self._lengths
+            base, per_length = self.K1 * (1 - self.B), self.K1 * self.B / avg_length
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                weight = idf * (self.K1 + 1)
+                get = scores.get
+                for key, tf in postings.items():
+                    scores[key] = get(key, 0.0) + weight * tf / (tf + base + per_length * lengths[key])
+            if kinds is None and emp_id is None and status is None:
+                candidates = ((score, key) for key, score in scores.items())
+            else:
+                candidates = ((score, key) for key, score in scores.items()
+                              if self._matches(key, kinds, emp_id, status))
+            best = heapq.nlargest(limit, candidates)
+            return [
+                {"kind": key[0], "id": key[1], "score": round(score, 4), "record": self._docs[key]["record"]}
+                for score, key in best
+            ]
+
+    def _matches(self, key: DocKey, kinds: Optional[set], emp_id: Optional[str], status: Optional[str]) -> bool:
+        if kinds is not None and key[0] not in kinds:
+            return False
+        record = self._docs[key]["record"]
+        if emp_id is not None and record.get("emp_id") != emp_id:
+            return False
+        status_field = DOCUMENT_FIELDS[key[0]]["status"]
+        if status is not None and (status_field is None or str(record.get(status_field, "")).lower() != status):
+            return False
+        return True
@@ -0,0 +1,140 @@
+import weakref
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+
+class Snapshot:
+    """
+    Point-in-time view of a manager's record collections, read as attributes (`snap.tickets`).
+
+    Taking one only copies references, so it is O(1) and can be done under the
+    manager's lock while readers then iterate without it. Writers leave the
+    collections and records a live snapshot refers to untouched (see
+    CopyOnWrite). Release it, or use it as a context manager, when done: its
+    references are dropped, writers stop copying on its behalf and anything
+    copied only for it is freed.
+    """
+
+    def __init__(self, collections: Dict[str, Any], owner: Optional["CopyOnWrite"] = None):
+        self._collections = collections
+        self._owner = owner
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["_collections"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def iter(self, name: str) -> "SnapshotIterator":
+        """
+        Iterate the records of one collection (the values of a dict) and release the snapshot at the end.
+        """
+        collection = self._collections[name]
+        return SnapshotIterator(self, collection.values() if isinstance(collection, dict) else collection)
+
+    def release(self) -> None:
+        if self._owner is not None:
+            self._owner.release(self)
+            self._owner = None
+        self._collections = {}
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.release()
+        return False
+
+    def __reduce__(self):
+        # Sent to another process (e.g. through a deploy.py proxy): a detached copy of the data.
+        return Snapshot, (self._collections,)
+
+
+class SnapshotIterator:
+    """
+    Iterator over one collection of a snapshot that releases the snapshot once exhausted.
+    """
+
+    def __init__(self, snapshot: Snapshot, records: Iterable[Dict]):
+        self._snapshot = snapshot
+        self._records = iter(records)
+
+    def __iter__(self) -> "SnapshotIterator":
+        return self
+
+    def __next__(self) -> Dict:
+        try:
+            return next(self._records)
+        except StopIteration:
+            self._snapshot.release()
+            raise
+
+    def __reduce__(self):
+        # Pickled after the call that created it has returned, so under deploy.py the
+        # records are copied to the worker outside the manager lock.
+        return iter, (list(self),)
+
+
+class CopyOnWrite:
+    """
+    Copy-on-write bookkeeping for the record collections of a manager.
+
+    Collections are dicts keyed by record ID (or lists of records that are
+    never modified in place). While a snapshot is alive, the first write to a
+    collection it shares replaces the collection with a shallow copy, and a
+    record is copied before it is first modified in place; later writes go to
+    the copies. Without live snapshots writers work in place as before. All
+    calls must be made under the lock that serializes the manager's writes.
+    """
+
+    def __init__(self, owner: Any, *names: str):
+        self._owner = owner
+        self.names = names
+        self._readers: "weakref.WeakSet[Snapshot]" = weakref.WeakSet()
+        # Collections still shared with the latest snapshot.
+        self._shared: Set[str] = set()
+        # (collection, record ID) of records copied since the latest snapshot.
+        self._copied: Set[tuple] = set()
+
+    def snapshot(self) -> Snapshot:
+        snap = Snapshot({name: getattr(self._owner, name) for name in self.names}, self)
+        self._readers.add(snap)
+        self._shared = set(self.names)
+        self._copied = set()
+        return snap
+
+    def release(self, snap: Snapshot) -> None:
+        self._readers.discard(snap)
+        if not self._readers:
+            self._shared = set()
+            self._copied = set()
+
+    def writable(self, name: str) -> Any:
+        """
+        The collection `name`, copied first if a live snapshot shares it.
+        """
+        if name in self._shared:
+            self._shared.discard(name)
+            if self._readers:
+                setattr(self._owner, name, getattr(self._owner, name).copy())
+        return getattr(self._owner, name)
+
+    def assign(self, name: str, collection: Any) -> None:
+        """
+        Replace a collection with a new object, e.g. one rebuilt without archived records.
+        """
+        self._shared.discard(name)
+        setattr(self._owner, name, collection)
+
+    def writable_record(self, name: str, record_id: str) -> Dict:
+        """
+        The record `record_id` of a dict collection, ready to be modified in place.
+        """
+        collection = self.writable(name)
+        record = collection[record_id]
+        if self._readers and (name, record_id) not in self._copied:
+            record = collection[record_id] = dict(record)
+            self._copied.add((name, record_id))
+        return record
+
+    def iter(self, name: str) -> Iterator[Dict]:
+        return self.snapshot().iter(name)
@@ -1,44 +1,274 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime
-from HRMS.schemas import TicketCreate, TicketStatusUpdate
+from itertools import islice, takewhile
+from HRMS.schemas import TicketCreate, TicketStatusUpdate, TicketCreateBatch, TicketReadBatch, validate_batch
+from HRMS.events import EventBus, EventPublisher
+from HRMS.archive import ColdStore
+from HRMS.ticket_triage import ACTIVE_STATUSES, PRIORITIES, SlaPolicy, TriageQueue
+from HRMS.time_index import TimeIndex, TimeValue
+from HRMS.snapshot import CopyOnWrite, Snapshot
 
 
-class TicketManager:
-    def __init__(self):
-        self.tickets: List[Dict[str, str]] = []
+class TicketManager(EventPublisher):
+    # Tickets in these statuses no longer change and may be archived.
+    TERMINAL_STATUSES = ("Closed", "Rejected")
+
+    def __init__(
+            self,
+            events: Optional[EventBus] = None,
+            archive: Optional[ColdStore] = None,
+            sla: Optional[SlaPolicy] = None
+    ):
+        self.events = events
+        self.archive = archive
+        self.sla = sla or SlaPolicy()
+        # Ticket ID -> ticket, in creation order.
+        self.tickets: Dict[str, Dict[str, str]] = {}
+        self.triage = TriageQueue()
+        self._cow = CopyOnWrite(self, "tickets")
+        self.time_indexes = {field: TimeIndex(field, "ticket_id") for field in ("created_at", "updated_at")}
         self._next_id: int = 1
+        # Archived tickets keep their IDs across restarts, so new ones are numbered after them.
+        if archive is not None:
+            for ticket_id in archive.ids("ticket_id"):
+                self.skip_ids_to(ticket_id)
 
-    def create_ticket(self, req: TicketCreate) -> str:
+    def _new_ticket(self, emp_id: str, item: str, reason: str, now: Optional[str] = None,
+                    priority: str = "Normal", index: bool = True) -> Dict[str, str]:
         ticket_id = f"T{self._next_id:04d}"
+        now = now or datetime.utcnow().isoformat()
         ticket = {
             "ticket_id": ticket_id,
-            "emp_id": req.emp_id,
-            "item": req.item,
-            "reason": req.reason,
+            "emp_id": emp_id,
+            "item": item,
+            "reason": reason,
+            "priority": priority,
             "status": "Open",
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
+            "created_at": now,
+            "updated_at": now,
+            "sla_due_at": self.sla.due_at(item, now)
         }
-        self.tickets.append(ticket)
+        self._cow.writable("tickets")[ticket_id] = ticket
+        self.triage.add(ticket)
+        if index:
+            for time_index in self.time_indexes.values():
+                time_index.add(ticket)
         self._next_id += 1
-        return f"Ticket {ticket_id} created for {req.emp_id}."
+        self._publish("ticket.created", ticket_id, emp_id, ticket)
+        return ticket
+
+    def create_ticket(self, req: TicketCreate) -> str:
+        ticket = self._new_ticket(req.emp_id, req.item, req.reason, priority=req.priority)
+        return f"Ticket {ticket['ticket_id']} created for {req.emp_id}."
+
+    def create_tickets(self, reqs: List[TicketCreate]) -> List[str]:
+        """
+        Create several tickets at once and return their IDs.
+        """
+        return [self._new_ticket(req.emp_id, req.item, req.reason, priority=req.priority)["ticket_id"]
+                for req in reqs]
+
+    def ingest_tickets(self, records: List[Dict], trusted: bool = False) -> List[str]:
+        """
+        Bulk-create tickets from raw dicts and return their IDs.
+        The whole batch is validated in one pass unless trusted=True.
+        Records with a ticket_id, as written by iter_tickets, are restored as they
+        were (ID, status, timestamps and SLA due time) and later IDs continue after
+        them; nothing is loaded if one of their IDs is already taken.
+        """
+        restored = [r for r in records if r.get("ticket_id")]
+        records = [r for r in records if not r.get("ticket_id")]
+        if not trusted:
+            records = validate_batch(TicketCreateBatch, records)
+            restored = validate_batch(TicketReadBatch, restored)
+        self._check_new_ids([r["ticket_id"] for r in restored])
+        now = datetime.utcnow().isoformat()
+        tickets = [self._restore_ticket(r) for r in restored]
+        tickets += [self._new_ticket(r["emp_id"], r["item"], r["reason"], now, r.get("priority", "Normal"),
+                                     index=False) for r in records]
+        for time_index in self.time_indexes.values():
+            time_index.add_many(tickets)
+        return [t["ticket_id"] for t in tickets]
+
+    def _check_new_ids(self, ticket_ids: List[str]) -> None:
+        if len(set(ticket_ids)) != len(ticket_ids):
+            raise ValueError("Ticket IDs in the batch are not unique.")
+        for ticket_id in ticket_ids:
+            if ticket_id in self.tickets:
+                raise ValueError(f"Ticket '{ticket_id}' already exists.")
+
+    def _restore_ticket(self, r: Dict) -> Dict[str, str]:
+        ticket = {field: r[field] for field in ("ticket_id", "emp_id", "item", "reason", "priority", "status",
+                                                "created_at", "updated_at", "sla_due_at")}
+        self._cow.writable("tickets")[ticket["ticket_id"]] = ticket
+        if ticket["status"] in ACTIVE_STATUSES:
+            self.triage.add(ticket)
+        self.skip_ids_to(ticket["ticket_id"])
+        self._publish("ticket.restored", ticket["ticket_id"], ticket["emp_id"], ticket)
+        return ticket
+
+    def skip_ids_to(self, ticket_id: str) -> None:
+        """
+        Make sure new tickets get IDs after `ticket_id`, e.g. one restored or archived earlier.
+        """
+        self._next_id = max(self._next_id, int(ticket_id[1:]) + 1)
+
+    def delete_ticket(self, ticket_id: str) -> None:
+        """
+        Remove a ticket entirely, e.g. to roll back a failed workflow.
+        """
+        t = self.get_ticket(ticket_id)
+        del self._cow.writable("tickets")[ticket_id]
+        for index in self.time_indexes.values():
+            index.remove(t)
+        self.triage.discard(ticket_id)
+        self._publish("ticket.deleted", ticket_id, t["emp_id"], t)
+
+    def get_ticket(self, ticket_id: str) -> Dict[str, str]:
+        ticket = self.tickets.get(ticket_id)
+        if ticket is None:
+            raise ValueError(f"Ticket '{ticket_id}' not found.")
+        return ticket
+
+    def _edit(self, ticket_id: str) -> Dict[str, str]:
+        # The ticket may be shared with a snapshot, so change a copy of it where needed.
+        self.get_ticket(ticket_id)
+        ticket = self._cow.writable_record("tickets", ticket_id)
+        self.triage.replace(ticket)
+        return ticket
+
+    def _touch(self, ticket: Dict[str, str]) -> None:
+        old = ticket["updated_at"]
+        ticket["updated_at"] = datetime.utcnow().isoformat()
+        self.time_indexes["updated_at"].move(ticket["ticket_id"], old, ticket["updated_at"])
 
     def update_ticket_status(self, req: TicketStatusUpdate, ticket_id: str) -> str:
-        for t in self.tickets:
-            if t["ticket_id"] == ticket_id:
-                t["status"] = req.status
-                t["updated_at"] = datetime.utcnow().isoformat()
-                return f"Ticket {ticket_id} status updated to {req.status}."
-        raise ValueError(f"Ticket '{ticket_id}' not found.")
+        t = self._edit(ticket_id)
+        old_status = t["status"]
+        t["status"] = req.status
+        self._touch(t)
+        if req.status not in ACTIVE_STATUSES:
+            self.triage.discard(ticket_id)
+        elif ticket_id not in self.triage:
+            self.triage.add(t)
+        self._publish("ticket.status_changed", ticket_id, t["emp_id"], {**t, "old_status": old_status})
+        return f"Ticket {ticket_id} status updated to {req.status}."
+
+    def set_ticket_priority(self, ticket_id: str, priority: str) -> str:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority {priority}. Use one of: {', '.join(PRIORITIES)}.")
+        t = self._edit(ticket_id)
+        t["priority"] = priority
+        self._touch(t)
+        if ticket_id in self.triage:
+            self.triage.add(t)
+        self._publish("ticket.priority_changed", ticket_id, t["emp_id"], t)
+        return f"Ticket {ticket_id} priority set to {priority}."
+
+    def top_tickets(
+            self,
+            order: str = "priority",
+            limit: int = 20,
+            employee_id: Optional[str] = None,
+            item: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        The first `limit` open or in-progress tickets by priority (then age), by age alone
+        ("age", oldest first) or by SLA due time ("sla"), optionally for one employee or item.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be > 0.")
+        return list(islice(self.triage.iter_order(order, self._triage_filter(employee_id, item)), limit))
+
+    @staticmethod
+    def _triage_filter(employee_id: Optional[str], item: Optional[str]):
+        if not employee_id and not item:
+            return None
+        item = item.lower() if item else None
+
+        def matches(t: Dict[str, str]) -> bool:
+            return (not employee_id or t["emp_id"] == employee_id) and (not item or t["item"].lower() == item)
+
+        return matches
+
+    def sla_breaches(self, now: Optional[datetime] = None, limit: int = 20, employee_id: Optional[str] = None,
+                     item: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Open or in-progress tickets past their SLA due time, most overdue first, optionally for
+        one employee or item.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be > 0.")
+        cutoff = (now or datetime.utcnow()).isoformat()
+        overdue = takewhile(lambda t: t["sla_due_at"] < cutoff,
+                            self.triage.iter_order("sla", self._triage_filter(employee_id, item)))
+        return list(islice(overdue, limit))
+
+    def snapshot(self) -> Snapshot:
+        """
+        Point-in-time view of the tickets (`snap.tickets`) in O(1); release it when done.
+        """
+        return self._cow.snapshot()
+
+    def iter_tickets(self) -> Iterator[Dict[str, str]]:
+        """
+        Iterate a snapshot of the tickets, so writes made meanwhile neither wait nor show up.
+        """
+        return self._cow.iter("tickets")
+
+    def _time_index(self, order_by: str) -> TimeIndex:
+        if order_by not in self.time_indexes:
+            raise ValueError(f"Cannot order tickets by {order_by}. Use one of: {', '.join(self.time_indexes)}.")
+        return self.time_indexes[order_by]
 
     def list_tickets(
             self,
             employee_id: Optional[str] = None,
-            status: Optional[str] = None
+            status: Optional[str] = None,
+            include_archived: bool = False,
+            since: Optional[TimeValue] = None,
+            until: Optional[TimeValue] = None,
+            order_by: str = "created_at",
+            newest_first: bool = False,
+            after: Optional[str] = None,
+            limit: Optional[int] = None
     ) -> List[Dict[str, str]]:
-        results = self.tickets
+        """
+        List tickets in created_at or updated_at order, optionally only those with
+        since <= order_by < until. For keyset pagination pass a `limit` and, for the
+        next page, `after=cursor_for(last ticket, order_by)` with the same other arguments.
+        """
+        extra = self.archive.iter_records(employee_id) if include_archived and self.archive is not None else None
+        results = self._time_index(order_by).query(self.tickets, since, until, newest_first, after, extra)
         if employee_id:
-            results = [t for t in results if t["emp_id"] == employee_id]
+            results = (t for t in results if t["emp_id"] == employee_id)
         if status:
-            results = [t for t in results if t["status"].lower() == status.lower()]
-        return results
+            results = (t for t in results if t["status"].lower() == status.lower())
+        return list(islice(results, limit))
+
+    def cursor_for(self, ticket: Dict[str, str], order_by: str = "created_at") -> str:
+        """
+        Keyset cursor for the page after `ticket` in list_tickets ordered by `order_by`.
+        """
+        return self._time_index(order_by).cursor(ticket)
+
+    def archive_closed(self, older_than: datetime) -> List[str]:
+        """
+        Move tickets in a terminal status, last updated before `older_than`, to the cold store.
+        They are written to disk before they leave memory. Returns the archived ticket IDs.
+        """
+        if self.archive is None:
+            raise ValueError("No ticket archive is configured.")
+        cutoff = older_than.isoformat()
+        stale = self.time_indexes["updated_at"].query(self.tickets, until=older_than)
+        cold = [t for t in stale if t["status"] in self.TERMINAL_STATUSES]
+        if not cold:
+            return []
+        self.archive.append(cold)
+        ticket_ids = [t["ticket_id"] for t in cold]
+        archived = set(ticket_ids)
+        self._cow.assign("tickets", {tid: t for tid, t in self.tickets.items() if tid not in archived})
+        for index in self.time_indexes.values():
+            index.remove_ids(archived)
+        self._publish("ticket.archived", cutoff, None, {"ticket_ids": ticket_ids})
+        return ticket_ids
@@ -0,0 +1,160 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+PRIORITIES = ("Low", "Normal", "High", "Urgent")
+PRIORITY_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+
+# Tickets in these statuses are still waiting on IT and take part in triage.
+ACTIVE_STATUSES = ("Open", "In Progress")
+
+TRIAGE_ORDERS = ("priority", "age", "sla")
+
+
+class SlaPolicy:
+    """
+    Resolution targets in hours per ticket item, with a default for other items.
+    Items are matched case-insensitively.
+    """
+
+    def __init__(self, targets: Optional[Dict[str, float]] = None, default_hours: float = 72.0):
+        self.targets = {item.strip().lower(): float(hours) for item, hours in (targets or {}).items()}
+        self.default_hours = float(default_hours)
+        # Due times for the last created_at seen; a batch of tickets shares one timestamp.
+        self._due_cache: Dict[str, str] = {}
+        self._due_cache_for: Optional[str] = None
+
+    @classmethod
+    def from_string(cls, targets: str, default_hours: float = 72.0) -> "SlaPolicy":
+        """
+        Build a policy from 'Item=hours' pairs separated by commas, e.g. the HR_TICKET_SLA_HOURS setting.
+        """
+        parsed = {}
+        for pair in targets.split(","):
+            if not pair.strip():
+                continue
+            item, sep, hours = pair.rpartition("=")
+            if not sep or not item.strip():
+                raise ValueError(f"Invalid SLA target '{pair.strip()}', expected Item=hours.")
+            parsed[item] = float(hours)
+        return cls(parsed, default_hours)
+
+    def hours_for(self, item: str) -> float:
+        return self.targets.get(item.strip().lower(), self.default_hours)
+
+    def due_at(self, item: str, created_at: str) -> str:
+        if created_at != self._due_cache_for:
+            self._due_cache, self._due_cache_for = {}, created_at
+        item = item.strip().lower()
+        due = self._due_cache.get(item)
+        if due is None:
+            hours = self.targets.get(item, self.default_hours)
+            due = self._due_cache[item] = (datetime.fromisoformat(created_at) + timedelta(hours=hours)).isoformat()
+        return due
+
+
+class TriageQueue:
+    """
+    The active tickets in three orders: priority then age, age alone, and SLA due time.
+
+    Each order is a binary heap of (sort key..., ticket_id, version) entries.
+    Discarding or re-keying a ticket bumps its version (new tickets start at
+    0, so creating one is a single dict insert), and entries that are no
+    longer queued at their version are skipped when read (lazy deletion); the
+    heaps are rebuilt once stale entries outnumber live ones. Writes only note
+    the ticket ID, and the next read moves the noted tickets into the heaps:
+    one push each, or a single heapify when there are many, so bulk loads stay
+    O(n). Reads walk a heap's tree with a small frontier heap instead of
+    popping, so the first K tickets of an order cost O(K log K) and leave the
+    queue untouched.
+    """
+
+    def __init__(self):
+        self._queued: Dict[str, Dict] = {}
+        self._versions: Dict[str, int] = {}
+        self._heaps: Dict[str, List[Tuple]] = {order: [] for order in TRIAGE_ORDERS}
+        self._unindexed: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return ticket_id in self._queued
+
+    def add(self, ticket: Dict) -> None:
+        """
+        Queue a ticket, or re-key one already queued after its priority changed.
+        """
+        ticket_id = ticket["ticket_id"]
+        if ticket_id in self._queued:
+            self._versions[ticket_id] = self._versions.get(ticket_id, 0) + 1
+        self._queued[ticket_id] = ticket
+        self._unindexed.append(ticket_id)
+
+    def replace(self, ticket: Dict) -> None:
+        """
+        Point a queued ticket at a new copy of its record with the same sort keys.
+        """
+        if ticket["ticket_id"] in self._queued:
+            self._queued[ticket["ticket_id"]] = ticket
+
+    def discard(self, ticket_id: str) -> None:
+        if self._queued.pop(ticket_id, None) is not None:
+            self._versions[ticket_id] = self._versions.get(ticket_id, 0) + 1
+
+    def _entries(self, ticket_id: str) -> Iterator[Tuple[str, Tuple]]:
+        ticket, version = self._queued[ticket_id], self._versions.get(ticket_id, 0)
+        yield "priority", (-PRIORITY_RANK.get(ticket["priority"], 1), ticket["created_at"], ticket_id, version)
+        yield "age", (ticket["created_at"], ticket_id, version)
+        yield "sla", (ticket["sla_due_at"], ticket_id, version)
+
+    def _flush(self) -> None:
+        if not self._unindexed:
+            return
+        pending = [ticket_id for ticket_id in dict.fromkeys(self._unindexed) if ticket_id in self._queued]
+        self._unindexed = []
+        heaps = self._heaps
+        if len(heaps["age"]) + len(pending) > 2 * len(self._queued) + 1024:
+            self._rebuild_heaps()  # includes the pending tickets
+        elif len(pending) * 4 >= len(heaps["age"]):
+            for ticket_id in pending:
+                for order, entry in self._entries(ticket_id):
+                    heaps[order].append(entry)
+            for heap in heaps.values():
+                heapq.heapify(heap)
+        else:
+            for ticket_id in pending:
+                for order, entry in self._entries(ticket_id):
+                    heapq.heappush(heaps[order], entry)
+
+    def _rebuild_heaps(self) -> None:
+        # No old entries survive a rebuild, so every version can start over at 0.
+        self._versions = {}
+        heaps: Dict[str, List[Tuple]] = {order: [] for order in TRIAGE_ORDERS}
+        for ticket_id in self._queued:
+            for order, entry in self._entries(ticket_id):
+                heaps[order].append(entry)
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        self._heaps = heaps
+
+    def iter_order(self, order: str, predicate: Optional[Callable[[Dict], bool]] = None) -> Iterator[Dict]:
+        """
+        Yield the queued tickets in the given order, lazily. The queue must not be
+        changed while the iterator is in use.
+        """
+        if order not in TRIAGE_ORDERS:
+            raise ValueError(f"Unknown triage order {order}. Use one of: {', '.join(TRIAGE_ORDERS)}.")
+        self._flush()
+        heap = self._heaps[order]
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            ticket_id = entry[-2]
+            ticket = self._queued.get(ticket_id)
+            if ticket is not None and self._versions.get(ticket_id, 0) == entry[-1]:
+                if predicate is None or predicate(ticket):
+                    yield ticket
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timezone
+from heapq import merge
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+TimeValue = Union[date, datetime, str]
+
+# (epoch seconds, length of the ID, ID): ties on time fall back to the natural order of
+# IDs like T0009 < T0010 < T10000.
+IndexKey = Tuple[float, int, str]
+
+
+def to_timestamp(value: TimeValue) -> float:
+    """
+    Epoch seconds of an ISO date or datetime; naive values are taken as UTC, a date as its midnight.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def parse_cursor(cursor: str) -> IndexKey:
+    """
+    Turn a cursor from `TimeIndex.cursor` back into an index key.
+    """
+    ts, sep, record_id = cursor.partition("|")
+    try:
+        return float(ts), len(record_id), record_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'.") from None
+
+
+class TimeIndex:
+    """
+    Record IDs ordered by one timestamp field, kept as epoch seconds in a sorted list.
+
+    Range queries and ordered iteration in either direction are two bisections
+    and a slice walk, with no sorting per call. Keyset pagination resumes after
+    the key of the last record returned, so pages stay stable while records are
+    added. Records that arrive in time order, the common case for created_at,
+    are appended. Others wait in a buffer until the next read, which inserts a
+    few or sorts a large batch into place at once, so bulk loads stay
+    O(n log n) whatever order they come in.
+    """
+
+    def __init__(self, field: str, id_field: str):
+        self.field = field
+        self.id_field = id_field
+        self._keys: List[IndexKey] = []
+        self._unsorted: List[IndexKey] = []
+        self._last_value: Optional[TimeValue] = None
+        self._last_ts: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._unsorted)
+
+    def _flush(self) -> None:
+        if len(self._unsorted) < 16:
+            for key in self._unsorted:
+                insort(self._keys, key)
+        else:
+            self._keys.extend(self._unsorted)
+            self._keys.sort()
+        self._unsorted = []
+
+    def _key(self, record_id: str, value: TimeValue) -> IndexKey:
+        # A batch of records shares one timestamp, so it is parsed once.
+        if value != self._last_value:
+            self._last_value, self._last_ts = value, to_timestamp(value)
+        return self._last_ts, len(record_id), record_id
+
+    def key_of(self, record: Dict) -> IndexKey:
+        return self._key(record[self.id_field], record[self.field])
+
+    def cursor(self, record: Dict) -> str:
+        """
+        Opaque keyset cursor pointing just past `record` in this index.
+        """
+        return f"{to_timestamp(record[self.field])!r}|{record[self.id_field]}"
+
+    def add(self, record: Dict) -> None:
+        key = self.key_of(record)
+        if not self._unsorted and (not self._keys or key > self._keys[-1]):
+            self._keys.append(key)
+        else:
+            self._unsorted.append(key)
+
+    def add_many(self, records: List[Dict]) -> None:
+        """
+        Index a batch of new records in one pass; they are merged in on the next read.
+        """
+        field, id_field = self.field, self.id_field
+        keys = []
+        for record in records:
+            value, record_id = record[field], record[id_field]
+            if value != self._last_value:
+                self._last_value, self._last_ts = value, to_timestamp(value)
+            keys.append((self._last_ts, len(record_id), record_id))
+        self._unsorted.extend(keys)
+
+    def remove(self, record: Dict) -> None:
+        """
+        Drop a record, given with the field value it was indexed under.
+        """
+        if self._unsorted:
+            self._flush()
+        key = self.key_of(record)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def remove_ids(self, record_ids: Iterable[str]) -> None:
+        """
+        Drop many records at once in a single pass.
+        """
+        drop = set(record_ids)
+        if drop:
+            self._unsorted = [key for key in self._unsorted if key[2] not in drop]
+            self._keys = [key for key in self._keys if key[2] not in drop]
+
+    def move(self, record_id: str, old_value: TimeValue, new_value: TimeValue) -> None:
+        """
+        Re-key a record after its field changed from old_value to new_value.
+        """
+        if old_value != new_value:
+            self.remove({self.id_field: record_id, self.field: old_value})
+            self.add({self.id_field: record_id, self.field: new_value})
+
+    def iter_keys(
+            self,
+            since: Optional[TimeValue] = None,
+            until: Optional[TimeValue] = None,
+            newest_first: bool = False,
+            after: Optional[str] = None
+    ) -> Iterator[IndexKey]:
+        """
+        Keys with since <= time < until, oldest or newest first, resuming past a cursor.
+        The index must not be changed while the iterator is in use.
+        """
+        if self._unsorted:
+            self._flush()
+        keys = self._keys
+        lo = 0 if since is None else bisect_left(keys, (to_timestamp(since),))
+        hi = len(keys) if until is None else bisect_left(keys, (to_timestamp(until),))
+        if after is not None:
+            position = parse_cursor(after)
+            if newest_first:
+                hi = min(hi, bisect_left(keys, position))
+            else:
+                lo = max(lo, bisect_right(keys, position))
+        if newest_first:
+            return (keys[i] for i in range(hi - 1, lo - 1, -1))
+        return (keys[i] for i in range(lo, hi))
+
+    def query(
+            self,
+            records: Dict[str, Dict],
+            since: Optional[TimeValue] = None,
+            until: Optional[TimeValue] = None,
+            newest_first: bool = False,
+            after: Optional[str] = None,
+            extra: Optional[Iterable[Dict]] = None
+    ) -> Iterator[Dict]:
+        """
+        Yield the records of `records` (ID -> record) in this index's order, within the range
+        and after the cursor. Records in `extra`, which are not indexed (e.g. archived ones),
+        are filtered the same way and merged in.
+        """
+        indexed = ((key, records[key[2]]) for key in self.iter_keys(since, until, newest_first, after))
+        if extra is None:
+            return (record for _, record in indexed)
+        lo = None if since is None else (to_timestamp(since),)
+        hi = None if until is None else (to_timestamp(until),)
+        position = None if after is None else parse_cursor(after)
+        others = []
+        for record in extra:
+            key = (to_timestamp(record[self.field]), len(record[self.id_field]), record[self.id_field])
+            if (lo is not None and key < lo) or (hi is not None and key >= hi):
+                continue
+            if position is not None and (key >= position if newest_first else key <= position):
+                continue
+            others.append((key, record))
+        others.sort(key=lambda pair: pair[0], reverse=newest_first)
+        return (record for _, record in merge(indexed, others, key=lambda pair: pair[0], reverse=newest_first))
@@ -0,0 +1,46 @@
+import logging
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Transaction:
+    """
+    Undo log spanning several managers.
+    Every step registers a compensating call; if the block fails, the
+    compensations run in reverse order so all steps are rolled back together.
+    A compensation that fails is logged and the rest still run; the error that
+    failed the block is the one raised.
+    """
+
+    def __init__(self):
+        self._undo: List[Tuple[Callable, tuple]] = []
+        self.committed: bool = False
+
+    def on_rollback(self, fn: Callable, *args) -> None:
+        """
+        Register a compensating call for a step that has just been applied.
+        """
+        self._undo.append((fn, args))
+
+    def rollback(self) -> None:
+        while self._undo:
+            fn, args = self._undo.pop()
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("Rollback step %r%r failed", fn, args)
+
+    def commit(self) -> None:
+        self._undo.clear()
+        self.committed = True
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
@@ -0,0 +1,89 @@
+"""
+Compare the per-record write path with batch ingestion.
+
+    python -m benchmarks.bench_ingest [N]
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+from HRMS import EmployeeManager, BusinessTripManager, TicketManager
+from HRMS.schemas import EmployeeCreate, BusinessTripCreate, TicketCreate
+
+
+def employee_records(n):
+    records = [{"emp_id": "E000000", "name": "Root", "manager_id": None, "email": "root@atliq.com"}]
+    for i in range(1, n):
+        records.append({
+            "emp_id": f"E{i:06d}",
+            "name": f"Employee {i}",
+            "manager_id": f"E{(i - 1) // 10:06d}",
+            "email": f"employee.{i}@atliq.com",
+            "hired_date": "2020-01-01",
+        })
+    return records
+
+
+def trip_records(n):
+    start = date(2030, 1, 1)
+    return [{
+        "emp_id": f"E{i % 1000:06d}",
+        "destination": "Tokyo",
+        "purpose": "Client Meeting",
+        "start_date": (start + timedelta(days=i % 300)).isoformat(),
+        "end_date": (start + timedelta(days=i % 300 + 3)).isoformat(),
+        "estimated_cost": 1500.0,
+        "manager_id": "E000000",
+    } for i in range(n)]
+
+
+def ticket_records(n):
+    return [{"emp_id": f"E{i % 1000:06d}", "item": "Laptop", "reason": "New hire setup"} for i in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench(label, n, per_record, batch, trusted):
+    results = [("per-record", timed(per_record)), ("batch", timed(batch)), ("trusted", timed(trusted))]
+    baseline = results[0][1]
+    for mode, elapsed in results:
+        print(f"{label:<10} {mode:<11} {n / elapsed:>12,.0f} rec/s  {baseline / elapsed:5.1f}x")
+
+
+def main(n):
+    employees, trips, tickets = employee_records(n), trip_records(n), ticket_records(n)
+
+    def employees_per_record():
+        em = EmployeeManager()
+        for r in employees:
+            em.add_employee(EmployeeCreate(**r))
+
+    bench("employees", n, employees_per_record,
+          lambda: EmployeeManager().ingest_employees(employees),
+          lambda: EmployeeManager().ingest_employees(employees, trusted=True))
+
+    def trips_per_record():
+        btm = BusinessTripManager()
+        for r in trips:
+            btm.create_trip(BusinessTripCreate(**r))
+
+    bench("trips", n, trips_per_record,
+          lambda: BusinessTripManager().ingest_trips(trips),
+          lambda: BusinessTripManager().ingest_trips(trips, trusted=True))
+
+    def tickets_per_record():
+        tm = TicketManager()
+        for r in tickets:
+            tm.create_ticket(TicketCreate(**r))
+
+    bench("tickets", n, tickets_per_record,
+          lambda: TicketManager().ingest_tickets(tickets),
+          lambda: TicketManager().ingest_tickets(tickets, trusted=True))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,429 @@
+"""
+Drive spawned stdio servers with a recorded trace or a synthetic workload mix.
+
+    python -m benchmarks.load_replay --mix default --calls 2000 --servers 2 --sessions 8 --rate 200
+    python -m benchmarks.load_replay --trace trace.jsonl --speed 2 --json report.json
+
+Traces are recorded by a running server with HR_TRACE_FILE=trace.jsonl (see
+metrics.py). Each server gets its own temporary data directory and sends mail
+to a local SMTP sink, so nothing leaves the machine.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from contextlib import AsyncExitStack
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The employees that utils.seed_services loads into every server.
+EMPLOYEES = [
+    ("E001", "Sarah Johnson"), ("E002", "Michael Chen"), ("E003", "David Wilson"), ("E004", "Tony Sharma"),
+    ("E005", "James Rodriguez"), ("E006", "Emily Kim"), ("E007", "Carlos Mendez"), ("E008", "Lisa Wong"),
+]
+
+# A planned call: offset in seconds from the start of the run (None: as soon as a session is free),
+# tool name and arguments.
+Call = Tuple[Optional[float], str, Dict]
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        self.reply("220 hr-load-sink ESMTP")
+        recipients = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-hr-load-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif command.startswith("HELO"):
+                self.reply("250 hr-load-sink")
+            elif command.startswith("AUTH"):
+                self.reply("235 Authentication successful")
+            elif command.startswith("RCPT"):
+                recipients += 1
+                self.reply("250 OK")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                self.server.sink.received(recipients)
+                recipients = 0
+                self.reply("250 OK queued")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL, RSET, NOOP and anything else.
+                self.reply("250 OK")
+
+
+class SmtpSink:
+    """
+    Plaintext SMTP server on localhost that accepts and discards every message.
+    Point the servers at it with HR_SMTP_SECURITY=none.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.messages = 0
+        self.recipients = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), _SmtpHandler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+
+    def received(self, recipients: int) -> None:
+        with self._lock:
+            self.messages += 1
+            self.recipients += recipients
+
+    def __enter__(self) -> "SmtpSink":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def load_trace(path: str, limit: Optional[int] = None) -> List[Call]:
+    """
+    Read a trace written through HR_TRACE_FILE, with offsets relative to its first call.
+    """
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in itertools.islice((line for line in f if line.strip()), limit):
+            entry = json.loads(line)
+            calls.append((entry.get("t"), entry["tool"], entry.get("args") or {}))
+    if calls and calls[0][0] is not None:
+        first = calls[0][0]
+        calls = [(None if t is None else t - first, tool, args) for t, tool, args in calls]
+    return calls
+
+
+def _workload_generators(rng: random.Random) -> Dict[str, Callable[[], Dict]]:
+    # Meetings and trips take fresh slots far in the future so that they never clash
+    # with the seeded bookings or with each other.
+    meeting_slots = itertools.count()
+    trip_slots = itertools.count()
+
+    def emp_id() -> str:
+        return rng.choice(EMPLOYEES)[0]
+
+    def meeting() -> Dict:
+        slot = datetime(2031, 1, 1, 9) + timedelta(hours=2 * next(meeting_slots))
+        return {"employee_id": emp_id(), "meeting_datetime": slot.isoformat(), "topic": "Load test sync"}
+
+    def trip() -> Dict:
+        start = date(2035, 1, 1) + timedelta(days=7 * next(trip_slots))
+        return {"emp_id": emp_id(), "destination": rng.choice(["Tokyo", "Berlin", "Austin"]),
+                "purpose": "Client Meeting", "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=2)).isoformat(), "estimated_cost": 1200.0,
+                "manager_id": "E001"}
+
+    def availability() -> Dict:
+        start = date.today() + timedelta(days=rng.randint(0, 60))
+        return {"emp_id": emp_id(), "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=rng.randint(0, 4))).isoformat()}
+
+    return {
+        "get_employee_details": lambda: {"name": rng.choice(EMPLOYEES)[1]},
+        "list_tickets": lambda: {"employee_id": emp_id(), "status": "Open"},
+        "create_ticket": lambda: {"emp_id": emp_id(), "item": rng.choice(["Laptop", "Monitor", "ID Card"]),
+                                  "reason": "Load test"},
+        "get_meetings": lambda: {"employee_id": emp_id()},
+        "schedule_meeting": meeting,
+        "get_employee_leave_balance": lambda: {"emp_id": emp_id()},
+        "get_business_trips": lambda: {"employee_id": emp_id()},
+        "create_business_trip": trip,
+        "check_availability": availability,
+        "search_records": lambda: {"query": rng.choice(["laptop", "client meeting", "tokyo", "review"])},
+        "get_org_chart": lambda: {},
+        "send_email": lambda: {"to_emails": [f"{rng.choice(EMPLOYEES)[1].lower().replace(' ', '.')}@atliq.com"],
+                               "subject": "Load test", "body": "Sent by benchmarks.load_replay."},
+    }
+
+
+# Relative weights of the tools in each synthetic mix.
+WORKLOAD_MIXES: Dict[str, Dict[str, int]] = {
+    "default": {
+        "get_employee_details": 15, "list_tickets": 15, "get_meetings": 10, "get_business_trips": 10,
+        "get_employee_leave_balance": 10, "check_availability": 8, "search_records": 8, "get_org_chart": 4,
+        "create_ticket": 8, "schedule_meeting": 5, "create_business_trip": 5, "send_email": 2,
+    },
+    "reads": {
+        "get_employee_details": 25, "list_tickets": 20, "get_meetings": 15, "get_business_trips": 15,
+        "check_availability": 10, "search_records": 10, "get_org_chart": 5,
+    },
+    "writes": {
+        "create_ticket": 40, "schedule_meeting": 25, "create_business_trip": 25, "send_email": 10,
+    },
+}
+
+
+def synthesize(mix: str, calls: int, seed: int = 0) -> List[Call]:
+    """
+    Draw `calls` tool calls from one of WORKLOAD_MIXES, reproducibly for a given seed.
+    """
+    if mix not in WORKLOAD_MIXES:
+        raise ValueError(f"Unknown workload mix {mix}. Use one of: {', '.join(WORKLOAD_MIXES)}.")
+    rng = random.Random(seed)
+    generators = _workload_generators(rng)
+    tools = list(WORKLOAD_MIXES[mix])
+    weights = list(WORKLOAD_MIXES[mix].values())
+    return [(None, tool, generators[tool]()) for tool in rng.choices(tools, weights, k=calls)]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list; q in [0, 100].
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(min(rank, len(sorted_values))) - 1]
+
+
+def _child_pids() -> List[int]:
+    """
+    Direct children of this process, read from /proc (Linux only; empty elsewhere).
+    """
+    pids, me = [], os.getpid()
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return pids
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing parenthesis.
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == me:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class LoadReport:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.rss: List[Dict] = []
+        self.started = self.finished = 0.0
+
+    def observe(self, tool: str, latency: float, error: Optional[str]) -> None:
+        self.latencies.setdefault(tool, []).append(latency)
+        if error:
+            errors = self.errors.setdefault(tool, {})
+            errors[error] = errors.get(error, 0) + 1
+
+    def summary(self) -> Dict:
+        def stats(values: List[float], errors: int) -> Dict:
+            values = sorted(values)
+            return {
+                "calls": len(values),
+                "errors": errors,
+                "error_rate": round(errors / len(values), 4) if values else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p90_ms": round(percentile(values, 90) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            }
+
+        elapsed = self.finished - self.started
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        total_errors = sum(sum(e.values()) for e in self.errors.values())
+        rss_by_pid: Dict[str, List[float]] = {}
+        for sample in self.rss:
+            for pid, mb in sample["rss_mb"].items():
+                rss_by_pid.setdefault(pid, []).append(mb)
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(len(all_latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+            "overall": stats(all_latencies, total_errors),
+            "tools": {tool: dict(stats(values, sum(self.errors.get(tool, {}).values())),
+                                 error_types=self.errors.get(tool, {}))
+                      for tool, values in sorted(self.latencies.items())},
+            "rss_mb": {pid: {"start": round(v[0], 1), "peak": round(max(v), 1), "end": round(v[-1], 1)}
+                       for pid, v in rss_by_pid.items()},
+            "rss_samples": self.rss,
+        }
+
+
+def server_environment(sink: SmtpSink, workdir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.pop("HR_TRACE_FILE", None)
+    env.pop("HR_STATE_ADDRESSES", None)
+    env.update({
+        "HR_TRANSPORT": "stdio",
+        "HR_SMTP_SERVER": sink.host,
+        "HR_SMTP_PORT": str(sink.port),
+        "HR_SMTP_SECURITY": "none",
+        "CB_EMAIL": "hr-load@atliq.com",
+        "CB_EMAIL_PWD": "",
+        "HR_DATA_DIR": os.path.join(workdir, "data"),
+        "HR_ARCHIVE_DIR": os.path.join(workdir, "archive"),
+        "HR_SCHEDULER_JOURNAL": os.path.join(workdir, "scheduler.jsonl"),
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    return env
+
+
+async def run_load(
+        plan: List[Call],
+        servers: int = 1,
+        sessions: int = 4,
+        rate: Optional[float] = None,
+        speed: float = 1.0,
+        sample_interval: float = 1.0,
+        timeout: float = 30.0,
+        env: Optional[Dict[str, str]] = None,
+        errlog=None,
+) -> LoadReport:
+    """
+    Replay `plan` against `servers` stdio server processes from `sessions` concurrent sessions,
+    spread round-robin over the servers.
+
+    With a `rate` (calls per second), or trace offsets scaled by `speed`, the run is open
+    loop: every call has an intended start time and its latency is measured from that
+    time, so a server that falls behind shows up as queueing delay instead of a lower
+    request rate. Without either, each session sends its next call as soon as the last
+    one returns.
+    """
+    report = LoadReport()
+    params = StdioServerParameters(command=sys.executable, args=[os.path.join(REPO_ROOT, "server.py")],
+                                   env=env, cwd=REPO_ROOT)
+    if rate:
+        offsets = [i / rate for i in range(len(plan))]
+    elif speed > 0 and plan and all(t is not None for t, _, _ in plan):
+        offsets = [t / speed for t, _, _ in plan]
+    else:
+        offsets = [None] * len(plan)
+    pending = iter(range(len(plan)))
+
+    async with AsyncExitStack() as stack:
+        clients = []
+        for _ in range(servers):
+            read, write = await stack.enter_async_context(stdio_client(params, errlog=errlog or sys.stderr))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            clients.append(session)
+        pids = _child_pids()
+        report.started = start = time.perf_counter()
+
+        async def sample_rss() -> None:
+            while True:
+                report.rss.append({"t": round(time.perf_counter() - start, 3),
+                                   "rss_mb": {str(pid): mb for pid in pids
+                                              if (mb := _rss_mb(pid)) is not None}})
+                await asyncio.sleep(sample_interval)
+
+        async def worker(client: ClientSession) -> None:
+            for i in pending:
+                _, tool, args = plan[i]
+                intended = None if offsets[i] is None else start + offsets[i]
+                if intended is not None and intended > time.perf_counter():
+                    await asyncio.sleep(intended - time.perf_counter())
+                sent = time.perf_counter()
+                error = None
+                try:
+                    result = await client.call_tool(tool, args, read_timeout_seconds=timedelta(seconds=timeout))
+                    if result.isError:
+                        error = "ToolError"
+                except Exception as exc:
+                    error = type(exc).__name__
+                report.observe(tool, time.perf_counter() - (sent if intended is None else intended), error)
+
+        sampler = asyncio.create_task(sample_rss())
+        await asyncio.gather(*(worker(clients[i % servers]) for i in range(sessions)))
+        report.finished = time.perf_counter()
+        sampler.cancel()
+        report.rss.append({"t": round(report.finished - start, 3),
+                           "rss_mb": {str(pid): mb for pid in pids if (mb := _rss_mb(pid)) is not None}})
+    return report
+
+
+def print_report(summary: Dict, sink: SmtpSink) -> None:
+    print(f"{'tool':<28} {'calls':>7} {'err%':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for tool, s in list(summary["tools"].items()) + [("TOTAL", summary["overall"])]:
+        print(f"{tool:<28} {s['calls']:>7} {s['error_rate'] * 100:>5.1f}% {s['p50_ms']:>9.2f} "
+              f"{s['p90_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}")
+    print(f"\n{summary['overall']['calls']} calls in {summary['elapsed_s']}s "
+          f"({summary['throughput_per_s']}/s), {sink.messages} emails caught by the SMTP sink")
+    for pid, rss in summary["rss_mb"].items():
+        print(f"server pid {pid}: RSS {rss['start']} MB -> peak {rss['peak']} MB, end {rss['end']} MB")
+    failing = {tool: s["error_types"] for tool, s in summary["tools"].items() if s["error_types"]}
+    if failing:
+        print(f"errors: {failing}")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", help="JSONL trace recorded with HR_TRACE_FILE")
+    parser.add_argument("--mix", default="default", choices=sorted(WORKLOAD_MIXES),
+                        help="synthetic workload mix, used without --trace")
+    parser.add_argument("--calls", type=int, default=1000,
+                        help="calls to synthesize, or the maximum to replay from a trace")
+    parser.add_argument("--servers", type=int, default=1, help="server processes to spawn")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent client sessions")
+    parser.add_argument("--rate", type=float, help="target calls per second across all sessions")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="trace time multiplier; 0 replays as fast as the sessions allow")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between RSS samples")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-call timeout in seconds")
+    parser.add_argument("--json", help="also write the full report, with the RSS time series, to this file")
+    args = parser.parse_args(argv)
+    if args.servers < 1 or args.sessions < args.servers:
+        parser.error("Need at least one server and at least one session per server.")
+
+    plan = load_trace(args.trace, args.calls) if args.trace else synthesize(args.mix, args.calls, args.seed)
+    with tempfile.TemporaryDirectory(prefix="hr-load-") as workdir, SmtpSink() as sink, \
+            open(os.path.join(workdir, "servers.log"), "w") as errlog:
+        report = asyncio.run(run_load(plan, args.servers, args.sessions, args.rate, args.speed,
+                                      args.sample_interval, args.timeout, server_environment(sink, workdir),
+                                      errlog))
+        summary = report.summary()
+        summary["emails_received"] = sink.messages
+    print_report(summary, sink)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Multi-process deployment of the HR server.
+
+State lives in one or more state processes that own the HRMS managers and
+serve them over `multiprocessing.managers`. Shard 0 owns employees, tickets
+and business trips; leave and meeting data is sharded by employee ID across
+all state processes. N stateless worker processes run the MCP server over
+streamable HTTP (or SSE) and reach the managers through proxies.
+
+Usage:
+    python deploy.py --workers 4 --shards 2 --port 8000
+"""
+import argparse
+import os
+import threading
+import time
+import zlib
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Tuple
+
+from emails import email_sender_from_env
+from HRMS import (EmployeeManager, LeaveManager, MeetingManager, TicketManager, BusinessTripManager, EventBus,
+                  HolidayCalendar, SlaPolicy, ChangeLog, SearchIndex, AvailabilityIndex, OrgChart, open_archives)
+from HRMS.search_index import SEARCH_EVENTS
+from HRMS.availability import AVAILABILITY_EVENTS, ShardedAvailability
+from notifications import EmailNotifier, NOTIFY_EVENTS
+from follow_ups import FOLLOW_UP_EVENTS, follow_ups_enabled, follow_ups_from_env
+from utils import seed_services
+
+MANAGER_NAMES = ("employee_manager", "meeting_manager", "leave_manager", "ticket_manager", "business_trip_manager")
+SHARDED_MANAGERS = ("meeting_manager", "leave_manager")
+
+
+def shard_for(emp_id: str, shards: int) -> int:
+    """
+    Stable shard number for an employee ID (the built-in hash() differs between processes).
+    """
+    return zlib.crc32(emp_id.encode()) % shards
+
+
+def _public_methods(obj: Any) -> Tuple[str, ...]:
+    return tuple(name for name in dir(type(obj)) if not name.startswith("_") and callable(getattr(obj, name)))
+
+
+class Serialized:
+    """
+    Run every method of the wrapped manager under one lock.
+    The state server handles each client connection in its own thread, so
+    compound check-then-write operations must not interleave.
+    """
+
+    def __init__(self, target: Any):
+        self._target = target
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return call
+
+
+class StateServer(BaseManager):
+    pass
+
+
+class _StateClient(BaseManager):
+    # Kept apart from StateServer, whose registry is the one this process serves.
+    pass
+
+
+class RemoteManager:
+    """
+    A manager served by another state process, connected on first use so the
+    state processes can start in any order.
+    """
+
+    def __init__(self, name: str, address: Tuple[str, int], authkey: bytes):
+        self._name = name
+        self._address = address
+        self._authkey = authkey
+        self._proxy = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        with self._lock:
+            if self._proxy is None:
+                _StateClient.register(self._name)
+                client = _StateClient(address=self._address, authkey=self._authkey)
+                client.connect()
+                self._proxy = getattr(client, self._name)()
+        return getattr(self._proxy, name)
+
+
+def _build_state(shard: int, addresses: List[Tuple[str, int]], authkey: bytes) -> Dict[str, Any]:
+    shards = len(addresses)
+    event_bus = EventBus()
+    # Tickets and trips are served by shard 0 only, so only it may write the archive.
+    archive_dir = os.getenv("HR_ARCHIVE_DIR")
+    archives = open_archives(archive_dir) if archive_dir and shard == 0 else {}
+    managers = {
+        "employee_manager": EmployeeManager(events=event_bus),
+        "meeting_manager": MeetingManager(events=event_bus),
+        "leave_manager": LeaveManager(events=event_bus,
+                                      calendar=HolidayCalendar.from_string(os.getenv("HR_HOLIDAYS", ""))),
+        "ticket_manager": TicketManager(events=event_bus, archive=archives.get("tickets"),
+                                        sla=SlaPolicy.from_string(os.getenv("HR_TICKET_SLA_HOURS", ""),
+                                                                  float(os.getenv("HR_TICKET_DEFAULT_SLA_HOURS", "72")))),
+        "business_trip_manager": BusinessTripManager(events=event_bus, trip_archive=archives.get("trips"),
+                                                     expense_archive=archives.get("expenses")),
+    }
+    seed_services(managers["employee_manager"], managers["leave_manager"], managers["meeting_manager"],
+                  managers["ticket_manager"], managers["business_trip_manager"])
+    # Keep only the per-employee data this shard owns.
+    for name, attr in (("meeting_manager", "meetings"), ("meeting_manager", "series"),
+                       ("leave_manager", "employee_leaves")):
+        data = getattr(managers[name], attr)
+        for emp_id in [eid for eid in data if shard_for(eid, shards) != shard]:
+            del data[emp_id]
+    # Every shard records and indexes its own data; sequence numbers are per shard.
+    change_log = ChangeLog(int(os.getenv("HR_CHANGE_LOG_SIZE", "100000")))
+    event_bus.subscribe(change_log)
+    search_index = SearchIndex()
+    # The other shards seed tickets and trips too, but never serve them: indexing those would
+    # return phantom records and duplicates of shard 0's.
+    search_index.index_existing(managers["ticket_manager"] if shard == 0 else None,
+                                managers["business_trip_manager"] if shard == 0 else None,
+                                managers["meeting_manager"])
+    event_bus.subscribe(search_index, SEARCH_EVENTS)
+    # All bookings of an employee meet in the index of the employee's shard. Trips live on shard 0,
+    # which forwards them to the other shards' indexes and asks those about clashes.
+    meeting_minutes = int(os.getenv("HR_MEETING_MINUTES", "60"))
+    availability = AvailabilityIndex(meeting_minutes)
+    availability.index_existing(managers["leave_manager"], managers["meeting_manager"])
+    booking_availability = availability
+    if shard == 0 and shards > 1:
+        # The other shards do not depend on this one, so waiting for them here cannot deadlock.
+        for address in addresses[1:]:
+            _wait_for(address, authkey)
+        peers = connect_per_shard("availability", [f"{host}:{port}" for host, port in addresses[1:]], authkey)
+        booking_availability = ShardedAvailability([availability] + peers,
+                                                   lambda emp_id: shard_for(emp_id, shards), meeting_minutes)
+    if shard == 0:
+        booking_availability.index_trips(managers["business_trip_manager"].iter_trips())
+    event_bus.subscribe(booking_availability, AVAILABILITY_EVENTS)
+    managers["meeting_manager"].availability = availability
+    managers["business_trip_manager"].availability = booking_availability
+    # From here on every access goes through the per-manager locks that client calls also take.
+    locked = {name: Serialized(manager) for name, manager in managers.items()}
+    # Employees live on shard 0; the other shards look recipients up there, e.g. for leave they hold.
+    employees = locked["employee_manager"] if shard == 0 else RemoteManager("employee_manager", addresses[0], authkey)
+    emailer = email_sender_from_env()
+    if os.getenv("HR_NOTIFICATIONS", "1" if emailer.username else "0") == "1":
+        notifier = EmailNotifier(emailer, employees, flush_interval=float(os.getenv("HR_NOTIFY_INTERVAL", "60")))
+        event_bus.subscribe(notifier, NOTIFY_EVENTS, asynchronous=True)
+    services = {"change_log": change_log, "search_index": search_index, "availability": availability}
+    if shard == 0:
+        services["org_chart"] = OrgChart(locked["employee_manager"])
+    if follow_ups_enabled():
+        follow_ups = follow_ups_from_env(
+            emailer, employees,
+            locked["ticket_manager"] if shard == 0 else None,
+            locked["business_trip_manager"] if shard == 0 else None,
+            locked["meeting_manager"], journal_suffix=f".{shard}")
+        follow_ups.schedule_existing()
+        event_bus.subscribe(follow_ups, FOLLOW_UP_EVENTS)
+        follow_ups.scheduler.start()
+        services["scheduler"] = follow_ups.scheduler
+    return locked, services
+
+
+def serve_state(addresses: List[Tuple[str, int]], authkey: bytes, shard: int) -> None:
+    """
+    Run a state process that owns shard `shard` of the shards at `addresses` and serves its managers forever.
+    """
+    managers, services = _build_state(shard, addresses, authkey)
+    for name, service in services.items():
+        StateServer.register(name, callable=lambda service=service: service, exposed=_public_methods(service))
+    for name, serialized in managers.items():
+        if shard != 0 and name not in SHARDED_MANAGERS:
+            continue
+        StateServer.register(name, callable=lambda serialized=serialized: serialized,
+                             exposed=_public_methods(serialized._target))
+    StateServer(address=addresses[shard], authkey=authkey).get_server().serve_forever()
+
+
+class ShardedManager:
+    """
+    Route each call to the state shard that owns the employee it concerns.
+    The employee is taken from the first argument: an ID string, a request
+    or record dict with an `emp_id`, or a list of such items (split by shard). Calls that
+    concern no particular employee, such as accrual runs or calls without arguments, go to every shard
+    and return the list of per-shard results.
+    """
+
+    def __init__(self, shards: List[Any]):
+        self._shards = shards
+
+    @staticmethod
+    def _emp_id(key: Any) -> str:
+        if isinstance(key, str):
+            return key
+        return key["emp_id"] if isinstance(key, dict) else key.emp_id
+
+    def _shard(self, key: Any) -> Any:
+        return self._shards[shard_for(self._emp_id(key), len(self._shards))]
+
+    def __getattr__(self, name: str):
+        def call(*args, **kwargs):
+            key = args[0] if args else next(iter(kwargs.values()), None)
+            if not isinstance(key, (str, list)) and not hasattr(key, "emp_id") and not (
+                    isinstance(key, dict) and "emp_id" in key):
+                return [getattr(shard, name)(*args, **kwargs) for shard in self._shards]
+            if not isinstance(key, list):
+                return getattr(self._shard(key), name)(*args, **kwargs)
+            groups: Dict[int, List] = {}
+            for item in key:
+                groups.setdefault(shard_for(self._emp_id(item), len(self._shards)), []).append(item)
+            results = []
+            for shard, items in groups.items():
+                result = getattr(self._shards[shard], name)(items, *args[1:], **kwargs)
+                if isinstance(result, list):
+                    results.extend(result)
+                else:
+                    # Counts, e.g. from ingest_* or open_accounts, add up.
+                    results = (results or 0) + result
+            return results
+
+        return call
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def connect_state(addresses: List[str], authkey: bytes) -> Tuple[Any, ...]:
+    """
+    Connect to running state processes and return manager proxies in the order
+    employee, meeting, leave, ticket, business trip.
+    """
+    for name in MANAGER_NAMES:
+        StateServer.register(name)
+    clients = []
+    for address in addresses:
+        client = StateServer(address=_parse_address(address), authkey=authkey)
+        client.connect()
+        clients.append(client)
+    primary = clients[0]
+    proxies = []
+    for name in MANAGER_NAMES:
+        if name in SHARDED_MANAGERS and len(clients) > 1:
+            proxies.append(ShardedManager([getattr(c, name)() for c in clients]))
+        else:
+            proxies.append(getattr(primary, name)())
+    return tuple(proxies)
+
+
+def connect_per_shard(name: str, addresses: List[str], authkey: bytes) -> List[Any]:
+    """
+    Connect to a per-shard service ('change_log', 'search_index' or 'availability') on every state shard,
+    in shard order. 'org_chart' only exists on shard 0.
+    """
+    StateServer.register(name)
+    proxies = []
+    for address in addresses:
+        client = StateServer(address=_parse_address(address), authkey=authkey)
+        client.connect()
+        proxies.append(getattr(client, name)())
+    return proxies
+
+
+def _wait_for(address: Tuple[str, int], authkey: bytes, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            StateServer(address=address, authkey=authkey).connect()
+            return
+        except (ConnectionRefusedError, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the HR MCP server as N worker processes with shared state.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, default=1, help="Number of state processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--state-port", type=int, default=50000, help="First port used by the state processes")
+    parser.add_argument("--transport", choices=["streamable-http", "sse"], default="streamable-http")
+    args = parser.parse_args()
+
+    authkey = os.getenv("HR_STATE_AUTHKEY", os.urandom(16).hex()).encode()
+    addresses = [("127.0.0.1", args.state_port + i) for i in range(args.shards)]
+    processes = [
+        Process(target=serve_state, args=(addresses, authkey, shard), daemon=True)
+        for shard in range(args.shards)
+    ]
+    for process in processes:
+        process.start()
+    for address in addresses:
+        _wait_for(address, authkey)
+
+    # Workers are spawned by uvicorn and pick the state location up from the environment.
+    os.environ["HR_STATE_ADDRESSES"] = ",".join(f"{host}:{port}" for host, port in addresses)
+    os.environ["HR_STATE_AUTHKEY"] = authkey.decode()
+    os.environ["HR_TRANSPORT"] = args.transport
+
+    import uvicorn
+    try:
+        uvicorn.run("server:create_http_app", factory=True, host=args.host, port=args.port, workers=args.workers)
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
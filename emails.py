@@ -16,12 +16,17 @@ class EmailSender:
         username: str,
         password: str,
         use_tls: bool = True,
+        security: Optional[str] = None,
     ):
         self.smtp_server = smtp_server
         self.port = port
         self.username = username
         self.password = password
         self.use_tls = use_tls
+        # "starttls", "ssl" or "none"; use_tls picks between the first two when not given.
+        self.security = security or ("starttls" if use_tls else "ssl")
+        if self.security not in ("starttls", "ssl", "none"):
+            raise ValueError(f"Unknown SMTP security mode {self.security}.")
 
     def send_email(
         self,
@@ -54,7 +59,13 @@ class EmailSender:
 
         context = ssl.create_default_context()
 
-        if self.use_tls:
+        if self.security == "none":
+            # Plaintext, for local relays and test sinks only.
+            with smtplib.SMTP(self.smtp_server, self.port) as server:
+                if self.password:
+                    server.login(self.username, self.password)
+                server.send_message(msg)
+        elif self.security == "starttls":
             with smtplib.SMTP(self.smtp_server, self.port) as server:
                 server.starttls(context=context)
                 server.login(self.username, self.password)
@@ -64,6 +75,21 @@ class EmailSender:
                 server.login(self.username, self.password)
                 server.send_message(msg)
 
+def email_sender_from_env() -> EmailSender:
+    """
+    Build the sender from CB_EMAIL / CB_EMAIL_PWD, with the SMTP host and port
+    overridable through HR_SMTP_SERVER / HR_SMTP_PORT (Gmail by default) and the
+    transport through HR_SMTP_SECURITY (starttls, ssl or none).
+    """
+    return EmailSender(
+        smtp_server=os.getenv("HR_SMTP_SERVER", "smtp.gmail.com"),
+        port=int(os.getenv("HR_SMTP_PORT", "587")),
+        username=os.getenv("CB_EMAIL"),
+        password=os.getenv("CB_EMAIL_PWD"),
+        use_tls=True,
+        security=os.getenv("HR_SMTP_SECURITY", "starttls"),
+    )
+
 if __name__ == "__main__":
     email_sender = EmailSender(
         smtp_server="smtp.gmail.com",
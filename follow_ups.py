@@ -0,0 +1,284 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from emails import EmailSender
+from HRMS import (DomainEvent, EmployeeManager, TicketManager, BusinessTripManager, MeetingManager,
+                  TicketStatusUpdate)
+from HRMS.recurrence import MeetingSeries
+from HRMS.scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UP_EVENTS = ("trip.created", "trip.restored", "trip.escalated", "trip.status_changed", "ticket.created",
+                    "ticket.restored",
+                    "ticket.status_changed", "ticket.deleted", "meeting.scheduled", "meeting.cancelled",
+                    "meeting.series_scheduled", "meeting.series_updated", "meeting.series_cancelled")
+
+
+def _epoch(iso: str) -> float:
+    """
+    Epoch seconds of a naive UTC ISO timestamp, as stored in created_at/updated_at.
+    """
+    return (datetime.fromisoformat(iso) - datetime(1970, 1, 1)).total_seconds()
+
+
+class FollowUps:
+    """
+    Time-based follow-ups driven by HRMS events, run on a Scheduler.
+
+    - A trip still Pending `escalate_after` after it was created or last
+      escalated goes to the approver's own manager; when nobody is left above,
+      it is cancelled as expired.
+    - An Open ticket triggers a reminder to the employee's manager after
+      `ticket_remind_after` and is rejected as expired after `ticket_expire_after`.
+    - Employees get a reminder `meeting_reminder` before each meeting. A
+      recurring meeting has one timer, for its next occurrence, which sets
+      the following one when it fires.
+
+    Timers are keyed by record, so a status change cancels them. Handlers
+    re-check the record before acting, because a journal replayed after a
+    restart may refer to records that changed or no longer exist. IDs start
+    over when the data is reseeded, so each timer also carries the record's
+    created_at (the topic, for meetings) and is dropped when the record with
+    its ID no longer matches.
+    """
+
+    def __init__(
+            self,
+            scheduler: Scheduler,
+            emailer: Optional[EmailSender],
+            employee_manager: EmployeeManager,
+            ticket_manager: Optional[TicketManager] = None,
+            business_trip_manager: Optional[BusinessTripManager] = None,
+            meeting_manager: Optional[MeetingManager] = None,
+            escalate_after: timedelta = timedelta(hours=48),
+            ticket_remind_after: timedelta = timedelta(hours=72),
+            ticket_expire_after: timedelta = timedelta(days=30),
+            meeting_reminder: timedelta = timedelta(minutes=30),
+    ):
+        self.scheduler = scheduler
+        self.emailer = emailer
+        self.employee_manager = employee_manager
+        self.ticket_manager = ticket_manager
+        self.business_trip_manager = business_trip_manager
+        self.meeting_manager = meeting_manager
+        self.escalate_after = escalate_after
+        self.ticket_remind_after = ticket_remind_after
+        self.ticket_expire_after = ticket_expire_after
+        self.meeting_reminder = meeting_reminder
+        scheduler.register("trip.escalate", self._escalate_trip)
+        scheduler.register("ticket.remind", self._remind_ticket)
+        scheduler.register("ticket.expire", self._expire_ticket)
+        scheduler.register("meeting.remind", self._remind_meeting)
+
+    def __call__(self, event: DomainEvent) -> None:
+        d = event.data
+        if event.type in ("trip.created", "trip.escalated") or (
+                event.type == "trip.restored" and d["status"] == "Pending"):
+            self._schedule_escalation(event.entity_id, d["updated_at"], d["created_at"])
+        elif event.type == "trip.status_changed" and d["status"] != "Pending":
+            self.scheduler.cancel(f"trip:{event.entity_id}:escalate")
+        elif event.type == "ticket.created" or (event.type == "ticket.restored" and d["status"] == "Open"):
+            self._schedule_ticket(event.entity_id, d["created_at"])
+        elif event.type == "ticket.deleted" or (event.type == "ticket.status_changed" and d["status"] != "Open"):
+            self.scheduler.cancel(f"ticket:{event.entity_id}:remind")
+            self.scheduler.cancel(f"ticket:{event.entity_id}:expire")
+        elif event.type == "meeting.scheduled":
+            self._schedule_meeting(event.emp_id, d["date"], d["topic"])
+        elif event.type == "meeting.cancelled":
+            self.scheduler.cancel(f"meeting:{event.emp_id}@{d['date']}:remind")
+        elif event.type in ("meeting.series_scheduled", "meeting.series_updated"):
+            self._schedule_series(MeetingSeries.from_record(d))
+        elif event.type == "meeting.series_cancelled":
+            self.scheduler.cancel(f"meeting:{event.entity_id}:remind")
+
+    def _schedule_escalation(self, trip_id: str, since: str, created_at: str) -> None:
+        self.scheduler.schedule(f"trip:{trip_id}:escalate", "trip.escalate",
+                                _epoch(since) + self.escalate_after.total_seconds(),
+                                {"trip_id": trip_id, "created_at": created_at})
+
+    def _schedule_ticket(self, ticket_id: str, created_at: str) -> None:
+        created = _epoch(created_at)
+        payload = {"ticket_id": ticket_id, "created_at": created_at}
+        self.scheduler.schedule(f"ticket:{ticket_id}:remind", "ticket.remind",
+                                created + self.ticket_remind_after.total_seconds(), payload)
+        self.scheduler.schedule(f"ticket:{ticket_id}:expire", "ticket.expire",
+                                created + self.ticket_expire_after.total_seconds(), payload)
+
+    def _schedule_meeting(self, emp_id: str, meeting_dt: str, topic: str) -> None:
+        # Meeting times are local wall-clock times, unlike the UTC record timestamps.
+        due = datetime.fromisoformat(meeting_dt).timestamp() - self.meeting_reminder.total_seconds()
+        if due > self.scheduler.clock():
+            self.scheduler.schedule(f"meeting:{emp_id}@{meeting_dt}:remind", "meeting.remind", due,
+                                    {"emp_id": emp_id, "meeting_dt": meeting_dt, "topic": topic})
+
+    def _schedule_series(self, series: MeetingSeries, after: Optional[datetime] = None) -> None:
+        # The next occurrence whose reminder is still ahead, or the one after `after`.
+        since = datetime.fromtimestamp(self.scheduler.clock()) + self.meeting_reminder
+        if after is not None:
+            since = max(since, after + timedelta(microseconds=1))
+        key = f"meeting:{series.series_id}:remind"
+        start = next(series.occurrences(since), None)
+        if start is None:
+            self.scheduler.cancel(key)
+            return
+        self.scheduler.schedule(key, "meeting.remind", start.timestamp() - self.meeting_reminder.total_seconds(),
+                                {"emp_id": series.emp_id, "meeting_dt": start.isoformat(), "topic": series.topic,
+                                 "series_id": series.series_id})
+
+    def schedule_existing(self) -> int:
+        """
+        Set timers for records that existed before this subscriber was attached.
+        Keys that already have a timer, e.g. from the journal, are left alone once
+        `drop_stale` has removed the timers of records that no longer match.
+        """
+        self.drop_stale()
+        count = 0
+        if self.business_trip_manager is not None:
+            for trip in self.business_trip_manager.iter_trips():
+                if trip["status"] == "Pending" and self.scheduler.get(f"trip:{trip['trip_id']}:escalate") is None:
+                    self._schedule_escalation(trip["trip_id"], trip["updated_at"], trip["created_at"])
+                    count += 1
+        if self.ticket_manager is not None:
+            for ticket in self.ticket_manager.iter_tickets():
+                if ticket["status"] == "Open" and self.scheduler.get(f"ticket:{ticket['ticket_id']}:expire") is None:
+                    self._schedule_ticket(ticket["ticket_id"], ticket["created_at"])
+                    count += 1
+        if self.meeting_manager is not None:
+            for m in self.meeting_manager.iter_meetings():
+                if m.get("recurrence"):
+                    if self.scheduler.get(f"meeting:{m['series_id']}:remind") is None:
+                        self._schedule_series(MeetingSeries.from_record(m))
+                        count += 1
+                    continue
+                if self.scheduler.get(f"meeting:{m['emp_id']}@{m['meeting_dt']}:remind") is None:
+                    self._schedule_meeting(m["emp_id"], m["meeting_dt"], m["topic"])
+                    count += 1
+        return count
+
+    def drop_stale(self) -> int:
+        """
+        Cancel timers whose record is gone, no longer waits for them, or is a different record
+        under the same ID, and return how many were cancelled.
+        """
+        dropped = 0
+        for timer in self.scheduler.pending():
+            kind, payload = timer["kind"], timer["payload"]
+            if kind == "trip.escalate" and self.business_trip_manager is not None:
+                stale = self._pending_trip(payload) is None
+            elif kind in ("ticket.remind", "ticket.expire") and self.ticket_manager is not None:
+                stale = self._open_ticket(payload) is None
+            elif kind == "meeting.remind" and self.meeting_manager is not None:
+                stale = not self.meeting_manager.has_meeting(payload["emp_id"], payload["meeting_dt"],
+                                                             payload["topic"])
+            else:
+                continue
+            if stale and self.scheduler.cancel(timer["key"]):
+                dropped += 1
+        return dropped
+
+    def _send(self, emp_id: Optional[str], subject: str, body: str) -> None:
+        if not emp_id or self.emailer is None or not self.emailer.username:
+            return
+        try:
+            to_email = self.employee_manager.get_employee_details(emp_id).get("email")
+        except ValueError:
+            return
+        if not to_email:
+            return
+        try:
+            self.emailer.send_email(subject, body, [to_email], from_email=self.emailer.username)
+        except Exception:
+            logger.exception("Failed to send follow-up to %s", to_email)
+
+    def _manager_of(self, emp_id: Optional[str]) -> Optional[str]:
+        try:
+            return self.employee_manager.get_manager_id(emp_id) if emp_id else None
+        except ValueError:
+            return None
+
+    def _pending_trip(self, payload: dict) -> Optional[dict]:
+        try:
+            trip = self.business_trip_manager.get_trip_details(payload["trip_id"])
+        except ValueError:
+            return None
+        if trip["status"] != "Pending" or trip["created_at"] != payload.get("created_at"):
+            return None
+        return trip
+
+    def _escalate_trip(self, key: str, payload: dict) -> None:
+        trip = self._pending_trip(payload)
+        if trip is None:
+            return
+        next_approver = self._manager_of(trip["manager_id"] or trip["emp_id"])
+        if next_approver is None or next_approver == trip["emp_id"]:
+            self.business_trip_manager.cancel_trip(trip["trip_id"], reason="Expired without approval")
+            self._send(trip["emp_id"], f"Trip {trip['trip_id']} expired",
+                       f"Your trip to {trip['destination']} was not approved in time and has been cancelled.")
+            return
+        # Publishes trip.escalated, which schedules the next escalation.
+        self.business_trip_manager.reassign_approver(trip["trip_id"], next_approver)
+        self._send(next_approver, f"Trip {trip['trip_id']} escalated to you",
+                   f"The trip of {trip['emp_id']} to {trip['destination']} ({trip['start_date']} - "
+                   f"{trip['end_date']}) has waited for approval since {trip['created_at']}.")
+
+    def _open_ticket(self, payload: dict) -> Optional[dict]:
+        try:
+            ticket = self.ticket_manager.get_ticket(payload["ticket_id"])
+        except ValueError:
+            return None
+        if ticket["status"] != "Open" or ticket["created_at"] != payload.get("created_at"):
+            return None
+        return ticket
+
+    def _remind_ticket(self, key: str, payload: dict) -> None:
+        ticket = self._open_ticket(payload)
+        if ticket is not None:
+            self._send(self._manager_of(ticket["emp_id"]), f"Ticket {ticket['ticket_id']} is still open",
+                       f"{ticket['item']} for {ticket['emp_id']} ({ticket['reason']}) has been open since "
+                       f"{ticket['created_at']}.")
+
+    def _expire_ticket(self, key: str, payload: dict) -> None:
+        ticket = self._open_ticket(payload)
+        if ticket is not None:
+            self.ticket_manager.update_ticket_status(TicketStatusUpdate(status="Rejected"), ticket["ticket_id"])
+            self._send(ticket["emp_id"], f"Ticket {ticket['ticket_id']} expired",
+                       f"Your request for {ticket['item']} was not handled in time and has been closed. "
+                       f"Please open a new ticket if you still need it.")
+
+    def _remind_meeting(self, key: str, payload: dict) -> None:
+        if self.meeting_manager is not None and payload.get("series_id"):
+            try:
+                series = MeetingSeries.from_record(
+                    self.meeting_manager.get_meeting_series(payload["emp_id"], payload["series_id"]))
+            except ValueError:
+                return
+            if series.topic != payload["topic"]:
+                return
+            self._schedule_series(series, datetime.fromisoformat(payload["meeting_dt"]))
+        if self.meeting_manager is not None and not self.meeting_manager.has_meeting(
+                payload["emp_id"], payload["meeting_dt"], payload["topic"]):
+            return
+        self._send(payload["emp_id"], f"Reminder: {payload['topic']}",
+                   f"You have '{payload['topic']}' at {payload['meeting_dt']}.")
+
+
+def follow_ups_enabled() -> bool:
+    return os.getenv("HR_FOLLOW_UPS", "0").lower() in ("1", "true", "yes", "on")
+
+
+def follow_ups_from_env(emailer: Optional[EmailSender], employee_manager, ticket_manager=None,
+                        business_trip_manager=None, meeting_manager=None, journal_suffix: str = "") -> FollowUps:
+    """
+    Build the follow-ups on a journaled scheduler from the HR_* settings.
+    """
+    scheduler = Scheduler(os.getenv("HR_SCHEDULER_JOURNAL", "scheduler.jsonl") + journal_suffix)
+    return FollowUps(
+        scheduler, emailer, employee_manager, ticket_manager, business_trip_manager, meeting_manager,
+        escalate_after=timedelta(hours=float(os.getenv("HR_TRIP_ESCALATE_HOURS", "48"))),
+        ticket_remind_after=timedelta(hours=float(os.getenv("HR_TICKET_REMIND_HOURS", "72"))),
+        ticket_expire_after=timedelta(days=float(os.getenv("HR_TICKET_EXPIRE_DAYS", "30"))),
+        meeting_reminder=timedelta(minutes=float(os.getenv("HR_MEETING_REMINDER_MINUTES", "30"))),
+    )
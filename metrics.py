@@ -0,0 +1,330 @@
+import atexit
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _payload_size(value: Any) -> int:
+    """
+    Approximate the serialized size of a tool argument or result in bytes.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, "model_dump_json"):
+        return len(value.model_dump_json())
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+def _jsonable(value: Any) -> Any:
+    """
+    json.dumps fallback for tool arguments: pydantic models, dates and anything else as text.
+    """
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class CallStats:
+    def __init__(self):
+        self.calls: int = 0
+        self.errors: Dict[str, int] = {}
+        self.latency_sum: float = 0.0
+        self.latency_max: float = 0.0
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.request_bytes: int = 0
+        self.response_bytes: int = 0
+
+    def observe(self, elapsed: float, request_bytes: int, response_bytes: int, error: Optional[str]) -> None:
+        self.calls += 1
+        self.latency_sum += elapsed
+        if elapsed > self.latency_max:
+            self.latency_max = elapsed
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "latency_avg_ms": round(self.latency_sum / self.calls * 1000, 3) if self.calls else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+            "latency_buckets": {
+                ("+Inf" if i == len(LATENCY_BUCKETS) else str(LATENCY_BUCKETS[i])): count
+                for i, count in enumerate(self.buckets) if count
+            },
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, profile_sample_rate: float = 0.0, payload_sample_rate: float = 0.1):
+        self.enabled = enabled
+        self.stats: Dict[Tuple[str, str], CallStats] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._sample_every = int(round(1 / profile_sample_rate)) if profile_sample_rate > 0 else 0
+        self._sample_counter = 0
+        # Serializing arguments and results costs more than most calls, so only a sample is
+        # measured and each measured size counts for the calls it stands for.
+        self._payload_every = int(round(1 / payload_sample_rate)) if payload_sample_rate > 0 else 0
+        self._payload_counter = 0
+        self._profile: Optional[pstats.Stats] = None
+        self.profiled_calls = 0
+        self._trace = None
+        self._trace_started: float = 0.0
+        self.traced_calls = 0
+
+    def start_trace(self, path: str) -> None:
+        """
+        Append every tool call to a JSONL trace: its offset in seconds from the start
+        of the trace, the tool name and the arguments, plus latency and error type.
+        `benchmarks.load_replay` replays such a trace against fresh servers.
+        """
+        self._trace = open(path, "a", encoding="utf-8")
+        self._trace_started = time.perf_counter()
+
+    def _record_trace(self, name: str, started: float, elapsed: float, kwargs: Dict, error: Optional[str]) -> None:
+        line = json.dumps({
+            "t": round(started - self._trace_started, 6),
+            "tool": name,
+            "args": kwargs,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "error": error,
+        }, default=_jsonable)
+        with self._lock:
+            self._trace.write(line + "\n")
+            self._trace.flush()
+            self.traced_calls += 1
+
+    def _should_profile(self) -> bool:
+        if not self._sample_every:
+            return False
+        with self._lock:
+            self._sample_counter += 1
+            if self._sample_counter < self._sample_every:
+                return False
+            self._sample_counter = 0
+        return True
+
+    def _should_measure_payload(self) -> bool:
+        if not self._payload_every:
+            return False
+        with self._lock:
+            self._payload_counter += 1
+            if self._payload_counter < self._payload_every:
+                return False
+            self._payload_counter = 0
+        return True
+
+    def record(self, kind: str, name: str, elapsed: float, request_bytes: int = 0,
+               response_bytes: int = 0, error: Optional[str] = None) -> None:
+        """
+        Record one call of a tool or manager method.
+        """
+        key = (kind, name)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = CallStats()
+            stats.observe(elapsed, request_bytes, response_bytes, error)
+
+    def _merge_profile(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            if self._profile is None:
+                self._profile = pstats.Stats(profile)
+            else:
+                self._profile.add(profile)
+            self.profiled_calls += 1
+
+    def instrument(self, fn: Callable, kind: str = "tool", name: Optional[str] = None) -> Callable:
+        """
+        Wrap a callable so that every call is timed and counted.
+        Returns the callable untouched when metrics are disabled, so a disabled
+        registry adds no per-call overhead at all.
+        """
+        if not self.enabled:
+            return fn
+        name = name or fn.__name__
+        registry = self
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            profile = None
+            if registry._should_profile():
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler is already active on this thread.
+                    profile = None
+            measure_payload = registry._should_measure_payload()
+            start = time.perf_counter()
+            error = None
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            except Exception as exc:
+                error = type(exc).__name__
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                if profile is not None:
+                    profile.disable()
+                    registry._merge_profile(profile)
+                request_bytes = response_bytes = 0
+                if measure_payload:
+                    every = registry._payload_every
+                    request_bytes = every * (sum(_payload_size(a) for a in args)
+                                             + (_payload_size(kwargs) if kwargs else 0))
+                    response_bytes = every * _payload_size(result)
+                registry.record(kind, name, elapsed, request_bytes, response_bytes, error)
+                if kind == "tool" and registry._trace is not None:
+                    registry._record_trace(name, start, elapsed, kwargs, error)
+
+        return wrapper
+
+    def instrument_object(self, obj: Any, kind: str = "manager") -> Any:
+        """
+        Instrument every public method of an object in place, e.g. an HRMS manager.
+        Methods are recorded as '<ClassName>.<method>'. Attributes are looked up
+        statically, so properties are not evaluated and only functions are wrapped.
+        """
+        if not self.enabled:
+            return obj
+        cls_name = type(obj).__name__
+        for attr in dir(type(obj)):
+            if attr.startswith("_"):
+                continue
+            raw = inspect.getattr_static(obj, attr)
+            if inspect.isfunction(raw) or isinstance(raw, (staticmethod, classmethod)):
+                setattr(obj, attr, self.instrument(getattr(obj, attr), kind=kind, name=f"{cls_name}.{attr}"))
+        return obj
+
+    def install(self, mcp) -> None:
+        """
+        Make every tool registered afterwards through `mcp.tool()` instrumented.
+        """
+        register = mcp.tool
+
+        def tool(*args, **kwargs):
+            decorator = register(*args, **kwargs)
+
+            def wrap(fn):
+                return decorator(self.instrument(fn, kind="tool"))
+
+            return wrap
+
+        mcp.tool = tool
+
+    def snapshot(self) -> Dict:
+        """
+        Return all collected metrics as a JSON-serializable dict.
+        """
+        with self._lock:
+            stats = {f"{kind}:{name}": s.to_dict() for (kind, name), s in sorted(self.stats.items())}
+        return {
+            "enabled": self.enabled,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "profiled_calls": self.profiled_calls,
+            "traced_calls": self.traced_calls,
+            "calls": stats,
+        }
+
+    def profile_report(self, limit: int = 20) -> str:
+        """
+        Return the hottest functions seen by the sampling profiler.
+        """
+        with self._lock:
+            if self._profile is None:
+                return "No profiled calls yet."
+            out = io.StringIO()
+            self._profile.stream = out
+            self._profile.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def render_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP hr_calls_total Number of calls per tool or manager method.",
+            "# TYPE hr_calls_total counter",
+        ]
+        with self._lock:
+            items = sorted((key, s) for key, s in self.stats.items())
+            errors, latency, payload = [], [], []
+            for (kind, name), s in items:
+                labels = f'kind="{kind}",name="{name}"'
+                lines.append(f"hr_calls_total{{{labels}}} {s.calls}")
+                for exc_type, count in sorted(s.errors.items()):
+                    errors.append(f'hr_errors_total{{{labels},exception="{exc_type}"}} {count}')
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                    cumulative += count
+                    latency.append(f'hr_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                latency.append(f'hr_latency_seconds_bucket{{{labels},le="+Inf"}} {s.calls}')
+                latency.append(f"hr_latency_seconds_sum{{{labels}}} {s.latency_sum:.9f}")
+                latency.append(f"hr_latency_seconds_count{{{labels}}} {s.calls}")
+                payload.append(f'hr_payload_bytes_total{{{labels},direction="request"}} {s.request_bytes}')
+                payload.append(f'hr_payload_bytes_total{{{labels},direction="response"}} {s.response_bytes}')
+        lines += ["# HELP hr_errors_total Exceptions raised, by type.", "# TYPE hr_errors_total counter"] + errors
+        lines += ["# HELP hr_latency_seconds Call latency.", "# TYPE hr_latency_seconds histogram"] + latency
+        lines += ["# HELP hr_payload_bytes_total Serialized argument and result sizes, estimated from sampled calls.",
+                  "# TYPE hr_payload_bytes_total counter"] + payload
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Atomically write the Prometheus exposition to a file, e.g. for the node_exporter textfile collector.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+def registry_from_env() -> MetricsRegistry:
+    """
+    Build the registry from HR_METRICS, HR_PROFILE_SAMPLE_RATE, HR_PAYLOAD_SAMPLE_RATE, HR_METRICS_FILE
+    and HR_TRACE_FILE.
+    """
+    registry = MetricsRegistry(
+        enabled=os.getenv("HR_METRICS", "1").lower() not in ("0", "false", "no", "off"),
+        profile_sample_rate=float(os.getenv("HR_PROFILE_SAMPLE_RATE", "0") or 0),
+        payload_sample_rate=float(os.getenv("HR_PAYLOAD_SAMPLE_RATE", "0.1") or 0),
+    )
+    metrics_file = os.getenv("HR_METRICS_FILE")
+    if registry.enabled and metrics_file:
+        atexit.register(registry.write_prometheus, metrics_file)
+    trace_file = os.getenv("HR_TRACE_FILE")
+    if registry.enabled and trace_file:
+        registry.start_trace(trace_file)
+    return registry
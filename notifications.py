@@ -0,0 +1,114 @@
+import atexit
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from emails import EmailSender
+from HRMS import DomainEvent, EmployeeManager
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_EVENTS = ("trip.created", "trip.status_changed", "leave.applied", "ticket.created", "ticket.status_changed")
+
+
+class EmailNotifier:
+    """
+    Asynchronous event subscriber that mails HR notifications as digests.
+
+    Events are grouped per recipient and coalesced per record, so a trip that
+    is created and approved within one window shows up once, in its latest
+    state. Digests go out every `flush_interval` seconds, or as soon as a
+    recipient has `max_batch` pending lines.
+    """
+
+    def __init__(self, emailer: EmailSender, employee_manager: EmployeeManager,
+                 flush_interval: float = 60.0, max_batch: int = 50):
+        self.emailer = emailer
+        self.employee_manager = employee_manager
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.pending: Dict[str, Dict[str, str]] = {}
+        self.sent: int = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._run, name="hr-email-notifier", daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+
+    def _email_of(self, emp_id: Optional[str]) -> Optional[str]:
+        if not emp_id:
+            return None
+        try:
+            return self.employee_manager.get_employee_details(emp_id).get("email")
+        except ValueError:
+            return None
+
+    def _manager_of(self, emp_id: Optional[str]) -> Optional[str]:
+        try:
+            return self.employee_manager.get_manager_id(emp_id) if emp_id else None
+        except ValueError:
+            return None
+
+    def _route(self, event: DomainEvent) -> Tuple[Optional[str], str, str]:
+        """
+        Return (recipient employee ID, coalescing key, digest line) for an event.
+        """
+        d = event.data
+        if event.type.startswith("trip."):
+            key = f"trip:{event.entity_id}"
+            line = f"Trip {event.entity_id}: {event.emp_id} to {d['destination']} " \
+                   f"({d['start_date']} - {d['end_date']}) is {d['status']}."
+            if event.type == "trip.status_changed" and d["status"] in ("Approved", "Rejected"):
+                return event.emp_id, key, line
+            return d.get("manager_id") or self._manager_of(event.emp_id), key, line
+        if event.type.startswith("ticket."):
+            line = f"Ticket {event.entity_id}: {d['item']} for {event.emp_id} ({d['reason']}) is {d['status']}."
+            return self._manager_of(event.emp_id), f"ticket:{event.entity_id}", line
+        dates = ", ".join(d["leave_dates"])
+        line = f"Leave: {event.emp_id} applied for {dates} ({d['balance']} days left)."
+        return self._manager_of(event.emp_id), f"leave:{event.emp_id}:{dates}", line
+
+    def __call__(self, event: DomainEvent) -> None:
+        recipient, key, line = self._route(event)
+        if not recipient:
+            return
+        with self._lock:
+            lines = self.pending.setdefault(recipient, {})
+            lines[key] = line
+            full = len(lines) >= self.max_batch
+        if full:
+            self.flush(recipient)
+
+    def flush(self, recipient: Optional[str] = None) -> None:
+        """
+        Send the pending digest for one recipient, or for everyone.
+        """
+        with self._lock:
+            if recipient is None:
+                batches, self.pending = self.pending, {}
+            else:
+                batches = {recipient: self.pending.pop(recipient, {})}
+        for emp_id, lines in batches.items():
+            # The employee lookup may go to another process (see deploy.py), so it can fail too.
+            try:
+                to_email = self._email_of(emp_id)
+                if not lines or not to_email:
+                    continue
+                body = "\n".join(f"- {line}" for line in lines.values())
+                self.emailer.send_email(
+                    f"HR updates: {len(lines)} item(s)",
+                    f"The following HR records changed:\n\n{body}\n",
+                    [to_email],
+                    from_email=self.emailer.username,
+                )
+                self.sent += 1
+            except Exception:
+                logger.exception("Failed to send HR digest to %s", emp_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
@@ -1,32 +1,100 @@
-from emails import EmailSender
+from emails import email_sender_from_env
 from HRMS import *
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+from datetime import timedelta
 from mcp.server.fastmcp import FastMCP
 
 # load the env
 from dotenv import load_dotenv
 load_dotenv()
 
+import heapq
 import os
 from utils import seed_services
-
-employee_manager = EmployeeManager()
-meeting_manager = MeetingManager()
-leave_manager = LeaveManager()
-ticket_manager = TicketManager()
-business_trip_manager = BusinessTripManager()
-
-seed_services(employee_manager, leave_manager, meeting_manager, ticket_manager, business_trip_manager)
-
-emailer = EmailSender(
-    smtp_server="smtp.gmail.com",
-    port=587,
-    username=os.getenv("CB_EMAIL"),
-    password=os.getenv("CB_EMAIL_PWD"),
-    use_tls=True
-)
+from metrics import registry_from_env
+from notifications import EmailNotifier, NOTIFY_EVENTS
+from follow_ups import FOLLOW_UP_EVENTS, follow_ups_enabled, follow_ups_from_env
+from HRMS.bulk_io import import_file, export_file
+from HRMS.search_index import SEARCH_EVENTS
+from HRMS.availability import AVAILABILITY_EVENTS, day_span
+
+metrics = registry_from_env()
+
+holiday_calendar = HolidayCalendar.from_string(os.getenv("HR_HOLIDAYS", ""))
+
+if os.getenv("HR_STATE_ADDRESSES"):
+    # Running as one of several workers (see deploy.py): state is owned by the state processes.
+    from deploy import connect_state, connect_per_shard
+    employee_manager, meeting_manager, leave_manager, ticket_manager, business_trip_manager = connect_state(
+        os.getenv("HR_STATE_ADDRESSES").split(","), os.getenv("HR_STATE_AUTHKEY", "").encode()
+    )
+    change_logs = connect_per_shard(
+        "change_log", os.getenv("HR_STATE_ADDRESSES").split(","), os.getenv("HR_STATE_AUTHKEY", "").encode()
+    )
+    search_indexes = connect_per_shard(
+        "search_index", os.getenv("HR_STATE_ADDRESSES").split(","), os.getenv("HR_STATE_AUTHKEY", "").encode()
+    )
+    availability_indexes = connect_per_shard(
+        "availability", os.getenv("HR_STATE_ADDRESSES").split(","), os.getenv("HR_STATE_AUTHKEY", "").encode()
+    )
+    org_chart = connect_per_shard(
+        "org_chart", os.getenv("HR_STATE_ADDRESSES").split(",")[:1], os.getenv("HR_STATE_AUTHKEY", "").encode()
+    )[0]
+    schedulers = connect_per_shard(
+        "scheduler", os.getenv("HR_STATE_ADDRESSES").split(","), os.getenv("HR_STATE_AUTHKEY", "").encode()
+    ) if follow_ups_enabled() else []
+else:
+    event_bus = EventBus()
+    archive_dir = os.getenv("HR_ARCHIVE_DIR")
+    archives = open_archives(archive_dir) if archive_dir else {}
+    employee_manager = EmployeeManager(events=event_bus)
+    meeting_manager = MeetingManager(events=event_bus)
+    leave_manager = LeaveManager(events=event_bus, calendar=holiday_calendar)
+    ticket_manager = TicketManager(events=event_bus, archive=archives.get("tickets"),
+                                   sla=SlaPolicy.from_string(os.getenv("HR_TICKET_SLA_HOURS", ""),
+                                                             float(os.getenv("HR_TICKET_DEFAULT_SLA_HOURS", "72"))))
+    business_trip_manager = BusinessTripManager(events=event_bus, trip_archive=archives.get("trips"),
+                                                expense_archive=archives.get("expenses"))
+
+    seed_services(employee_manager, leave_manager, meeting_manager, ticket_manager, business_trip_manager)
+
+    # Subscribed after seeding: readers load the full lists once, then follow the log from last_seq.
+    change_logs = [ChangeLog(int(os.getenv("HR_CHANGE_LOG_SIZE", "100000")))]
+    event_bus.subscribe(change_logs[0])
+    search_indexes = [SearchIndex()]
+    search_indexes[0].index_existing(ticket_manager, business_trip_manager, meeting_manager)
+    event_bus.subscribe(search_indexes[0], SEARCH_EVENTS)
+    # Attached after seeding so the random sample bookings are loaded as they are, not rejected.
+    availability_indexes = [AvailabilityIndex(int(os.getenv("HR_MEETING_MINUTES", "60")))]
+    availability_indexes[0].index_existing(leave_manager, meeting_manager, business_trip_manager)
+    event_bus.subscribe(availability_indexes[0], AVAILABILITY_EVENTS)
+    meeting_manager.availability = business_trip_manager.availability = availability_indexes[0]
+    org_chart = OrgChart(employee_manager)
+
+emailer = email_sender_from_env()
+
+if not os.getenv("HR_STATE_ADDRESSES") and os.getenv("HR_NOTIFICATIONS", "1" if emailer.username else "0") == "1":
+    # Subscribed after seeding so the sample data does not trigger any mail.
+    notifier = EmailNotifier(emailer, employee_manager,
+                             flush_interval=float(os.getenv("HR_NOTIFY_INTERVAL", "60")))
+    event_bus.subscribe(notifier, NOTIFY_EVENTS, asynchronous=True)
+
+if not os.getenv("HR_STATE_ADDRESSES"):
+    schedulers = []
+    if follow_ups_enabled():
+        follow_ups = follow_ups_from_env(emailer, employee_manager, ticket_manager, business_trip_manager,
+                                         meeting_manager)
+        follow_ups.schedule_existing()
+        event_bus.subscribe(follow_ups, FOLLOW_UP_EVENTS)
+        follow_ups.scheduler.start()
+        schedulers.append(follow_ups.scheduler)
+
+if os.getenv("HR_METRICS_MANAGERS", "0").lower() in ("1", "true", "yes", "on"):
+    for manager in (employee_manager, meeting_manager, leave_manager, ticket_manager, business_trip_manager):
+        metrics.instrument_object(manager)
 
 mcp = FastMCP("hr-assist")
+metrics.install(mcp)
 
 @mcp.tool()
 def add_employee(emp_name:str, manager_id:str, email:str) -> str:
@@ -36,17 +104,11 @@ def add_employee(emp_name:str, manager_id:str, email:str) -> str:
     :param manager_id: Manager ID (optional)
     :return: Confirmation message
     """
-    emp = EmployeeCreate(
-        emp_id=employee_manager.get_next_emp_id(),
-        name=emp_name,
-        manager_id=manager_id,
-        email=email
-    )
-    employee_manager.add_employee(emp)
+    employee_manager.add_new_employee(emp_name, manager_id, email)
     return f"Employee {emp_name} added successfully."
 
 @mcp.tool()
-def get_employee_details(name: str) -> Dict[str, str]:
+def get_employee_details(name: str) -> Dict:
     """
     Get employee details by name.
     :param name: Name of the employee
@@ -62,21 +124,22 @@ def get_employee_details(name: str) -> Dict[str, str]:
     return emp_details
 
 @mcp.tool()
-def send_email(to_emails: List[str], subject: str, body: str, html: bool = False) -> None:
+def send_email(to_emails: List[str], subject: str, body: str, html: bool = False) -> str:
     emailer.send_email(subject, body, to_emails, from_email=emailer.username, html=html)
     return "Email sent successfully."
 
 
 @mcp.tool()
-def create_ticket(emp_id: str, item: str, reason:str) -> str:
+def create_ticket(emp_id: str, item: str, reason:str, priority: str = "Normal") -> str:
     """
     Create a ticket for buying required items for an employee.
     :param emp_id: Employee ID
     :param item: Item requested (Laptop, ID Card, etc.)
     :param reason: Reason for the request
+    :param priority: Low, Normal, High or Urgent
     :return: Confirmation message
     """
-    ticket_req = TicketCreate(emp_id=emp_id, item=item, reason=reason)
+    ticket_req = TicketCreate(emp_id=emp_id, item=item, reason=reason, priority=priority)
     return ticket_manager.create_ticket(ticket_req)
 
 @mcp.tool()
@@ -91,47 +154,135 @@ def update_ticket_status(ticket_id: str, status: str) -> str:
     return ticket_manager.update_ticket_status(ticket_status_update, ticket_id)
 
 @mcp.tool()
-def list_tickets(employee_id: str, status: str) -> str:
+def set_ticket_priority(ticket_id: str, priority: str) -> str:
+    """
+    Change the triage priority of a ticket.
+    :param ticket_id: Ticket ID
+    :param priority: Low, Normal, High or Urgent
+    :return: Confirmation message
+    """
+    return ticket_manager.set_ticket_priority(ticket_id, priority)
+
+@mcp.tool()
+def triage_tickets(order: str = "priority", limit: int = 20, employee_id: Optional[str] = None,
+                   item: Optional[str] = None, breaching_sla: bool = False) -> List[Dict]:
+    """
+    Open and in-progress tickets for IT triage, e.g. the 20 oldest or those past their SLA.
+    :param order: "priority" (highest first, then oldest), "age" (oldest first) or "sla" (earliest due first)
+    :param limit: Maximum number of tickets
+    :param employee_id: Only tickets of this employee (optional)
+    :param item: Only tickets for this item (optional)
+    :param breaching_sla: Only tickets already past their SLA, most overdue first; ignores order
+    :return: Tickets with their priority and sla_due_at
+    """
+    if breaching_sla:
+        return ticket_manager.sla_breaches(limit=limit, employee_id=employee_id, item=item)
+    return ticket_manager.top_tickets(order, limit, employee_id, item)
+
+
+def _page(manager, items: List[Dict], order_by: str, limit: Optional[int]) -> Union[List[Dict], Dict]:
+    """
+    Wrap a limited listing with the cursor of its next page, None on the last page.
+    """
+    if limit is None:
+        return items
+    next_cursor = manager.cursor_for(items[-1], order_by) if items and len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@mcp.tool()
+def list_tickets(employee_id: str, status: str, include_archived: bool = False, since: Optional[str] = None,
+                 until: Optional[str] = None, order_by: str = "created_at", newest_first: bool = False,
+                 limit: Optional[int] = None, cursor: Optional[str] = None) -> Union[List[Dict], Dict]:
     """
-    List tickets for an employee with optional status filter.
+    List tickets for an employee with optional status filter, oldest first.
     :param employee_id: Employee ID
     :param status: Ticket status (optional)
-    :return: List of tickets
+    :param include_archived: Also read archived tickets from disk (slower)
+    :param since: Only tickets with order_by at or after this ISO date/time (optional)
+    :param until: Only tickets with order_by before this ISO date/time (optional)
+    :param order_by: "created_at" or "updated_at"
+    :param newest_first: Reverse the order
+    :param limit: Page size; the result is then {"items": [...], "next_cursor": ...} (optional)
+    :param cursor: next_cursor of the previous page, with the same other arguments (optional)
+    :return: List of tickets, or a page of them when limit is given
     """
-    return ticket_manager.list_tickets(employee_id=employee_id, status=status)
+    items = ticket_manager.list_tickets(employee_id=employee_id, status=status, include_archived=include_archived,
+                                        since=since, until=until, order_by=order_by, newest_first=newest_first,
+                                        after=cursor, limit=limit)
+    return _page(ticket_manager, items, order_by, limit)
 
 
 @mcp.tool()
-def schedule_meeting(employee_id: str, meeting_datetime: datetime, topic: str) -> str:
-    """
-    Schedule a meeting for an employee.
+def schedule_meeting(
+        employee_id: str,
+        meeting_datetime: datetime,
+        topic: str,
+        recurrence: Optional[MeetingRecurrence] = None
+) -> str:
+    """
+    Schedule a meeting for an employee, once or repeating.
     :param employee_id: Employee ID
-    :param meeting_datetime: Date and time of the meeting in python datetime format
+    :param meeting_datetime: Date and time of the (first) meeting in python datetime format
     :param topic: Topic of the meeting
+    :param recurrence: Repeat rule (frequency daily/weekly/monthly, interval, weekdays 0=Monday, count or until); omit for a one-off meeting
     :return: Confirmation message
     """
     meeting_req = MeetingCreate(
         emp_id=employee_id,
         meeting_dt=meeting_datetime,
-        topic=topic
+        topic=topic,
+        recurrence=recurrence
     )
     return meeting_manager.schedule_meeting(meeting_req)
 
 
 @mcp.tool()
-def get_meetings(employee_id: str) -> str:
-    """
-    Get the list of meetings scheduled for an employee.
+def get_meetings(
+        employee_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Get the meetings scheduled for an employee in date order. Recurring meetings are listed
+    occurrence by occurrence, up to 90 days ahead unless `until` is given.
     :param employee_id: Employee ID
+    :param since: Only meetings at or after this time
+    :param until: Only meetings before this time
     :return: List of meetings
     """
-    return meeting_manager.get_meetings(employee_id)
+    return meeting_manager.get_meetings(employee_id, since, until)
+
+
+@mcp.tool()
+def move_meeting(employee_id: str, meeting_datetime: datetime, new_datetime: datetime,
+                 topic: Optional[str] = None) -> str:
+    """
+    Move a meeting, or a single occurrence of a recurring meeting, to another time.
+    :param employee_id: Employee ID
+    :param meeting_datetime: Current date and time of the meeting
+    :param new_datetime: New date and time of the meeting
+    :param topic: Topic of the meeting (optional)
+    :return: Confirmation message
+    """
+    return meeting_manager.move_meeting(employee_id, meeting_datetime, new_datetime, topic)
+
+
+@mcp.tool()
+def cancel_meeting_series(employee_id: str, series_id: str) -> str:
+    """
+    Cancel every occurrence of a recurring meeting. To cancel one occurrence, use cancel_meeting.
+    :param employee_id: Employee ID
+    :param series_id: ID of the recurring meeting, e.g. E001-S1
+    :return: Confirmation message
+    """
+    return meeting_manager.cancel_meeting_series(employee_id, series_id)
 
 
 @mcp.tool()
 def cancel_meeting(employee_id: str, meeting_datetime: datetime, topic: str) -> str:
     """
-    Cancel a scheduled meeting for an employee.
+    Cancel a scheduled meeting for an employee, or one occurrence of a recurring meeting.
     :param employee_id: Employee ID
     :param meeting_datetime: Date and time of the meeting in python datetime format
     :param topic: Topic of the meeting (optional)
@@ -155,14 +306,15 @@ def get_employee_leave_balance(emp_id: str) -> str:
     return leave_manager.get_leave_balance(emp_id)
 
 @mcp.tool()
-def apply_leave(emp_id: str, leave_dates: list) -> str:
+def apply_leave(emp_id: str, leave_dates: list, leave_type: str = "Annual") -> str:
     """
-    Apply for leave for an employee.
+    Apply for leave for an employee. Weekends and holidays are not charged.
     :param emp_id: Employee ID
     :param leave_dates: List of leave dates
+    :param leave_type: Leave type to charge (Annual, Sick, ...)
     :return: Leave application status message
     """
-    req = LeaveApplyRequest(emp_id=emp_id, leave_dates=leave_dates)
+    req = LeaveApplyRequest(emp_id=emp_id, leave_dates=leave_dates, leave_type=leave_type)
     return leave_manager.apply_leave(req)
 
 
@@ -176,6 +328,38 @@ def get_leave_history(emp_id: str) -> str:
     return leave_manager.get_leave_history(emp_id)
 
 
+@mcp.tool()
+def run_leave_accrual(as_of: date, months: int = 1) -> Dict | List[Dict]:
+    """
+    Credit monthly leave accruals to every employee according to the leave policies.
+    :param as_of: Last day of the accrual period
+    :param months: Number of months to credit
+    :return: Accrual summary
+    """
+    return leave_manager.run_accrual(as_of, employee_manager.get_hire_dates(), months)
+
+
+@mcp.tool()
+def run_leave_rollover(year: int) -> Dict | List[Dict]:
+    """
+    Run the year-end leave rollover: cap carried-over balances and grant annual entitlements.
+    :param year: Year being closed
+    :return: Rollover summary
+    """
+    return leave_manager.run_rollover(date(year, 12, 31), employee_manager.get_hire_dates())
+
+
+@mcp.tool()
+def count_business_days(start_date: date, end_date: date) -> int:
+    """
+    Count business days between two dates (inclusive), excluding weekends and company holidays.
+    :param start_date: First day
+    :param end_date: Last day
+    :return: Number of business days
+    """
+    return holiday_calendar.count_business_days(start_date, end_date)
+
+
 # Business Trip Management Tools
 @mcp.tool()
 def create_business_trip(emp_id: str, destination: str, purpose: str, start_date: date, end_date: date, estimated_cost: float, manager_id: str) -> str:
@@ -217,15 +401,28 @@ def approve_business_trip(trip_id: str, manager_id: str, approved: bool = True)
 
 
 @mcp.tool()
-def get_business_trips(employee_id: str = None, status: str = None, manager_id: str = None) -> List[Dict]:
+def get_business_trips(employee_id: str = None, status: str = None, manager_id: str = None,
+                       include_archived: bool = False, since: Optional[str] = None, until: Optional[str] = None,
+                       order_by: str = "created_at", newest_first: bool = True, limit: Optional[int] = None,
+                       cursor: Optional[str] = None) -> Union[List[Dict], Dict]:
     """
-    Get business trips with optional filters.
+    Get business trips with optional filters, newest first.
     :param employee_id: Filter by employee ID
     :param status: Filter by trip status
     :param manager_id: Filter by manager ID
-    :return: List of business trips
+    :param include_archived: Also read archived trips from disk (slower)
+    :param since: Only trips with order_by at or after this ISO date/time (optional)
+    :param until: Only trips with order_by before this ISO date/time (optional)
+    :param order_by: "created_at", "updated_at" or "start_date", e.g. start_date with since/until for the trips starting next week
+    :param newest_first: Latest first (default) or oldest first
+    :param limit: Page size; the result is then {"items": [...], "next_cursor": ...} (optional)
+    :param cursor: next_cursor of the previous page, with the same other arguments (optional)
+    :return: List of business trips, or a page of them when limit is given
     """
-    return business_trip_manager.list_trips(employee_id=employee_id, status=status, manager_id=manager_id)
+    items = business_trip_manager.list_trips(employee_id=employee_id, status=status, manager_id=manager_id,
+                                             include_archived=include_archived, since=since, until=until,
+                                             order_by=order_by, newest_first=newest_first, after=cursor, limit=limit)
+    return _page(business_trip_manager, items, order_by, limit)
 
 
 @mcp.tool()
@@ -260,13 +457,14 @@ def add_trip_expense(trip_id: str, expense_type: str, amount: float, description
 
 
 @mcp.tool()
-def get_trip_summary(trip_id: str) -> Dict:
+def get_trip_summary(trip_id: str, include_archived: bool = False) -> Dict:
     """
     Get a comprehensive summary of a business trip including expenses.
     :param trip_id: Trip ID
+    :param include_archived: Look the trip up in the archive if it is no longer active
     :return: Trip summary with expenses
     """
-    return business_trip_manager.get_trip_summary(trip_id)
+    return business_trip_manager.get_trip_summary(trip_id, include_archived)
 
 
 @mcp.tool()
@@ -280,11 +478,338 @@ def cancel_business_trip(trip_id: str, reason: str = "Cancelled by employee") ->
     return business_trip_manager.cancel_trip(trip_id, reason)
 
 
+# Batch and workflow tools
+@mcp.tool()
+def get_employees(emp_ids: List[str]) -> Dict:
+    """
+    Get details for several employees in one call.
+    :param emp_ids: List of employee IDs
+    :return: Found employees keyed by ID, plus the IDs that were not found
+    """
+    found = employee_manager.get_employees(emp_ids)
+    return {"employees": found, "not_found": [eid for eid in emp_ids if eid not in found]}
+
+
+@mcp.tool()
+def create_tickets(tickets: List[TicketCreate]) -> List[str]:
+    """
+    Create several tickets in one call.
+    :param tickets: List of tickets, each with emp_id, item and reason
+    :return: IDs of the created tickets
+    """
+    return ticket_manager.create_tickets(tickets)
+
+
+@mcp.tool()
+def schedule_meetings(meetings: List[MeetingCreate]) -> List[str]:
+    """
+    Schedule several meetings in one call. Either all are scheduled or, on any conflict, none.
+    :param meetings: List of meetings, each with emp_id, meeting_dt and topic
+    :return: Confirmation messages
+    """
+    return meeting_manager.schedule_meetings(meetings)
+
+
+@mcp.tool()
+def onboard_employee(
+    employee_name: str,
+    manager_id: Optional[str] = None,
+    email: Optional[str] = None,
+    equipment: Optional[List[str]] = None,
+    meeting_datetime: Optional[datetime] = None,
+    send_emails: bool = True,
+) -> Dict:
+    """
+    Onboard a new employee in a single call: add them to the HRMS, raise equipment tickets,
+    schedule an introductory meeting with the manager and send the welcome and manager emails.
+    The HRMS steps are committed together or rolled back together. Emails are sent only after
+    they are committed and when an SMTP account is configured; undelivered ones are listed in
+    email_errors.
+    :param employee_name: Employee name
+    :param manager_id: Manager ID (optional)
+    :param email: Employee email (defaults to first.last@atliq.com)
+    :param equipment: Items to raise tickets for (defaults to Laptop and ID Card)
+    :param meeting_datetime: Introductory meeting time (defaults to 10:00 on the next business day)
+    :param send_emails: Send the welcome and manager notification emails
+    :return: Summary of everything that was created and which emails were sent
+    """
+    email = email or f"{employee_name.strip().lower().replace(' ', '.')}@atliq.com"
+    equipment = equipment or ["Laptop", "ID Card"]
+    if meeting_datetime is None:
+        meeting_datetime = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        while meeting_datetime.weekday() >= 5:
+            meeting_datetime += timedelta(days=1)
+    manager = employee_manager.get_employee_details(manager_id) if manager_id else None
+    topic = f"Introduction: {employee_name} and {manager['name']}" if manager else f"Onboarding: {employee_name}"
+
+    with Transaction() as txn:
+        emp_id = employee_manager.add_new_employee(employee_name, manager_id, email)
+        txn.on_rollback(employee_manager.remove_employee, emp_id)
+
+        ticket_ids = ticket_manager.create_tickets(
+            [TicketCreate(emp_id=emp_id, item=item, reason="New hire setup") for item in equipment]
+        )
+        for ticket_id in ticket_ids:
+            txn.on_rollback(ticket_manager.delete_ticket, ticket_id)
+
+        attendees = [emp_id] + ([manager_id] if manager else [])
+        for eid in attendees:
+            meeting_manager.schedule_meeting(MeetingCreate(emp_id=eid, meeting_dt=meeting_datetime, topic=topic))
+            txn.on_rollback(meeting_manager.cancel_meeting,
+                            MeetingCancelRequest(emp_id=eid, meeting_dt=meeting_datetime, topic=topic))
+
+    # Emails cannot be recalled, so they are only sent once every step above is committed, and only
+    # when an SMTP account is configured. A failed email leaves the onboarding in place.
+    emails = []
+    if send_emails:
+        emails.append((email, f"Welcome to Atliq, {employee_name}!",
+                       f"Welcome aboard! Your employee ID is {emp_id} and your login is {email}.\n"
+                       f"Your introductory meeting is on {meeting_datetime.isoformat()}."))
+        if manager and manager.get("email"):
+            emails.append((manager["email"], f"New team member: {employee_name}",
+                           f"{employee_name} ({emp_id}) joins your team. "
+                           f"Equipment tickets: {', '.join(ticket_ids)}.\n"
+                           f"Introductory meeting: {meeting_datetime.isoformat()}."))
+    emails_sent, email_errors = [], {}
+    for to_email, subject, body in emails:
+        if not emailer.username:
+            email_errors[to_email] = "No SMTP account is configured (CB_EMAIL)."
+            continue
+        try:
+            emailer.send_email(subject, body, [to_email], from_email=emailer.username)
+            emails_sent.append(to_email)
+        except Exception as e:
+            email_errors[to_email] = str(e)
+
+    return {
+        "emp_id": emp_id,
+        "email": email,
+        "manager_id": manager_id,
+        "tickets": ticket_ids,
+        "meeting": {"attendees": attendees, "meeting_dt": meeting_datetime.isoformat(), "topic": topic},
+        "emails_sent": emails_sent,
+        "email_errors": email_errors,
+    }
+
+
+@mcp.tool()
+def get_server_metrics(format: str = "json", include_profile: bool = False) -> str | Dict:
+    """
+    Get per-tool call counts, latency histograms, payload sizes and error types.
+    :param format: 'json' for a summary dict or 'prometheus' for the text exposition format
+    :param include_profile: Include the sampling profiler report (json format only)
+    :return: Collected metrics
+    """
+    metrics_file = os.getenv("HR_METRICS_FILE")
+    if metrics_file:
+        metrics.write_prometheus(metrics_file)
+    if format == "prometheus":
+        return metrics.render_prometheus()
+    snapshot = metrics.snapshot()
+    if include_profile:
+        snapshot["profile"] = metrics.profile_report()
+    return snapshot
+
+
+@mcp.tool()
+def get_changes_since(seq: int = 0, limit: int = 500, shard: int = 0, epoch: Optional[str] = None) -> Dict:
+    """
+    Get the changes to employees, tickets, trips, expenses, meetings and leave made after a sequence number.
+    Start with seq=0 (or the last_seq of a full load) and pass back next_seq and epoch to continue. If
+    reset_required is true the log no longer covers seq, or was restarted, and the data must be reloaded.
+    :param seq: Last sequence number already processed
+    :param limit: Maximum number of changes to return
+    :param shard: State shard to read when running under deploy.py with several shards
+    :param epoch: Epoch returned with seq; sequence numbers of another epoch force a reset
+    :return: Changes, next_seq, last_seq, has_more, reset_required and epoch
+    """
+    if not 0 <= shard < len(change_logs):
+        raise ValueError(f"Shard {shard} does not exist; there are {len(change_logs)} shard(s).")
+    return change_logs[shard].changes_since(seq, limit, epoch)
+
+
+@mcp.tool()
+def search_records(
+        query: str,
+        kinds: Optional[List[str]] = None,
+        employee_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 10
+) -> List[Dict]:
+    """
+    Full-text search over ticket items and reasons, trip destinations and purposes, expense descriptions and
+    meeting topics, ranked by relevance.
+    :param query: Free-text query, e.g. "broken laptop screen" or "client meeting Tokyo"
+    :param kinds: Restrict to some of ticket, trip, expense, meeting
+    :param employee_id: Only records of this employee
+    :param status: Only tickets or trips in this status
+    :param limit: Maximum number of results
+    :return: Matches with kind, id, score and the record, best first
+    """
+    if kinds:
+        unknown = set(kinds) - {"ticket", "trip", "expense", "meeting"}
+        if unknown:
+            raise ValueError(f"Unknown record kinds: {', '.join(sorted(unknown))}.")
+    results = []
+    for index in search_indexes:
+        results.extend(index.search(query, kinds, employee_id, status, limit))
+    return heapq.nlargest(limit, results, key=lambda r: r["score"])
+
+
+@mcp.tool()
+def archive_records(max_age_days: int = None) -> Dict[str, List[str]]:
+    """
+    Move closed or rejected tickets, and rejected, completed or cancelled trips with their expenses, to the
+    compressed on-disk archive once they have not changed for max_age_days. Requires HR_ARCHIVE_DIR.
+    :param max_age_days: Minimum days since the last update (default HR_ARCHIVE_AFTER_DAYS, 90)
+    :return: IDs of the archived tickets and trips
+    """
+    if max_age_days is None:
+        max_age_days = int(os.getenv("HR_ARCHIVE_AFTER_DAYS", "90"))
+    older_than = datetime.utcnow() - timedelta(days=max_age_days)
+    return {
+        "tickets": ticket_manager.archive_closed(older_than),
+        "trips": business_trip_manager.archive_finished(older_than),
+    }
+
+
+def _availability(emp_id: str) -> AvailabilityIndex:
+    if len(availability_indexes) == 1:
+        return availability_indexes[0]
+    # Under deploy.py each state shard tracks the employees whose leave and meetings it owns.
+    from deploy import shard_for
+    return availability_indexes[shard_for(emp_id, len(availability_indexes))]
+
+
+@mcp.tool()
+def check_availability(emp_id: str, start_date: date, end_date: date) -> Dict:
+    """
+    Check whether an employee is free from start_date to end_date (inclusive): no trip, leave or meeting.
+    :param emp_id: Employee ID
+    :param start_date: First day
+    :param end_date: Last day
+    :return: Whether the employee is available and the conflicting bookings
+    """
+    conflicts = _availability(emp_id).conflicts(emp_id, *day_span(start_date, end_date))
+    return {"emp_id": emp_id, "available": not conflicts, "conflicts": conflicts}
+
+
+@mcp.tool()
+def find_available_employees(start_date: date, end_date: date, manager_id: Optional[str] = None,
+                             emp_ids: Optional[List[str]] = None) -> List[str]:
+    """
+    Find who is free from start_date to end_date (inclusive), among a manager's direct reports or a list of
+    employees.
+    :param start_date: First day
+    :param end_date: Last day
+    :param manager_id: Check this manager's direct reports
+    :param emp_ids: Check these employees
+    :return: IDs of the available employees
+    """
+    if emp_ids is None:
+        if manager_id is None:
+            raise ValueError("Give either manager_id or emp_ids.")
+        emp_ids = employee_manager.get_direct_reports(manager_id)
+    start, end = day_span(start_date, end_date)
+    return [emp_id for emp_id in emp_ids if _availability(emp_id).is_available(emp_id, start, end)]
+
+
+@mcp.tool()
+def get_org_chart(root_id: Optional[str] = None, format: str = "rows", max_depth: Optional[int] = None,
+                  offset: int = 0, limit: int = 200) -> Dict | str:
+    """
+    Get the reporting hierarchy under an employee, or the whole company.
+    :param root_id: Employee at the top of the subtree; omit for the whole company
+    :param format: 'rows' for a page of flat rows with depth and path, 'nested' for a nested JSON document
+    :param max_depth: Levels below the root to include (0 = only the root)
+    :param offset: First row of the page (rows format)
+    :param limit: Rows per page (rows format)
+    :return: A page of rows with total and next_offset, or the nested JSON text
+    """
+    if format == "nested":
+        return org_chart.nested(root_id, max_depth)
+    if format != "rows":
+        raise ValueError("Format must be 'rows' or 'nested'.")
+    return org_chart.page(root_id, max_depth, offset, limit)
+
+
+@mcp.tool()
+def export_org_chart(path: str, root_id: Optional[str] = None, max_depth: Optional[int] = None) -> Dict:
+    """
+    Stream the org chart to a file in the data directory: nested JSON for .json, flat rows for .jsonl or .csv.
+    :param path: File name relative to the data directory (HR_DATA_DIR)
+    :param root_id: Employee at the top of the subtree; omit for the whole company
+    :param max_depth: Levels below the root to include
+    :return: Number of employees written and the file path
+    """
+    resolved = _data_path(path)
+    os.makedirs(os.path.dirname(resolved), exist_ok=True)
+    return {"records": org_chart.export(resolved, root_id, max_depth), "path": resolved}
+
+
+@mcp.tool()
+def get_scheduled_follow_ups() -> List[Dict]:
+    """
+    Get the pending follow-up timers (trip escalations, ticket reminders and expiries, meeting reminders).
+    Requires HR_FOLLOW_UPS=1.
+    :return: Per scheduler: pending timers by kind, next due time (epoch seconds) and how many have fired
+    """
+    return [scheduler.summary() for scheduler in schedulers]
+
+
+def _data_path(path: str) -> str:
+    """
+    Resolve a file name inside HR_DATA_DIR; paths that escape the directory are rejected.
+    """
+    data_dir = os.path.realpath(os.getenv("HR_DATA_DIR", "data"))
+    resolved = os.path.realpath(os.path.join(data_dir, path))
+    if os.path.commonpath([data_dir, resolved]) != data_dir:
+        raise ValueError(f"Path '{path}' is outside the data directory.")
+    return resolved
+
+
+def _bulk_managers() -> Dict:
+    return {
+        "employee": employee_manager,
+        "ticket": ticket_manager,
+        "business_trip": business_trip_manager,
+        "meeting": meeting_manager,
+        "leave": leave_manager,
+    }
+
+
+@mcp.tool()
+def import_hr_data(kind: str, path: str, chunk_size: int = 5000, trusted: bool = False) -> Dict:
+    """
+    Load a CSV, JSONL or Parquet file from the data directory, streaming it in chunks.
+    :param kind: One of employees, tickets, trips, expenses, meetings, leave, leave_balances
+    :param path: File name relative to the data directory (HR_DATA_DIR)
+    :param chunk_size: Records validated and loaded per chunk
+    :param trusted: Skip validation for JSONL or Parquet files exported by this server
+    :return: Number of records and chunks loaded, plus manager links that could not be resolved
+    """
+    return import_file(kind, _data_path(path), _bulk_managers(), chunk_size, trusted)
+
+
+@mcp.tool()
+def export_hr_data(kind: str, path: str) -> Dict:
+    """
+    Write every record of one kind to a CSV, JSONL or Parquet file in the data directory.
+    :param kind: One of employees, tickets, trips, expenses, meetings, leave, leave_balances
+    :param path: File name relative to the data directory (HR_DATA_DIR); the extension picks the format
+    :return: Number of records written and the file path
+    """
+    resolved = _data_path(path)
+    os.makedirs(os.path.dirname(resolved), exist_ok=True)
+    return export_file(kind, resolved, _bulk_managers())
+
+
 @mcp.prompt("onboard_new_employee")
 def onboard_new_employee(employee_name: str, manager_name: str):
     return f"""Onboard a new employee with the following details:
     - Name: {employee_name}
     - Manager Name: {manager_name}
+    Use the `onboard_employee` tool to run the HRMS steps below in a single call where possible.
     Steps to follow:
     - Add the employee to the HRMS system.
     - Send a welcome email to the employee with their login credentials. (Format: employee_name@atliq.com)
@@ -299,5 +824,16 @@ def onboard_new_employee(employee_name: str, manager_name: str):
 
 
 
+def create_http_app():
+    """
+    ASGI app for the HTTP transports, used by the uvicorn workers started from deploy.py.
+    Sessions are stateless so that any worker can serve any request.
+    """
+    mcp.settings.stateless_http = True
+    if os.getenv("HR_TRANSPORT") == "sse":
+        return mcp.sse_app()
+    return mcp.streamable_http_app()
+
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    mcp.run(transport=os.getenv("HR_TRANSPORT", "stdio"))
@@ -0,0 +1,42 @@
+import os
+from datetime import datetime, timedelta
+
+from HRMS.archive import ColdStore, open_archives
+from HRMS.schemas import TicketCreate, TicketStatusUpdate
+from HRMS.ticket_manager import TicketManager
+
+
+def test_records_persist_and_are_found_by_indexed_id(tmp_path):
+    store = ColdStore(str(tmp_path), "tickets", ("ticket_id",))
+    store.append([{"ticket_id": "T0001", "emp_id": "E001"}, {"ticket_id": "T0002", "emp_id": "E002"}])
+    store.append([{"ticket_id": "T0003", "emp_id": "E001"}])
+    reopened = ColdStore(str(tmp_path), "tickets", ("ticket_id",))
+    assert len(reopened) == 3
+    assert [r["ticket_id"] for r in reopened.iter_records("E001")] == ["T0001", "T0003"]
+    assert reopened.find("ticket_id", ["T0002"]) == [{"ticket_id": "T0002", "emp_id": "E002"}]
+    assert sorted(reopened.ids("ticket_id")) == ["T0001", "T0002", "T0003"]
+
+
+def test_uncataloged_chunk_is_dropped_on_open(tmp_path):
+    store = ColdStore(str(tmp_path), "tickets")
+    store.append([{"ticket_id": "T0001", "emp_id": "E001"}])
+    size = os.path.getsize(store.data_path)
+    with open(store.data_path, "ab") as f:
+        f.write(b"half-written chunk")
+    reopened = ColdStore(str(tmp_path), "tickets")
+    assert os.path.getsize(reopened.data_path) == size
+    assert [r["ticket_id"] for r in reopened.iter_records()] == ["T0001"]
+
+
+def test_archived_tickets_stay_listable_and_keep_their_ids(tmp_path):
+    tickets = TicketManager(archive=open_archives(str(tmp_path))["tickets"])
+    for item in ("Laptop", "Monitor"):
+        tickets.create_ticket(TicketCreate(emp_id="E001", item=item, reason="Setup"))
+    tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), "T0001")
+    assert tickets.archive_closed(datetime.utcnow() + timedelta(seconds=1)) == ["T0001"]
+    assert [t["ticket_id"] for t in tickets.list_tickets()] == ["T0002"]
+    assert [t["ticket_id"] for t in tickets.list_tickets(include_archived=True)] == ["T0001", "T0002"]
+
+    restarted = TicketManager(archive=open_archives(str(tmp_path))["tickets"])
+    restarted.create_ticket(TicketCreate(emp_id="E002", item="Phone", reason="Setup"))
+    assert [t["ticket_id"] for t in restarted.list_tickets()] == ["T0002"]
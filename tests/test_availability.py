@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from HRMS.availability import AvailabilityIndex, ShardedAvailability
+from HRMS.recurrence import MeetingSeries
+
+
+def sharded():
+    indexes = [AvailabilityIndex(), AvailabilityIndex()]
+    return indexes, ShardedAvailability(indexes, lambda emp_id: 0 if emp_id == "E001" else 1)
+
+
+def test_booking_overlap_is_reported():
+    index = AvailabilityIndex()
+    index.add("E001", datetime(2027, 3, 3), datetime(2027, 3, 4), "leave", "7")
+    assert not index.is_available("E001", "2027-03-03T10:00", "2027-03-03T11:00")
+    assert index.is_available("E001", "2027-03-04T10:00", "2027-03-04T11:00")
+    with pytest.raises(ValueError, match="overlaps leave 7"):
+        index.check("E001", "2027-03-03T10:00", "2027-03-03T11:00", ["leave"], "meeting")
+
+
+def test_sharded_check_series_uses_the_employees_shard():
+    indexes, availability = sharded()
+    indexes[1].add("E002", datetime(2027, 3, 3), datetime(2027, 3, 4), "trip", "BT1")
+    weekly = MeetingSeries("S1", "E002", "2027-01-06T10:00", "1:1", "weekly")
+    with pytest.raises(ValueError, match="overlaps trip BT1"):
+        availability.check_series(weekly)
+    availability.check_series(weekly, ["leave"])
+    availability.check_series(MeetingSeries("S2", "E001", "2027-01-06T10:00", "1:1", "weekly"))
+
+
+def test_sharded_check_series_finds_clashing_series():
+    indexes, availability = sharded()
+    indexes[0].add_series(MeetingSeries("S1", "E001", "2027-01-04T10:00", "Sync", "weekly", interval=3))
+    with pytest.raises(ValueError, match="overlaps meeting S1"):
+        availability.check_series(MeetingSeries("S2", "E001", "2027-01-04T10:30", "Review", "weekly", interval=2))
+    availability.check_series(MeetingSeries("S3", "E001", "2027-01-04T11:00", "Review", "weekly"))
+
+
+def wired():
+    from HRMS import BusinessTripManager, EventBus, LeaveManager, MeetingManager
+    from HRMS.availability import AVAILABILITY_EVENTS
+
+    bus = EventBus()
+    index = AvailabilityIndex()
+    bus.subscribe(index, AVAILABILITY_EVENTS)
+    leave = LeaveManager(events=bus)
+    leave.open_accounts(["E001"])
+    leave.employee_leaves["E001"]["balances"]["Annual"] = 10
+    return leave, BusinessTripManager(events=bus, availability=index), MeetingManager(events=bus, availability=index)
+
+
+def test_trips_and_meetings_are_refused_over_other_bookings():
+    from HRMS.schemas import BusinessTripCreate, BusinessTripStatusUpdate, LeaveApplyRequest, MeetingCreate
+
+    leave, trips, meetings = wired()
+    leave.apply_leave(LeaveApplyRequest(emp_id="E001", leave_dates=["2027-03-03"]))
+    trip = dict(emp_id="E001", destination="Oslo", purpose="Visit", estimated_cost=10)
+    with pytest.raises(ValueError, match="overlaps leave"):
+        trips.create_trip(BusinessTripCreate(start_date="2027-03-02", end_date="2027-03-04", **trip))
+    trips.create_trip(BusinessTripCreate(start_date="2027-04-05", end_date="2027-04-06", **trip))
+    with pytest.raises(ValueError, match="overlaps trip"):
+        meetings.schedule_meeting(MeetingCreate(emp_id="E001", meeting_dt="2027-04-06T09:00", topic="Sync"))
+    # A cancelled trip frees the calendar again.
+    trip_id = next(trips.iter_trips())["trip_id"]
+    trips.update_trip_status(BusinessTripStatusUpdate(status="Cancelled"), trip_id)
+    meetings.schedule_meeting(MeetingCreate(emp_id="E001", meeting_dt="2027-04-06T09:00", topic="Sync"))
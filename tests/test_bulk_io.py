@@ -0,0 +1,44 @@
+import importlib.util
+
+import pytest
+
+from HRMS.bulk_io import export_file, import_file
+from HRMS.ticket_manager import TicketManager
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def tickets_with_data():
+    manager = TicketManager()
+    manager.ingest_tickets([{"emp_id": "E001", "item": "Laptop", "reason": "New hire"},
+                            {"emp_id": "E002", "item": "Monitor", "reason": "Second screen"}])
+    return manager
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"] + ([".parquet"] if HAS_PYARROW else []))
+def test_export_then_import_restores_tickets(tmp_path, suffix):
+    source = tickets_with_data()
+    path = str(tmp_path / f"tickets{suffix}")
+    assert export_file("tickets", path, {"ticket": source})["records"] == 2
+    target = TicketManager()
+    assert import_file("tickets", path, {"ticket": target}, chunk_size=1)["chunks"] == 2
+    assert list(target.iter_tickets()) == list(source.iter_tickets())
+
+
+@pytest.mark.skipif(HAS_PYARROW, reason="pyarrow is installed")
+def test_parquet_without_pyarrow_is_refused_clearly(tmp_path):
+    with pytest.raises(ValueError, match="parquet' extra"):
+        export_file("tickets", str(tmp_path / "tickets.parquet"), {"ticket": tickets_with_data()})
+    with pytest.raises(ValueError, match="parquet' extra"):
+        import_file("tickets", str(tmp_path / "tickets.parquet"), {"ticket": TicketManager()})
+
+
+def test_imported_employees_get_leave_accounts(tmp_path):
+    from HRMS.employee_manager import EmployeeManager
+    from HRMS.leave_manager import LeaveManager
+
+    path = tmp_path / "employees.jsonl"
+    path.write_text('{"emp_id": "E101", "name": "Ada", "manager_id": null, "email": "ada@example.com"}\n')
+    leave = LeaveManager()
+    import_file("employees", str(path), {"employee": EmployeeManager(), "leave": leave})
+    assert leave.employee_leaves["E101"]["balances"] == {"Annual": 0.0, "Sick": 0.0}
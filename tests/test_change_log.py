@@ -0,0 +1,45 @@
+from datetime import date
+
+from HRMS import ChangeLog, EventBus, LeaveManager, TicketManager
+from HRMS.schemas import TicketCreate
+
+
+def log_with_tickets(capacity, count):
+    bus = EventBus()
+    log = ChangeLog(capacity)
+    bus.subscribe(log)
+    tickets = TicketManager(events=bus)
+    for i in range(count):
+        tickets.create_ticket(TicketCreate(emp_id="E001", item=f"Item {i}", reason="Test"))
+    return bus, log
+
+
+def test_pages_follow_the_sequence():
+    _, log = log_with_tickets(10, 5)
+    page = log.changes_since(0, limit=3)
+    assert [c["seq"] for c in page["changes"]] == [1, 2, 3] and page["has_more"]
+    page = log.changes_since(page["next_seq"], limit=3, epoch=page["epoch"])
+    assert [c["entity_id"] for c in page["changes"]] == ["T0004", "T0005"]
+    assert not page["has_more"] and not page["reset_required"]
+    assert log.changes_since(page["next_seq"], epoch=page["epoch"])["changes"] == []
+
+
+def test_readers_behind_the_ring_or_from_another_epoch_must_reset():
+    _, log = log_with_tickets(3, 5)
+    assert log.first_seq == 3
+    behind = log.changes_since(1)
+    assert behind["reset_required"] and [c["seq"] for c in behind["changes"]] == [3, 4, 5]
+    restarted = log.changes_since(2, epoch="an older epoch")
+    assert restarted["reset_required"] and restarted["changes"] == [] and restarted["next_seq"] == 5
+
+
+def test_accrual_is_one_change_with_the_new_balances():
+    bus = EventBus()
+    log = ChangeLog()
+    bus.subscribe(log)
+    leave = LeaveManager(events=bus)
+    leave.open_accounts(["E001"])
+    leave.run_accrual(date(2027, 1, 31), {"E001": "2020-01-01"})
+    [change] = log.changes_since(0)["changes"]
+    assert change["type"] == "leave.accrued"
+    assert change["data"]["balances"]["E001"]["Annual"] == round(20 / 12, 2)
@@ -0,0 +1,43 @@
+import deploy
+
+ADDRESSES = [("127.0.0.1", 1), ("127.0.0.1", 2)]
+
+
+def test_only_shard_zero_indexes_tickets_and_trips(monkeypatch):
+    monkeypatch.setenv("HR_NOTIFICATIONS", "0")
+    monkeypatch.setenv("HR_FOLLOW_UPS", "0")
+    managers, services = deploy._build_state(1, ADDRESSES, b"key")
+    seeded_tickets = list(managers["ticket_manager"].iter_tickets())
+    seeded_trips = list(managers["business_trip_manager"].iter_trips())
+    assert seeded_tickets and seeded_trips
+    index = services["search_index"]
+    for ticket in seeded_tickets:
+        assert not index.search(ticket["item"], kinds=["ticket"])
+    for trip in seeded_trips:
+        assert not index.search(trip["destination"], kinds=["trip", "expense"])
+
+
+class Shard:
+    def __init__(self, number):
+        self.number = number
+
+    def owner(self, key=None, *rest):
+        return [self.number]
+
+    def total(self):
+        return self.number
+
+
+def test_sharded_manager_routes_by_employee():
+    manager = deploy.ShardedManager([Shard(0), Shard(1)])
+    for emp_id in ("E001", "E002", "E003"):
+        assert manager.owner(emp_id) == [deploy.shard_for(emp_id, 2)]
+        assert manager.owner({"emp_id": emp_id}) == [deploy.shard_for(emp_id, 2)]
+        assert manager.owner(key=emp_id) == [deploy.shard_for(emp_id, 2)]
+    assert sorted(manager.owner(["E001", "E002", "E003"])) == sorted({deploy.shard_for(e, 2) for e in ("E001", "E002", "E003")})
+
+
+def test_sharded_manager_sends_keyless_calls_to_every_shard():
+    manager = deploy.ShardedManager([Shard(0), Shard(1)])
+    assert manager.total() == [0, 1]
+    assert manager.owner() == [[0], [1]]
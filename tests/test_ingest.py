@@ -0,0 +1,39 @@
+import pytest
+
+from HRMS import EmployeeManager, LeaveManager, TicketManager
+
+
+def test_invalid_record_rejects_the_whole_batch():
+    tickets = TicketManager()
+    with pytest.raises(ValueError):
+        tickets.ingest_tickets([{"emp_id": "E001", "item": "Laptop", "reason": "New hire"},
+                                {"emp_id": "E002", "item": "Monitor"}])
+    assert list(tickets.iter_tickets()) == []
+
+
+def test_trusted_batches_skip_validation():
+    employees = EmployeeManager()
+    records = [{"emp_id": "E002", "name": "Report", "manager_id": "E001", "email": None, "hired_date": "2024-01-02"},
+               {"emp_id": "E001", "name": "Lead", "manager_id": None, "email": None, "hired_date": "2020-05-06"}]
+    assert employees.ingest_employees(records, trusted=True) == 2
+    assert employees.get_manager_id("E002") == "E001"
+    assert employees.get_hire_dates() == {"E002": "2024-01-02", "E001": "2020-05-06"}
+
+
+def test_validated_batches_are_stored_in_iso_form():
+    employees = EmployeeManager()
+    employees.ingest_employees([{"emp_id": "E001", "name": "Lead", "hired_date": "2020-05-06"}])
+    assert employees.get_employee_details("E001")["hired_date"] == "2020-05-06"
+
+
+def test_leave_batch_is_refused_if_any_balance_would_go_negative():
+    leave = LeaveManager()
+    leave.open_accounts(["E001", "E002"])
+    leave.ingest_leave_balances([{"emp_id": "E001", "balance": 3}, {"emp_id": "E002", "balance": 1}])
+    batch = [{"emp_id": "E001", "leave_dates": ["2027-03-01", "2027-03-02"]},
+             {"emp_id": "E002", "leave_dates": ["2027-03-01", "2027-03-02"]}]
+    with pytest.raises(ValueError):
+        leave.ingest_leave_requests(batch)
+    assert leave.employee_leaves["E001"]["balances"]["Annual"] == 3
+    assert leave.ingest_leave_requests(batch[:1]) == 1
+    assert leave.employee_leaves["E001"]["balances"]["Annual"] == 1
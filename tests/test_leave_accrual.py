@@ -0,0 +1,62 @@
+from datetime import date
+
+from HRMS.leave_manager import LeaveManager
+from HRMS.schemas import LeavePolicy
+
+
+def balances(manager, emp_id):
+    return manager.employee_leaves[emp_id]["balances"]
+
+
+def test_new_accounts_start_monthly_leave_at_zero():
+    manager = LeaveManager(policies=[LeavePolicy(leave_type="Annual", annual_entitlement=24),
+                                     LeavePolicy(leave_type="Bereavement", annual_entitlement=5, accrual="annual")])
+    assert manager.open_accounts(["E001"]) == 1
+    assert balances(manager, "E001") == {"Annual": 0.0, "Bereavement": 5}
+
+
+def test_first_year_credit_is_the_annual_entitlement():
+    manager = LeaveManager(policies=[LeavePolicy(leave_type="Annual", annual_entitlement=24, carry_over_cap=30)])
+    manager.open_accounts(["E001", "E002"])
+    hire_dates = {"E001": "2026-01-10", "E002": "2026-07-01"}
+    for month in range(1, 13):
+        manager.run_accrual(date(2026, month, 28), hire_dates)
+    assert balances(manager, "E001")["Annual"] == 24
+    assert balances(manager, "E002")["Annual"] == 12
+
+
+def test_accruing_a_period_twice_credits_it_once():
+    manager = LeaveManager(policies=[LeavePolicy(leave_type="Annual", annual_entitlement=24)])
+    manager.open_accounts(["E001"])
+    hire_dates = {"E001": "2020-01-01"}
+    assert manager.run_accrual(date(2026, 3, 31), hire_dates, months=3)["credited"] == {"Annual": 6}
+    assert manager.run_accrual(date(2026, 3, 31), hire_dates)["credited"] == {"Annual": 0}
+    # Only April is new in a run covering February to April.
+    assert manager.run_accrual(date(2026, 4, 30), hire_dates, months=3)["credited"] == {"Annual": 2}
+    assert balances(manager, "E001")["Annual"] == 8
+
+
+def test_rollover_caps_carry_over_and_grants_annual_leave():
+    manager = LeaveManager(policies=[LeavePolicy(leave_type="Annual", annual_entitlement=24, carry_over_cap=5),
+                                     LeavePolicy(leave_type="Bereavement", annual_entitlement=5, accrual="annual",
+                                                 carry_over_cap=0)])
+    manager.open_accounts(["E001"])
+    balances(manager, "E001")["Annual"] = 9
+    summary = manager.run_rollover(date(2026, 12, 31), {"E001": "2020-01-01"})
+    assert balances(manager, "E001") == {"Annual": 5, "Bereavement": 5}
+    assert summary["forfeited"] == {"Annual": 4, "Bereavement": 5}
+
+
+def test_leave_is_charged_for_business_days_only():
+    from HRMS.leave_accrual import HolidayCalendar
+    from HRMS.schemas import LeaveApplyRequest
+
+    calendar = HolidayCalendar.from_string("2027-03-03")
+    assert calendar.count_business_days(date(2027, 3, 1), date(2027, 3, 7)) == 4
+    manager = LeaveManager(calendar=calendar)
+    manager.open_accounts(["E001"])
+    balances(manager, "E001")["Annual"] = 5
+    message = manager.apply_leave(LeaveApplyRequest(emp_id="E001", leave_dates=["2027-03-02", "2027-03-03",
+                                                                                 "2027-03-06"]))
+    assert "2 weekend/holiday day(s) were not charged" in message
+    assert balances(manager, "E001")["Annual"] == 4
@@ -0,0 +1,42 @@
+import pytest
+
+import server
+from benchmarks.load_replay import WORKLOAD_MIXES, LoadReport, load_trace, percentile, synthesize
+from metrics import MetricsRegistry
+
+
+def test_recorded_trace_replays_with_relative_offsets(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    registry = MetricsRegistry()
+    registry.start_trace(path)
+    lookup = registry.instrument(lambda emp_id: emp_id, name="get_employee_details")
+    lookup(emp_id="E001")
+    lookup(emp_id="E002")
+    registry._trace.close()
+    calls = load_trace(path)
+    assert [(tool, args) for _, tool, args in calls] == [("get_employee_details", {"emp_id": "E001"}),
+                                                         ("get_employee_details", {"emp_id": "E002"})]
+    assert calls[0][0] == 0 and calls[1][0] >= 0
+
+
+def test_synthetic_mixes_are_reproducible_and_use_server_tools():
+    for mix in WORKLOAD_MIXES:
+        calls = synthesize(mix, 200, seed=7)
+        assert calls == synthesize(mix, 200, seed=7)
+        assert all(callable(getattr(server, tool)) for _, tool, _ in calls)
+    with pytest.raises(ValueError, match="Unknown workload mix"):
+        synthesize("nope", 1)
+
+
+def test_report_percentiles_and_error_rates():
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4 and percentile([], 50) == 0
+    report = LoadReport()
+    for latency in (0.001, 0.002, 0.003, 0.004):
+        report.observe("list_tickets", latency, None)
+    report.observe("list_tickets", 0.010, "ValueError")
+    report.started, report.finished = 0.0, 1.0
+    summary = report.summary()
+    assert summary["throughput_per_s"] == 5
+    tool = summary["tools"]["list_tickets"]
+    assert tool["error_rate"] == 0.2 and tool["p50_ms"] == 3 and tool["max_ms"] == 10
+    assert tool["error_types"] == {"ValueError": 1}
@@ -0,0 +1,38 @@
+import pytest
+
+from HRMS import EventBus, MeetingManager
+from HRMS.availability import AVAILABILITY_EVENTS, AvailabilityIndex
+from HRMS.schemas import MeetingCreate
+
+
+def manager():
+    bus = EventBus()
+    index = AvailabilityIndex(meeting_minutes=60)
+    bus.subscribe(index, AVAILABILITY_EVENTS)
+    return MeetingManager(events=bus, availability=index)
+
+
+def test_batch_is_all_or_nothing():
+    meetings = manager()
+    with pytest.raises(ValueError, match="Conflict"):
+        meetings.schedule_meetings([
+            MeetingCreate(emp_id="E001", meeting_dt="2027-02-01T10:00", topic="Kickoff"),
+            MeetingCreate(emp_id="E002", meeting_dt="2027-02-01T10:00", topic="Kickoff"),
+            MeetingCreate(emp_id="E001", meeting_dt="2027-02-01T10:30", topic="Overlaps the kickoff"),
+        ])
+    assert list(meetings.iter_meetings()) == []
+    assert len(meetings.schedule_meetings([
+        MeetingCreate(emp_id="E001", meeting_dt="2027-02-01T10:00", topic="Kickoff"),
+        MeetingCreate(emp_id="E001", meeting_dt="2027-02-01T11:00", topic="Follow-up"),
+    ])) == 2
+
+
+def test_batch_recurring_meetings_are_checked_against_each_other():
+    meetings = manager()
+    with pytest.raises(ValueError, match="Conflict"):
+        meetings.schedule_meetings([
+            MeetingCreate(emp_id="E001", meeting_dt="2027-02-01T10:00", topic="Weekly",
+                          recurrence={"frequency": "weekly"}),
+            MeetingCreate(emp_id="E001", meeting_dt="2031-06-02T10:00", topic="One-off"),
+        ])
+    assert list(meetings.iter_meetings()) == []
@@ -0,0 +1,78 @@
+import threading
+
+from metrics import MetricsRegistry
+
+
+def test_profile_sampling_is_exact_across_threads():
+    registry = MetricsRegistry(profile_sample_rate=0.01)
+    sampled = []
+
+    def worker():
+        sampled.append(sum(registry._should_profile() for _ in range(10000)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(sampled) == 800
+
+
+def test_calls_and_errors_are_counted():
+    registry = MetricsRegistry()
+
+    def divide(a, b):
+        return a / b
+
+    divide = registry.instrument(divide)
+    divide(4, 2)
+    try:
+        divide(1, 0)
+    except ZeroDivisionError:
+        pass
+    stats = registry.snapshot()["calls"]["tool:divide"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == {"ZeroDivisionError": 1}
+
+
+class Manager:
+    def __init__(self):
+        self.property_reads = 0
+
+    @property
+    def expensive(self):
+        self.property_reads += 1
+        return [1, 2, 3]
+
+    def lookup(self, key):
+        return {"key": key}
+
+    @staticmethod
+    def helper():
+        return "ok"
+
+
+def test_instrument_object_wraps_methods_without_reading_properties():
+    registry = MetricsRegistry()
+    manager = registry.instrument_object(Manager())
+    assert manager.property_reads == 0
+    manager.lookup("E001")
+    assert manager.helper() == "ok"
+    assert manager.expensive == [1, 2, 3]
+    calls = registry.snapshot()["calls"]
+    assert set(calls) == {"manager:Manager.lookup", "manager:Manager.helper"}
+
+
+def test_payload_sizes_are_measured_on_sampled_calls_only(monkeypatch):
+    import metrics
+
+    measured = []
+    size = metrics._payload_size
+    monkeypatch.setattr(metrics, "_payload_size", lambda value: measured.append(value) or size(value))
+    registry = MetricsRegistry(payload_sample_rate=0.25)
+    echo = registry.instrument(lambda text: text, name="echo")
+    for _ in range(8):
+        echo("abcd")
+    stats = registry.snapshot()["calls"]["tool:echo"]
+    assert len(measured) == 4
+    assert stats["request_bytes"] == stats["response_bytes"] == 8 * 4
@@ -0,0 +1,51 @@
+from HRMS import BusinessTripManager, EmployeeManager, EventBus, TicketManager
+from HRMS.schemas import BusinessTripCreate, BusinessTripStatusUpdate, TicketCreate
+from notifications import NOTIFY_EVENTS, EmailNotifier
+
+
+class FakeEmailer:
+    username = "hr@atliq.com"
+
+    def __init__(self):
+        self.sent = []
+
+    def send_email(self, subject, body, to_emails, from_email=None):
+        self.sent.append((to_emails, subject, body))
+
+
+def setup(max_batch=50):
+    bus = EventBus()
+    employees = EmployeeManager()
+    boss = employees.add_new_employee("Boss", email="boss@atliq.com")
+    emp = employees.add_new_employee("Worker", boss, "worker@atliq.com")
+    emailer = FakeEmailer()
+    notifier = EmailNotifier(emailer, employees, flush_interval=3600, max_batch=max_batch)
+    bus.subscribe(notifier, NOTIFY_EVENTS)
+    return bus, emp, emailer, notifier
+
+
+def test_events_are_coalesced_into_one_digest_per_recipient():
+    bus, emp, emailer, notifier = setup()
+    trips = BusinessTripManager(events=bus)
+    trips.create_trip(BusinessTripCreate(emp_id=emp, destination="Pune", purpose="Audit",
+                                         start_date="2027-02-01", end_date="2027-02-03", estimated_cost=100))
+    trip_id = next(trips.iter_trips())["trip_id"]
+    TicketManager(events=bus).create_ticket(TicketCreate(emp_id=emp, item="Laptop", reason="New hire"))
+    trips.update_trip_status(BusinessTripStatusUpdate(status="Pending"), trip_id)
+    assert emailer.sent == []
+    notifier.close()
+    assert len(emailer.sent) == 1
+    to_emails, subject, body = emailer.sent[0]
+    assert to_emails == ["boss@atliq.com"] and subject == "HR updates: 2 item(s)"
+    assert f"Trip {trip_id}" in body and "Laptop" in body
+
+
+def test_decisions_go_to_the_traveller_and_full_batches_flush_at_once():
+    bus, emp, emailer, notifier = setup(max_batch=1)
+    trips = BusinessTripManager(events=bus)
+    trips.create_trip(BusinessTripCreate(emp_id=emp, destination="Pune", purpose="Audit",
+                                         start_date="2027-02-01", end_date="2027-02-03", estimated_cost=100))
+    trip_id = next(trips.iter_trips())["trip_id"]
+    trips.update_trip_status(BusinessTripStatusUpdate(status="Approved"), trip_id)
+    assert [to for to, _, _ in emailer.sent] == [["boss@atliq.com"], ["worker@atliq.com"]]
+    notifier.close()
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+import server
+
+MEETING = datetime(2031, 3, 4, 15, 0)
+
+
+class FakeEmailer:
+    def __init__(self, username="hr@atliq.com", fail_for=()):
+        self.username = username
+        self.fail_for = set(fail_for)
+        self.sent = []
+
+    def send_email(self, subject, body, to_emails, from_email=None):
+        if set(to_emails) & self.fail_for:
+            raise OSError("SMTP unavailable")
+        self.sent.extend(to_emails)
+
+
+def manager_with_email():
+    return next(e for e in server.employee_manager.employees.values() if e.get("email"))
+
+
+def test_emails_are_skipped_without_an_smtp_account(monkeypatch):
+    emailer = FakeEmailer(username="")
+    monkeypatch.setattr(server, "emailer", emailer)
+    result = server.onboard_employee("Ada Lovelace", meeting_datetime=MEETING)
+    assert result["emp_id"] in server.employee_manager.employees
+    assert result["emails_sent"] == [] and emailer.sent == []
+    assert list(result["email_errors"]) == ["ada.lovelace@atliq.com"]
+
+
+def test_failed_email_keeps_the_onboarding(monkeypatch):
+    manager = manager_with_email()
+    emailer = FakeEmailer(fail_for=[manager["email"]])
+    monkeypatch.setattr(server, "emailer", emailer)
+    result = server.onboard_employee("Grace Hopper", manager["emp_id"], meeting_datetime=MEETING.replace(hour=16))
+    assert result["emp_id"] in server.employee_manager.employees
+    assert result["emails_sent"] == ["grace.hopper@atliq.com"]
+    assert list(result["email_errors"]) == [manager["email"]]
+
+
+def test_no_email_is_sent_when_a_step_fails(monkeypatch):
+    emailer = FakeEmailer()
+    monkeypatch.setattr(server, "emailer", emailer)
+    manager = manager_with_email()
+    slot = MEETING.replace(hour=17)
+    server.meeting_manager.schedule_meeting(server.MeetingCreate(emp_id=manager["emp_id"], meeting_dt=slot,
+                                                                 topic="Busy"))
+    before = dict(server.employee_manager.employees)
+    with pytest.raises(ValueError, match="Conflict"):
+        server.onboard_employee("Alan Turing", manager["emp_id"], meeting_datetime=slot)
+    assert server.employee_manager.employees == before
+    assert emailer.sent == []
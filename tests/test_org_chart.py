@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from HRMS import EmployeeManager
+from HRMS.org_chart import OrgChart
+
+
+def company():
+    employees = EmployeeManager()
+    ceo = employees.add_new_employee("Ceo")
+    cto = employees.add_new_employee("Cto", ceo)
+    employees.add_new_employee("Dev", cto)
+    employees.add_new_employee("Cfo", ceo)
+    return employees
+
+
+def test_rows_are_depth_first_with_paths():
+    rows = list(OrgChart(company()).iter_rows())
+    assert [(r["name"], r["depth"], r["path"]) for r in rows] == [
+        ("Ceo", 0, "E001"), ("Cto", 1, "E001/E002"), ("Dev", 2, "E001/E002/E003"), ("Cfo", 1, "E001/E004")]
+    assert [r["name"] for r in OrgChart(company()).iter_rows("E002", max_depth=0)] == ["Cto"]
+
+
+def test_nested_json_matches_the_tree(tmp_path):
+    chart = OrgChart(company())
+    expected = [{"emp_id": "E001", "name": "Ceo", "reports": [
+        {"emp_id": "E002", "name": "Cto", "reports": [{"emp_id": "E003", "name": "Dev"}]},
+        {"emp_id": "E004", "name": "Cfo"}]}]
+    assert json.loads(chart.nested()) == expected
+    path = tmp_path / "org.json"
+    assert chart.export(str(path)) == 4
+    assert json.loads(path.read_text()) == expected
+
+
+def test_cached_pages_follow_hierarchy_changes():
+    employees = company()
+    chart = OrgChart(employees, max_nested_nodes=3)
+    first = chart.page(limit=3)
+    assert first["total"] == 4 and first["next_offset"] == 3
+    employees.set_manager("E004", "E002")
+    assert [r["path"] for r in chart.page(offset=3)["rows"]] == ["E001/E002/E004"]
+    with pytest.raises(ValueError, match="more than 3"):
+        chart.nested()
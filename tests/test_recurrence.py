@@ -0,0 +1,83 @@
+import bisect
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from HRMS.recurrence import MeetingSeries, first_clash, series_clash
+
+
+def test_occurrences_follow_the_rule_and_exceptions():
+    weekly = MeetingSeries("S1", "E001", "2027-01-04T10:00", "Sync", "weekly", weekdays=[0, 3], count=5)
+    weekly.skip(datetime(2027, 1, 7, 10))
+    weekly.move(datetime(2027, 1, 11, 10), datetime(2027, 1, 12, 15))
+    assert [dt.isoformat() for dt in weekly.occurrences()] == [
+        "2027-01-04T10:00:00", "2027-01-12T15:00:00", "2027-01-14T10:00:00", "2027-01-18T10:00:00"]
+    assert weekly.original_of(datetime(2027, 1, 12, 15)) == datetime(2027, 1, 11, 10)
+    assert not weekly.occurs_at(datetime(2027, 1, 7, 10))
+
+
+def test_monthly_series_skip_months_without_the_day():
+    monthly = MeetingSeries("S1", "E001", "2027-01-31T09:00", "Review", "monthly", until="2027-08-01")
+    assert [dt.month for dt in monthly.occurrences()] == [1, 3, 5, 7]
+
+
+def test_far_ahead_reads_do_not_walk_the_series():
+    daily = MeetingSeries("S1", "E001", "2027-01-01T09:00", "Standup", "daily")
+    since = datetime(9000, 6, 1)
+    assert next(daily.occurrences(since)) == datetime(9000, 6, 1, 9)
+    assert MeetingSeries.from_record(daily.to_record()).to_record() == daily.to_record()
+
+
+def test_invalid_rules_are_refused():
+    with pytest.raises(ValueError):
+        MeetingSeries("S1", "E001", "2027-01-04T10:00", "Sync", "yearly")
+    with pytest.raises(ValueError):
+        MeetingSeries("S1", "E001", "2027-01-04T10:00", "Sync", "weekly", weekdays=[2])
+
+
+def test_clashes_are_found_however_far_ahead():
+    every_3_weeks = MeetingSeries("A", "E001", "2027-01-04T10:00", "Sync", "weekly", interval=3)
+    every_5_weeks = MeetingSeries("B", "E001", "2027-01-11T10:00", "Review", "weekly", interval=5)
+    assert series_clash(every_3_weeks, every_5_weeks) == datetime(2027, 2, 15, 10)
+    every_5_weeks.skip(datetime(2027, 2, 15, 10))
+    assert series_clash(every_3_weeks, every_5_weeks) == datetime(2027, 2, 15, 10) + timedelta(weeks=15)
+    weekly = MeetingSeries("W", "E001", "2027-01-04T10:00", "Sync", "weekly")
+    assert first_clash(weekly, {datetime(2090, 1, 2, 10)}, []) == datetime(2090, 1, 2, 10)
+    assert series_clash(weekly, MeetingSeries("D", "E001", "2027-01-04T11:00", "Standup", "daily"),
+                        timedelta(hours=1)) is None
+
+
+def random_series(rng, name):
+    start = datetime(2027, 1, 1, rng.choice([9, 10]), rng.choice([0, 30])) + timedelta(days=rng.randint(0, 400))
+    frequency = rng.choice(["daily", "weekly", "monthly"])
+    weekdays = None
+    if frequency == "weekly" and rng.random() < 0.5:
+        weekdays = sorted({start.weekday(), *rng.sample(range(7), 2)})
+    series = MeetingSeries(name, "E001", start, "t", frequency, rng.choice([1, 2, 3, 7]), weekdays,
+                           rng.choice([None, rng.randint(1, 40)]))
+    upcoming = list(series.occurrences(until=start + timedelta(days=400)))
+    for original in rng.sample(upcoming, min(2, len(upcoming))):
+        if rng.random() < 0.5:
+            series.skip(original)
+        else:
+            series.move(original, original + timedelta(hours=1))
+    return series
+
+
+def test_series_clash_agrees_with_expanding_both_series():
+    rng = random.Random(3)
+    horizon = datetime(2060, 1, 1)
+    for _ in range(150):
+        a, b = random_series(rng, "A"), random_series(rng, "B")
+        length = rng.choice([timedelta(0), timedelta(hours=1)])
+        theirs = list(b.occurrences(until=horizon))
+        expected = None
+        for x in a.occurrences(until=horizon):
+            near = theirs[bisect.bisect_left(theirs, x - timedelta(days=1)):
+                          bisect.bisect_left(theirs, x + timedelta(days=1))]
+            if any(y == x or abs(y - x) < length for y in near):
+                expected = x
+                break
+        found = series_clash(a, b, length)
+        assert found == expected or (expected is None and found >= horizon)
@@ -0,0 +1,43 @@
+from HRMS.scheduler import Scheduler
+
+
+def test_timers_fire_in_due_order_and_can_be_replaced_or_cancelled():
+    scheduler = Scheduler(clock=lambda: 0)
+    fired = []
+    scheduler.register("remind", lambda key, payload: fired.append((key, payload)))
+    scheduler.schedule("a", "remind", 30, {"n": 1})
+    scheduler.schedule("b", "remind", 10)
+    scheduler.schedule("c", "remind", 20)
+    scheduler.schedule("a", "remind", 5, {"n": 2})
+    assert scheduler.cancel("c") and not scheduler.cancel("c")
+    assert scheduler.next_due() == 5
+    assert scheduler.run_due(now=15) == 2
+    assert fired == [("a", {"n": 2}), ("b", {})]
+    assert scheduler.run_due(now=100) == 0 and len(scheduler) == 0
+
+
+def test_handlers_may_schedule_follow_ups():
+    scheduler = Scheduler(clock=lambda: 0)
+    scheduler.register("escalate", lambda key, payload: scheduler.schedule(key + "+1", "expire", 50))
+    scheduler.register("expire", lambda key, payload: None)
+    scheduler.schedule("TR001", "escalate", 10)
+    scheduler.run_due(now=10)
+    assert scheduler.pending() == [{"key": "TR001+1", "kind": "expire", "due": 50, "payload": {}}]
+
+
+def test_journal_restores_live_timers_after_a_restart(tmp_path):
+    journal = str(tmp_path / "timers.jsonl")
+    scheduler = Scheduler(journal, clock=lambda: 0)
+    scheduler.schedule("a", "remind", 10, {"trip_id": "TR001"})
+    scheduler.schedule("b", "remind", 20)
+    scheduler.schedule("c", "remind", 30)
+    scheduler.cancel("b")
+    scheduler.register("remind", lambda key, payload: None)
+    scheduler.run_due(now=10)
+    scheduler.close()
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"op": "sched')  # torn write from a crash
+
+    restarted = Scheduler(journal, clock=lambda: 0)
+    assert restarted.pending() == [{"key": "c", "kind": "remind", "due": 30, "payload": {}}]
+    restarted.close()
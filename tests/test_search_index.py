@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from HRMS.archive import open_archives
+from HRMS.business_trip_manager import BusinessTripManager
+from HRMS.events import EventBus
+from HRMS.schemas import (BusinessTripCreate, BusinessTripExpense, BusinessTripStatusUpdate, TicketCreate,
+                          TicketStatusUpdate)
+from HRMS.search_index import SEARCH_EVENTS, SearchIndex, tokenize
+from HRMS.ticket_manager import TicketManager
+
+
+def indexed(tmp_path):
+    bus = EventBus()
+    archives = open_archives(str(tmp_path))
+    tickets = TicketManager(events=bus, archive=archives["tickets"])
+    trips = BusinessTripManager(events=bus, trip_archive=archives["trips"], expense_archive=archives["expenses"])
+    index = SearchIndex()
+    bus.subscribe(index, SEARCH_EVENTS)
+    return tickets, trips, index
+
+
+def test_tokenize_drops_stop_words_and_plurals():
+    assert tokenize("The screens for a Laptop") == ["screen", "laptop"]
+
+
+def test_ranks_rarer_terms_higher(tmp_path):
+    tickets, trips, index = indexed(tmp_path)
+    tickets.create_ticket(TicketCreate(emp_id="E001", item="Laptop", reason="Broken screen"))
+    tickets.create_ticket(TicketCreate(emp_id="E002", item="Laptop", reason="Upgrade"))
+    tickets.create_ticket(TicketCreate(emp_id="E003", item="Monitor", reason="Upgrade"))
+    results = index.search("laptop screen")
+    assert [r["id"] for r in results] == ["T0001", "T0002"]
+    assert [r["id"] for r in index.search("upgrade", emp_id="E003")] == ["T0003"]
+
+
+def test_archived_records_leave_the_index(tmp_path):
+    tickets, trips, index = indexed(tmp_path)
+    tickets.create_ticket(TicketCreate(emp_id="E001", item="Headset", reason="Calls"))
+    ticket_id = "T0001"
+    tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), ticket_id)
+    trips.create_trip(BusinessTripCreate(emp_id="E001", destination="Lisbon", purpose="Summit",
+                                         start_date="2027-05-03", end_date="2027-05-05", estimated_cost=900))
+    trip_id = next(trips.iter_trips())["trip_id"]
+    trips.add_expense(BusinessTripExpense(trip_id=trip_id, expense_type="Taxi", amount=30, description="Airport",
+                                          expense_date="2027-05-03"))
+    trips.update_trip_status(BusinessTripStatusUpdate(status="Cancelled"), trip_id)
+    assert index.search("headset") and index.search("lisbon") and index.search("airport")
+
+    later = datetime.utcnow() + timedelta(seconds=1)
+    assert tickets.archive_closed(later) == [ticket_id]
+    assert trips.archive_finished(later) == [trip_id]
+    assert not index.search("headset")
+    assert not index.search("lisbon")
+    assert not index.search("airport")
+    assert len(index) == 0
+
+
+def test_priority_change_updates_the_indexed_record(tmp_path):
+    tickets, trips, index = indexed(tmp_path)
+    tickets.create_ticket(TicketCreate(emp_id="E001", item="Laptop", reason="Broken screen"))
+    tickets.set_ticket_priority("T0001", "Urgent")
+    assert index.search("laptop")[0]["record"]["priority"] == "Urgent"
@@ -0,0 +1,40 @@
+import pickle
+
+from HRMS.schemas import TicketCreate, TicketStatusUpdate
+from HRMS.ticket_manager import TicketManager
+
+
+def two_tickets():
+    tickets = TicketManager()
+    for item in ("Laptop", "Monitor"):
+        tickets.create_ticket(TicketCreate(emp_id="E001", item=item, reason="Setup"))
+    return tickets
+
+
+def test_snapshot_is_unaffected_by_later_writes():
+    tickets = two_tickets()
+    with tickets.snapshot() as snap:
+        tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), "T0001")
+        tickets.create_ticket(TicketCreate(emp_id="E002", item="Phone", reason="Setup"))
+        tickets.delete_ticket("T0002")
+        assert [(t["ticket_id"], t["status"]) for t in snap.tickets.values()] == [("T0001", "Open"),
+                                                                                ("T0002", "Open")]
+    assert [(t["ticket_id"], t["status"]) for t in tickets.iter_tickets()] == [("T0001", "Closed"),
+                                                                             ("T0003", "Open")]
+
+
+def test_writes_go_in_place_once_snapshots_are_released():
+    tickets = two_tickets()
+    record = tickets.tickets["T0001"]
+    for _ in tickets.iter_tickets():
+        pass
+    tickets.update_ticket_status(TicketStatusUpdate(status="In Progress"), "T0001")
+    assert tickets.tickets["T0001"] is record and record["status"] == "In Progress"
+
+
+def test_snapshots_pickle_as_detached_copies():
+    tickets = two_tickets()
+    copy = pickle.loads(pickle.dumps(tickets.snapshot()))
+    tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), "T0001")
+    assert copy.tickets["T0001"]["status"] == "Open"
+    assert [t["item"] for t in pickle.loads(pickle.dumps(tickets.iter_tickets()))] == ["Laptop", "Monitor"]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from HRMS.schemas import TicketCreate, TicketStatusUpdate
+from HRMS.ticket_manager import TicketManager
+from HRMS.ticket_triage import SlaPolicy
+
+
+def triaged():
+    tickets = TicketManager(sla=SlaPolicy.from_string("Badge=1, Laptop=24", 72))
+    for emp_id, item, priority in (("E001", "Monitor", "Normal"), ("E002", "Laptop", "Urgent"),
+                                   ("E001", "Badge", "Low"), ("E003", "Laptop", "Urgent")):
+        tickets.create_ticket(TicketCreate(emp_id=emp_id, item=item, reason="Setup", priority=priority))
+    return tickets
+
+
+def ids(tickets):
+    return [t["ticket_id"] for t in tickets]
+
+
+def test_orders_by_priority_age_and_sla():
+    tickets = triaged()
+    assert ids(tickets.top_tickets("priority")) == ["T0002", "T0004", "T0001", "T0003"]
+    assert ids(tickets.top_tickets("age", limit=2)) == ["T0001", "T0002"]
+    assert ids(tickets.top_tickets("sla")) == ["T0003", "T0002", "T0004", "T0001"]
+    assert ids(tickets.top_tickets("priority", employee_id="E001")) == ["T0001", "T0003"]
+    assert ids(tickets.top_tickets("priority", item="laptop")) == ["T0002", "T0004"]
+
+
+def test_queue_follows_priority_and_status_changes():
+    tickets = triaged()
+    tickets.set_ticket_priority("T0003", "Urgent")
+    tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), "T0002")
+    assert ids(tickets.top_tickets("priority")) == ["T0003", "T0004", "T0001"]
+    with pytest.raises(ValueError):
+        tickets.set_ticket_priority("T0001", "Whenever")
+
+
+def test_sla_breaches_are_the_overdue_active_tickets():
+    tickets = triaged()
+    now = datetime.utcnow()
+    assert tickets.sla_breaches(now) == []
+    assert ids(tickets.sla_breaches(now + timedelta(hours=2))) == ["T0003"]
+    assert ids(tickets.sla_breaches(now + timedelta(hours=30), item="Laptop")) == ["T0002", "T0004"]
+    tickets.update_ticket_status(TicketStatusUpdate(status="Closed"), "T0003")
+    assert ids(tickets.sla_breaches(now + timedelta(hours=2))) == []
@@ -0,0 +1,43 @@
+import pytest
+
+from HRMS.business_trip_manager import BusinessTripManager
+from HRMS.schemas import TicketCreate
+from HRMS.ticket_manager import TicketManager
+from HRMS.time_index import TimeIndex, parse_cursor
+
+
+def trips_starting(*days):
+    trips = BusinessTripManager()
+    trips.ingest_trips([{"emp_id": f"E00{i}", "destination": "Goa", "purpose": "Offsite",
+                         "start_date": day, "end_date": "2027-05-31", "estimated_cost": 1} for i, day in enumerate(days)])
+    return trips
+
+
+def test_range_queries_by_start_date():
+    trips = trips_starting("2027-05-10", "2027-05-01", "2027-05-20", "2027-05-02")
+    next_week = trips.list_trips(order_by="start_date", since="2027-05-01", until="2027-05-08", newest_first=False)
+    assert [t["start_date"] for t in next_week] == ["2027-05-01", "2027-05-02"]
+    latest = trips.list_trips(order_by="start_date", limit=1)
+    assert latest[0]["start_date"] == "2027-05-20"
+
+
+def test_keyset_pages_do_not_shift_when_records_are_added():
+    tickets = TicketManager()
+    tickets.ingest_tickets([{"emp_id": "E001", "item": f"Item {i}", "reason": "Test"} for i in range(5)])
+    first = tickets.list_tickets(limit=2)
+    tickets.create_ticket(TicketCreate(emp_id="E001", item="Late", reason="Test"))
+    second = tickets.list_tickets(limit=2, after=tickets.cursor_for(first[-1]))
+    third = tickets.list_tickets(limit=10, after=tickets.cursor_for(second[-1]))
+    assert [t["ticket_id"] for t in first + second + third] == [f"T{i:04d}" for i in range(1, 7)]
+
+
+def test_out_of_order_records_and_bad_cursors():
+    index = TimeIndex("created_at", "ticket_id")
+    records = {r["ticket_id"]: r for r in ({"ticket_id": "T0010", "created_at": "2027-01-02T00:00"},
+                                           {"ticket_id": "T0009", "created_at": "2027-01-02T00:00"},
+                                           {"ticket_id": "T0001", "created_at": "2027-01-01T00:00"})}
+    index.add_many(list(records.values()))
+    assert [r["ticket_id"] for r in index.query(records)] == ["T0001", "T0009", "T0010"]
+    assert [r["ticket_id"] for r in index.query(records, newest_first=True)] == ["T0010", "T0009", "T0001"]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        parse_cursor("yesterday|T0001")
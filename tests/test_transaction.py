@@ -0,0 +1,39 @@
+import logging
+
+import pytest
+
+from HRMS.transaction import Transaction
+
+
+def test_steps_are_undone_in_reverse_order():
+    undone = []
+    with pytest.raises(RuntimeError):
+        with Transaction() as txn:
+            txn.on_rollback(undone.append, 1)
+            txn.on_rollback(undone.append, 2)
+            raise RuntimeError("step 3 failed")
+    assert undone == [2, 1]
+
+
+def test_commit_discards_the_undo_log():
+    undone = []
+    with Transaction() as txn:
+        txn.on_rollback(undone.append, 1)
+    assert txn.committed and undone == []
+
+
+def test_failing_compensation_does_not_stop_the_rest(caplog):
+    undone = []
+
+    def broken():
+        raise KeyError("gone")
+
+    with pytest.raises(RuntimeError, match="step 4 failed"):
+        with caplog.at_level(logging.ERROR, logger="HRMS.transaction"):
+            with Transaction() as txn:
+                txn.on_rollback(undone.append, 1)
+                txn.on_rollback(broken)
+                txn.on_rollback(undone.append, 3)
+                raise RuntimeError("step 4 failed")
+    assert undone == [3, 1]
+    assert "Rollback step" in caplog.text
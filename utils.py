@@ -1,9 +1,10 @@
 from typing import Dict, List, Optional
 from collections import defaultdict
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 import random
 # from hrms import *
 from HRMS import EmployeeManager, LeaveManager, MeetingManager, TicketManager, BusinessTripManager
+from HRMS.schemas import TicketStatusUpdate, MeetingCreate, MeetingRecurrence
 
 def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manager, business_trip_manager):
     """
@@ -22,36 +23,33 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
 
     employees_data = [
         # Leadership
-        {"emp_id": "E001", "name": "Sarah Johnson", "manager_id": None, "email": "sarah.johnson@atliq.com"},
-        {"emp_id": "E002", "name": "Michael Chen", "manager_id": None, "email": "michael.chen@atliq.com"},
+        {"emp_id": "E001", "name": "Sarah Johnson", "manager_id": None, "email": "sarah.johnson@atliq.com", "hired_date": "2015-03-02"},
+        {"emp_id": "E002", "name": "Michael Chen", "manager_id": None, "email": "michael.chen@atliq.com", "hired_date": "2016-07-18"},
 
         # Engineering team under Sarah
-        {"emp_id": "E003", "name": "David Wilson", "manager_id": "E001", "email": "david.wilson@atliq.com"},
-        {"emp_id": "E004", "name": "Tony Sharma", "manager_id": "E003", "email": "tony.sharma@atliq.com"},
-        {"emp_id": "E005", "name": "James Rodriguez", "manager_id": "E003", "email": "james.rodriguez@atliq.com"},
+        {"emp_id": "E003", "name": "David Wilson", "manager_id": "E001", "email": "david.wilson@atliq.com", "hired_date": "2018-01-08"},
+        {"emp_id": "E004", "name": "Tony Sharma", "manager_id": "E003", "email": "tony.sharma@atliq.com", "hired_date": "2021-09-13"},
+        {"emp_id": "E005", "name": "James Rodriguez", "manager_id": "E003", "email": "james.rodriguez@atliq.com", "hired_date": "2023-04-03"},
 
         # Product team under Michael
-        {"emp_id": "E006", "name": "Emily Kim", "manager_id": "E002", "email": "emily.kim@atliq.com"},
-        {"emp_id": "E007", "name": "Carlos Mendez", "manager_id": "E006", "email": "carlos.mendez@atliq.com"},
-        {"emp_id": "E008", "name": "Lisa Wong", "manager_id": "E006", "email": "lisa.wong@atliq.com"},
+        {"emp_id": "E006", "name": "Emily Kim", "manager_id": "E002", "email": "emily.kim@atliq.com", "hired_date": "2019-05-20"},
+        {"emp_id": "E007", "name": "Carlos Mendez", "manager_id": "E006", "email": "carlos.mendez@atliq.com", "hired_date": "2022-02-14"},
+        {"emp_id": "E008", "name": "Lisa Wong", "manager_id": "E006", "email": "lisa.wong@atliq.com", "hired_date": "2024-06-10"},
     ]
 
     # Populate employee manager
-    for employee in employees_data:
-        emp_id = employee["emp_id"]
-        employee_manager.employees[emp_id] = employee
-        employee_manager.manager_map[emp_id] = employee["manager_id"]
+    employee_manager.ingest_employees(employees_data, trusted=True)
 
     # Create leave data
     # Set up some leave history for each employee
     current_date = date.today()
-    request_id_counter = 1
 
     for employee in employees_data:
         emp_id = employee["emp_id"]
 
-        # Set a random leave balance between 5 and 20 days
-        leave_manager.employee_leaves[emp_id]["balance"] = random.randint(5, 20)
+        # Set random annual (5-20 days) and sick (0-10 days) leave balances
+        leave_manager.employee_leaves[emp_id]["balances"]["Annual"] = random.randint(5, 20)
+        leave_manager.employee_leaves[emp_id]["balances"]["Sick"] = random.randint(0, 10)
 
         # Create some leave history entries
         num_leaves = random.randint(1, 5)  # Random number of leave entries
@@ -66,7 +64,8 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
                 "history_id": len(leave_manager.employee_leaves[emp_id]["history"]) + 1,
                 "emp_id": emp_id,
                 "leave_date": leave_date,
-                "request_id": request_id_counter
+                "request_id": leave_manager._next_request_id,
+                "leave_type": "Annual"
             }
             leave_manager.employee_leaves[emp_id]["history"].append(history_entry)
 
@@ -78,14 +77,25 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
                         "history_id": len(leave_manager.employee_leaves[emp_id]["history"]) + 1,
                         "emp_id": emp_id,
                         "leave_date": consecutive_date,
-                        "request_id": request_id_counter
+                        "request_id": leave_manager._next_request_id,
+                        "leave_type": "Annual"
                     }
                     leave_manager.employee_leaves[emp_id]["history"].append(consecutive_entry)
 
-            request_id_counter += 1
+            leave_manager._next_request_id += 1
+
+    # Every employee has a weekly Team Sync, Mondays at 9 AM from next week on
+    next_monday = current_date + timedelta(days=7 - current_date.weekday())
+    for employee in employees_data:
+        meeting_manager.schedule_meeting(MeetingCreate(
+            emp_id=employee["emp_id"],
+            meeting_dt=datetime.combine(next_monday, datetime.min.time()).replace(hour=9),
+            topic="Team Sync",
+            recurrence=MeetingRecurrence(frequency="weekly")
+        ))
 
     # Create meeting data
-    meeting_types = ["Team Sync", "Project Review", "Client Meeting", "1:1", "Planning"]
+    meeting_types = ["Project Review", "Client Meeting", "1:1", "Planning"]
     meeting_locations = ["Conference Room A", "Conference Room B", "Zoom", "MS Teams", "Cafeteria"]
 
     # Generate meetings for each employee
@@ -98,10 +108,14 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
             meeting_date = current_date + timedelta(days=random.randint(0, 10))
             meeting_hour = random.randint(9, 16)  # 9 AM to 4 PM
 
+            meeting_dt = datetime.combine(meeting_date, datetime.min.time()).replace(hour=meeting_hour).isoformat()
+            if meeting_manager.has_meeting(emp_id, meeting_dt):
+                continue
+
+            # Same shape as meetings booked through schedule_meeting, plus seed-only details.
             meeting = {
-                "title": random.choice(meeting_types),
-                "date": meeting_date.strftime("%Y-%m-%d"),
-                "time": f"{meeting_hour:02d}:00",
+                "date": meeting_dt,
+                "topic": random.choice(meeting_types),
                 "location": random.choice(meeting_locations),
                 "attendees": []
             }
@@ -121,19 +135,19 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
 
     # Generate some tickets
     num_tickets = random.randint(8, 15)
-    for _ in range(num_tickets):
-        employee = random.choice(employees_data)
-
-        ticket = {
-            "ticket_id": str(ticket_manager._next_id),
-            "emp_id": employee["emp_id"],
+    ticket_records = [
+        {
+            "emp_id": random.choice(employees_data)["emp_id"],
             "item": random.choice(ticket_items),
             "reason": random.choice(ticket_reasons),
-            "status": random.choice(["Open", "In Progress", "Closed"])
+            "priority": random.choice(["Low", "Normal", "Normal", "High", "Urgent"])
         }
-
-        ticket_manager.tickets.append(ticket)
-        ticket_manager._next_id += 1
+        for _ in range(num_tickets)
+    ]
+    for ticket_id in ticket_manager.ingest_tickets(ticket_records, trusted=True):
+        status = random.choice(["Open", "In Progress", "Closed"])
+        if status != "Open":
+            ticket_manager.update_ticket_status(TicketStatusUpdate(status=status), ticket_id)
 
     # Create business trip data
     destinations = ["New York", "San Francisco", "London", "Tokyo", "Singapore", "Berlin", "Paris", "Sydney"]
@@ -141,28 +155,29 @@ def seed_services(employee_manager, leave_manager, meeting_manager, ticket_manag
     
     # Generate some business trips
     num_trips = random.randint(5, 10)
+    trip_records = []
     for _ in range(num_trips):
         employee = random.choice(employees_data)
         start_date = current_date + timedelta(days=random.randint(10, 60))
         end_date = start_date + timedelta(days=random.randint(1, 7))
-        
-        from HRMS.schemas import BusinessTripCreate
-        trip_req = BusinessTripCreate(
-            emp_id=employee["emp_id"],
-            destination=random.choice(destinations),
-            purpose=random.choice(trip_purposes),
-            start_date=start_date,
-            end_date=end_date,
-            estimated_cost=random.uniform(1000, 5000),
-            manager_id=employee["manager_id"]
-        )
-        
-        business_trip_manager.create_trip(trip_req)
+
+        trip_records.append({
+            "emp_id": employee["emp_id"],
+            "destination": random.choice(destinations),
+            "purpose": random.choice(trip_purposes),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "estimated_cost": random.uniform(1000, 5000),
+            "manager_id": employee["manager_id"]
+        })
+
+    business_trip_manager.ingest_trips(trip_records, trusted=True)
 
     return {
         "employees": len(employee_manager.employees),
         "leave_records": sum(len(data["history"]) for data in leave_manager.employee_leaves.values()),
         "meetings": sum(len(meetings) for meetings in meeting_manager.meetings.values()),
+        "meeting_series": sum(len(series) for series in meeting_manager.series.values()),
         "tickets": len(ticket_manager.tickets),
         "business_trips": len(business_trip_manager.trips)
     }
@@ -181,6 +196,7 @@ if __name__ == "__main__":
     print(f"Seeded {result['employees']} employees")
     print(f"Seeded {result['leave_records']} leave records")
     print(f"Seeded {result['meetings']} meetings")
+    print(f"Seeded {result['meeting_series']} recurring meetings")
     print(f"Seeded {result['tickets']} tickets")
     print(f"Seeded {result['business_trips']} business trips")
 